@@ -1,14 +1,19 @@
 import json
-from typing import Iterable, Tuple
+from concurrent.futures import Future
+from typing import Iterable, List, Tuple
 
-from flask import Flask, request
+from flask import Flask, abort, request
 
 from m4i_analytics.graphs.languages.archimate.ArchimateUtils import \
     ArchimateUtils
+from m4i_analytics.m4i.platform.PlatformApi import PlatformApi
 from m4i_backend_core.auth import requires_auth
 from m4i_backend_core.shared import register as register_shared
+from m4i_backend_core.utils import get_shared_executor
 
-from .logic import compare_models
+from .logic import build_manifest, compare_manifests, compare_models
+from .manifest_store import get_stored_manifest, has_version, store_manifest
+from .result_cache import cache_result, get_cached_result, get_result_key
 
 app = Flask(__name__)
 
@@ -16,6 +21,42 @@ app = Flask(__name__)
 register_shared(app)
 
 
+def _get_models(futures: List[Tuple[str, Future]]) -> list:
+    """
+    Waits for the given model retrievals to complete, and returns the models in the same order.
+    If any of the retrievals fails, the others are cancelled if they did not start yet, and the request is aborted with a 502 error which names the failed model.
+    """
+
+    models = []
+    for description, future in futures:
+        try:
+            models.append(future.result())
+        except Exception as e:
+            for _, other_future in futures:
+                other_future.cancel()
+            # END LOOP
+            abort(
+                502, description=f'Could not retrieve the {description} model: {e}')
+        # END TRY
+    # END LOOP
+    return models
+# END _get_models
+
+
+def _check_project_access(project: str, access_token: str):
+    """
+    Aborts the request with a 403 (forbidden) status if the user has no role in the given project.
+    Stored manifests and cached results do not reflect the permissions of the user, so the permissions are checked before using them instead of a model.
+    """
+
+    try:
+        PlatformApi.get_user_role(project, access_token=access_token)
+    except:
+        abort(403)
+    # END TRY
+# END _check_project_access
+
+
 @app.route('/', methods=['GET'])
 @requires_auth
 def compare(access_token=None):
@@ -45,18 +86,83 @@ def compare(access_token=None):
         'userid': 'compare'
     }
 
-    # Retrieve the two models that should be compared
-    base_model = ArchimateUtils.load_model_from_repository(
-        **base_model_options,
-        access_token=access_token
-    )
-    other_model = ArchimateUtils.load_model_from_repository(
-        **other_model_options,
-        access_token=access_token
-    )
+    # With differencesOnly=true, the merged model is left out of the response.
+    # The differences can then be determined from the stored manifests of the model versions, without retrieving the models.
+    differences_only = request.args.get('differencesOnly') == 'true'
+
+    model_options = {
+        'base': base_model_options,
+        'other': other_model_options
+    }
+
+    # Only versions never change, so results are only cached when both versions are given.
+    # Without a version, the repository returns the latest version of the branch, which changes over time.
+    result_key = None
+    if all(has_version(options) for options in model_options.values()):
+        result_key = get_result_key(
+            base_model_options, other_model_options, differences_only)
+    # END IF
+
+    if result_key is not None:
+        cached_result = get_cached_result(result_key)
+        if cached_result is not None:
+            _check_project_access(project, access_token)
+            return cached_result
+        # END IF
+    # END IF
+
+    manifests = {
+        description: get_stored_manifest(options)
+        for description, options in model_options.items()
+    }
+
+    # Only retrieve the models which are needed to build the response
+    missing_models = [
+        description for description, manifest in manifests.items()
+        if manifest is None or not differences_only
+    ]
+
+    if len(missing_models) < len(model_options):
+        _check_project_access(project, access_token)
+    # END IF
+
+    # Retrieve the models that should be compared at the same time, since the retrievals mostly wait for the repository
+    executor = get_shared_executor()
+    models = dict(zip(missing_models, _get_models([
+        (description, executor.submit(
+            ArchimateUtils.load_model_from_repository,
+            **model_options[description],
+            access_token=access_token
+        ))
+        for description in missing_models
+    ])))
+
+    # Build and store the manifests of the retrieved versions, so later compares of the same versions do not need to retrieve them
+    for description, model in models.items():
+        if manifests[description] is None:
+            manifests[description] = build_manifest(model)
+            store_manifest(model_options[description], manifests[description])
+        # END IF
+    # END LOOP
+
+    if differences_only:
+        differences = compare_manifests(manifests['base'], manifests['other'])
+        differences_json = json.dumps(list(map(format_difference, differences)))
+
+        result = f'{{"differences":{differences_json}}}'
+        if result_key is not None:
+            cache_result(result_key, result)
+        # END IF
+        return result
+    # END IF
 
     # Compare the models
-    differences, merged_model = compare_models(base_model, other_model)
+    differences, merged_model = compare_models(
+        models['base'],
+        models['other'],
+        source_fingerprints=manifests['base'],
+        target_fingerprints=manifests['other']
+    )
 
     # Turn the differences into objects and serialize them as a JSON list
     difference_objects = map(format_difference, differences)
@@ -65,5 +171,9 @@ def compare(access_token=None):
     # Serialize the model to JSON
     model_json = ArchimateUtils.to_JSON(merged_model)
 
-    return f'{{"model":{model_json}, "differences":{differences_json}}}'
+    result = f'{{"model":{model_json}, "differences":{differences_json}}}'
+    if result_key is not None:
+        cache_result(result_key, result)
+    # END IF
+    return result
 # END compare
@@ -1 +1,4 @@
-from .model_differences import compare_models
\ No newline at end of file
+from .fingerprints import (build_manifest, compare_fingerprints,
+                           fingerprint_concepts, fingerprint_model,
+                           fingerprint_records, fingerprint_view_elements)
+from .model_differences import compare_manifests, compare_models
@@ -0,0 +1,215 @@
+import json
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+from pandas import DataFrame, Series, isna
+from pandas.api.types import is_numeric_dtype
+from pandas.util import hash_array
+
+from m4i_analytics.graphs.languages.archimate.ArchimateUtils import \
+    ArchimateUtils
+from m4i_analytics.graphs.languages.archimate.model.ArchimateModel import \
+    ArchimateModel
+
+
+def _canonicalize(values: Series) -> Series:
+    """
+    Replaces every nested value in the given column by a string representation which is the same for equal values, e.g. regardless of the order of the keys of a dictionary.
+    Floats with an integral value are replaced by the equal integer.
+    Strings and other scalar values are kept as is.
+    """
+
+    # Many rows share the same nested object, like the type of a concept, so every object is only serialized once
+    representations = {}
+
+    def canonicalize(value):
+        if isinstance(value, float):
+            return int(value) if value.is_integer() else value
+        # END IF
+
+        if not isinstance(value, (dict, list, tuple)):
+            return value
+        # END IF
+
+        key = id(value)
+        if key not in representations:
+            representations[key] = json.dumps(
+                value, sort_keys=True, separators=(',', ':'), default=str)
+        # END IF
+        return representations[key]
+    # END canonicalize
+
+    # Mapping the values would infer the type of the column again, and turn integers alongside null values back into floats
+    return Series([canonicalize(value) for value in values], index=values.index, dtype=object)
+# END _canonicalize
+
+
+def _hash_column(name: str, values: Series) -> np.ndarray:
+    """
+    Hashes every value of the given column, mixed with the name of the column so equal values in different columns hash differently.
+    Null values hash to 0, so a null value is the same as a missing one.
+    Numbers hash by value rather than by type, so a column of integers which is upcast to floats by a null value in another row hashes the same.
+    """
+
+    if values.dtype == object or is_numeric_dtype(values.dtype):
+        values = _canonicalize(values.astype(object))
+    # END IF
+
+    name_hash = hash_array(np.array([name], dtype=object))[0]
+
+    hashes = hash_array(hash_array(values.to_numpy()) ^ name_hash)
+    hashes[isna(values).to_numpy()] = 0
+
+    return hashes
+# END _hash_column
+
+
+def fingerprint_concepts(concepts: DataFrame, id_column: str = 'id') -> Series:
+    """
+    Calculates a fingerprint of the content of every concept in the given dataset.
+
+    Concepts with the same fingerprint have the same content, regardless of the order of the columns or of the keys of nested dictionaries.
+    Columns with flat values are hashed in bulk, while nested values like the node tree of a view are hashed by their canonical JSON representation.
+    Fingerprints are stable between processes, so they can be stored and compared to the fingerprints of a later version of the model.
+
+    :returns: The fingerprint of every concept, keyed by concept id. If an id occurs more than once, the last concept is used.
+    :rtype: Series
+
+    :param DataFrame concepts: The concepts for which to calculate the fingerprints
+    :param str id_column: The name of the column that contains the id of the concepts
+    """
+
+    concepts = concepts[concepts[id_column].notna()].drop_duplicates(
+        subset=id_column, keep='last')
+
+    fingerprints = np.zeros(len(concepts.index), dtype=np.uint64)
+    for name in concepts.columns:
+        # The sum does not depend on the order of the columns, and wraps around on overflow
+        fingerprints += _hash_column(str(name), concepts[name])
+    # END LOOP
+
+    return Series(fingerprints, index=concepts[id_column].to_numpy(), dtype=np.uint64)
+# END fingerprint_concepts
+
+
+def fingerprint_records(records: Iterable[dict], id_key: str = 'id') -> Series:
+    """
+    Calculates a fingerprint of every given record, like `fingerprint_concepts`.
+
+    :returns: The fingerprint of every record, keyed by the value of `id_key`
+    :rtype: Series
+
+    :param Iterable[dict] records: The records for which to calculate the fingerprints
+    :param str id_key: The name of the property that contains the id of the records
+    """
+
+    records = DataFrame(list(records))
+
+    if id_key not in records.columns:
+        return Series([], dtype=np.uint64)
+    # END IF
+
+    return fingerprint_concepts(records, id_key)
+# END fingerprint_records
+
+
+def fingerprint_view_elements(view_elements: Iterable[dict]) -> Series:
+    """
+    Calculates a fingerprint of every given view node or connection, including the nodes nested in them.
+    The fingerprint of a node includes its nested nodes, so a node changes whenever any of its nested nodes change.
+
+    :returns: The fingerprint of every view element, keyed by its identifier
+    :rtype: Series
+
+    :param Iterable[dict] view_elements: The nodes or connections of a view
+    """
+
+    if not isinstance(view_elements, list):
+        view_elements = []
+    # END IF
+
+    return fingerprint_records(ArchimateUtils.get_view_nodes(view_elements), '@identifier')
+# END fingerprint_view_elements
+
+
+def fingerprint_model(model: ArchimateModel) -> Dict[str, Series]:
+    """
+    Calculates the fingerprints of the nodes, edges and views of the given model.
+
+    :returns: The fingerprints of the nodes, edges and views of the given model, keyed by 'nodes', 'edges' and 'views' respectively
+    :rtype: Dict[str, Series]
+
+    :param ArchimateModel model: The model for which to calculate the fingerprints
+    """
+
+    return {
+        'nodes': fingerprint_concepts(model.nodes),
+        'edges': fingerprint_concepts(model.edges),
+        'views': fingerprint_concepts(model.views)
+    }
+# END fingerprint_model
+
+
+def build_manifest(model: ArchimateModel) -> dict:
+    """
+    Calculates the fingerprints of the given model, along with the fingerprints of the nodes and connections of every view.
+    A manifest describes the content of a model version, so two versions can be compared by their manifests alone, see `compare_manifests`.
+
+    :returns: The fingerprints of the model as returned by `fingerprint_model`, and under 'view_elements' the fingerprints of the 'nodes' and 'connections' of every view, keyed by view id
+    :rtype: dict
+
+    :param ArchimateModel model: The model for which to build the manifest
+    """
+
+    manifest = fingerprint_model(model)
+
+    views = model.views[model.views['id'].notna()].drop_duplicates(
+        subset='id', keep='last')
+
+    manifest['view_elements'] = {
+        view_id: {
+            'nodes': fingerprint_view_elements(nodes),
+            'connections': fingerprint_view_elements(connections)
+        }
+        for view_id, nodes, connections in zip(views['id'], views['nodes'], views['connections'])
+    }
+
+    return manifest
+# END build_manifest
+
+
+def compare_fingerprints(source_fingerprints: Series, target_fingerprints: Series, view_elements: bool = False) -> Iterable[Tuple[str, str]]:
+    """
+    Compares the given fingerprints of two sets of concepts.
+    Concepts are matched by id.
+    Differences are classified as either 'added', 'removed', 'unchanged' or 'changed'.
+
+    :returns: The differences found as a tuple of the concept id and the difference classification.
+    :rtype: Iterable[Tuple[str, str]]
+
+    :param Series source_fingerprints: The fingerprints of the concepts from the source model, keyed by concept id
+    :param Series target_fingerprints: The fingerprints of the concepts from the target model, keyed by concept id
+    :param bool view_elements: Whether or not the given fingerprints are of view elements (as opposed to concepts from the model)
+    """
+
+    source_ids = source_fingerprints.index
+    target_ids = target_fingerprints.index
+
+    shared_ids = source_ids.intersection(target_ids)
+
+    for id_ in source_ids.difference(shared_ids):
+        yield (id_, 'model 1 view only' if view_elements else 'model 1 only')
+    # END LOOP
+
+    for id_ in target_ids.difference(shared_ids):
+        yield (id_, 'model 2 view only' if view_elements else 'model 2 only')
+    # END LOOP
+
+    is_changed = source_fingerprints[shared_ids].to_numpy(
+    ) != target_fingerprints[shared_ids].to_numpy()
+
+    changed = 'changed in view' if view_elements else 'changed'
+    for id_, is_concept_changed in zip(shared_ids, is_changed):
+        yield (id_, changed if is_concept_changed else 'unchanged')
+    # END LOOP
+# END compare_fingerprints
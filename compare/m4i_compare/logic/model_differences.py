@@ -1,164 +1,156 @@
-from typing import Iterable, Tuple
+from typing import Callable, Iterable, Optional, Tuple, Union
 from uuid import uuid4 as uuid
 
 from numpy import nan
-from pandas import DataFrame, concat
+from pandas import DataFrame, Series, concat
 
-from m4i_analytics.graphs.languages.archimate.ArchimateUtils import \
-  ArchimateUtils
 from m4i_analytics.graphs.languages.archimate.model.ArchimateModel import \
-  ArchimateModel
+    ArchimateModel
 from m4i_backend_core.utils import index_by_property
 
+from .fingerprints import (compare_fingerprints, fingerprint_concepts,
+                           fingerprint_model, fingerprint_records,
+                           fingerprint_view_elements)
 
-def compare_concepts(source_concepts: Iterable[dict], target_concepts: Iterable[dict], id_key: str = 'id', view_elements: bool = False) -> Iterable[Tuple[str, str]]:
+# The keys of view elements which refer to a concept of the model
+VIEW_REFERENCE_KEYS = {'@elementRef', '@relationshipRef', '@viewRef'}
+
+
+def _remap_ids(ids: Series, id_mapping: dict) -> Series:
+    """
+    Replaces every id in the given series which occurs in the given mapping by its replacement.
+    Only whole ids are replaced, so ids which contain a mapped id are left untouched.
+
+    :returns: The ids with the mapped ids replaced
+    :rtype: Series
+
+    :param Series ids: The ids that should be remapped
+    :param dict id_mapping: A lookup table of original and replacement ids
+    """
+
+    values = ids.to_numpy(dtype=object).copy()
+    is_mapped = ids.isin(id_mapping.keys()).to_numpy()
+    values[is_mapped] = [id_mapping[id_] for id_ in values[is_mapped]]
+    return Series(values, index=ids.index, name=ids.name)
+# END _remap_ids
+
+
+def _get_replacement_id(id_: str) -> str:
+    """
+    Returns the id which is assigned to the version of the concept or view element with the given id from the target model, if it is replaced when merging the models
+    """
+
+    return f'{id_}_model_2'
+# END _get_replacement_id
+
+
+def compare_concepts(source_concepts: Union[DataFrame, Iterable[dict]], target_concepts: Union[DataFrame, Iterable[dict]], id_key: str = 'id', view_elements: bool = False) -> Iterable[Tuple[str, str]]:
     """
     Compare the given sets of concepts. 
     Concepts are matched by the given `id_key`. 
     Differences are classified as either 'added', 'removed', 'unchanged' or 'changed'.
+    A concept is considered changed if any of its fields differ (this also includes nested fields).
+
+    Rather than comparing the concepts field by field, the fingerprints of the concepts are compared, see `fingerprint_concepts`.
 
     :returns: The differences found as a tuple of the concept id and the difference classification.
     :rtype: Iterable[Tuple[str, str]]
 
-    :param Iterable[dict] source_concepts: The concepts from the source model that should be compared
-    :param Iterable[dict] target_concepts: The concepts from the target model that should be compared
+    :param Union[DataFrame, Iterable[dict]] source_concepts: The concepts from the source model that should be compared
+    :param Union[DataFrame, Iterable[dict]] target_concepts: The concepts from the target model that should be compared
     :param str id_key: The name of the property that contains the id of the given concepts
     :param bool view_elements: Whether or not the given concepts are view elements (as opposed to concepts from the model)
     """
 
-    def is_concept_changed(source_concept: dict, target_concept: dict) -> bool:
-        """
-        Returns whether or not a change has occurred between the given concepts.
-        A concept is considered changed if any of its fields differ (this also includes nested fields).
-
-        :returns: Whether or not a change has occurred between the given concepts.
-        :rtype: bool
-
-        :param dict source_concept: The base concept
-        :param dict target_concept: The concept to compare against the base concept
-        """
-        return source_concept != target_concept
-    # END is_concept_changed
-
-    # Index the concepts in the source and target models by ID
-    source_concepts_by_id = index_by_property(source_concepts, id_key)
-    target_concepts_by_id = index_by_property(target_concepts, id_key)
-
-    # Retrieve the ids of the concepts that are in both the source and target models by taking the keys of the respective indices
-    source_ids = source_concepts_by_id.keys()
-    target_ids = target_concepts_by_id.keys()
+    def fingerprint(concepts: Union[DataFrame, Iterable[dict]]) -> Series:
+        if isinstance(concepts, DataFrame):
+            return fingerprint_concepts(concepts, id_key)
+        # END IF
+        return fingerprint_records(concepts, id_key)
+    # END fingerprint
 
-    # A concept is in both the source and target model if its ID is present in both indices
-    shared_ids = source_ids & target_ids
+    return compare_fingerprints(
+        source_fingerprints=fingerprint(source_concepts),
+        target_fingerprints=fingerprint(target_concepts),
+        view_elements=view_elements
+    )
+# END compare_concepts
 
-    # Derive the concepts that are only in the source or target models by taking the difference of the ids in the respectrive indices and the shared ids
-    source_only = source_ids - shared_ids
-    target_only = target_ids - shared_ids
 
-    # Return which elements were added, removed, changed or unchanged as a flat list
-    for id_ in source_only:
-        yield (id_, 'model 1 view only' if view_elements else 'model 1 only')
-    # END LOOP
+def _compare_view_element_fingerprints(source_fingerprints: Series, target_fingerprints: Series, get_source_elements: Callable[[str, str], Series], get_target_elements: Callable[[str, str], Series]) -> Iterable[Tuple[str, str]]:
+    """
+    Compares the contents of the views which are in both sets of view fingerprints.
+    The fingerprints of the nodes and connections of a view are retrieved via the given functions, which take the view id and either 'nodes' or 'connections'.
+    """
 
-    for id_ in target_only:
-        yield (id_, 'model 2 view only' if view_elements else 'model 2 only')
-    # END LOOP
+    # Only determine the differences for views that are in both models
+    shared_ids = source_fingerprints.index.intersection(
+        target_fingerprints.index)
 
     for id_ in shared_ids:
-        source_concept = source_concepts_by_id[id_]
-        target_concept = target_concepts_by_id[id_]
-
-        if is_concept_changed(source_concept, target_concept):
-            yield (id_, 'changed in view' if view_elements else 'changed')
-        # END IF
-        else:
-            yield (id_, 'unchanged')
+        for content in ('nodes', 'connections'):
+            if source_fingerprints[id_] == target_fingerprints[id_]:
+                # The view did not change, so neither did its contents
+                for element_id in get_source_elements(id_, content).index:
+                    yield (element_id, 'unchanged')
+                # END LOOP
+            else:
+                yield from compare_fingerprints(
+                    source_fingerprints=get_source_elements(id_, content),
+                    target_fingerprints=get_target_elements(id_, content),
+                    view_elements=True
+                )
+            # END IF
+        # END LOOP
     # END LOOP
-# END compare_nodes
+# END _compare_view_element_fingerprints
 
 
-def compare_view_contents(source_views: Iterable[dict], target_views: Iterable[dict]) -> Iterable[Tuple[str, str]]:
+def compare_view_contents(source_views: DataFrame, target_views: DataFrame, source_fingerprints: Optional[Series] = None, target_fingerprints: Optional[Series] = None, source_view_elements: Optional[dict] = None, target_view_elements: Optional[dict] = None) -> Iterable[Tuple[str, str]]:
     """
     For the given sets of views, compare the contents of views with matching ids. Differences are classified as either 'added', 'removed', 'unchanged' or 'changed'.
 
+    Views with the same fingerprint have the same contents, so all of their nodes and connections are unchanged.
+    Only the contents of views of which the fingerprint differs are compared element by element.
+
     :returns: The differences found as a tuple of the view element id and the difference classification.
     :rtype: Iterable[Tuple[str, str]]
 
-    :param Iterable[dict] source_views: The views from the source model that should be compared
-    :param Iterable[dict] target_views: The views from the target model that should be compared
+    :param DataFrame source_views: The views from the source model that should be compared
+    :param DataFrame target_views: The views from the target model that should be compared
+    :param Optional[Series] source_fingerprints: The fingerprints of the source views, as calculated by `fingerprint_concepts`. Calculated if not given.
+    :param Optional[Series] target_fingerprints: The fingerprints of the target views, as calculated by `fingerprint_concepts`. Calculated if not given.
+    :param Optional[dict] source_view_elements: The fingerprints of the nodes and connections of the source views, as in the 'view_elements' of a manifest built by `build_manifest`. Calculated per changed view if not given.
+    :param Optional[dict] target_view_elements: The fingerprints of the nodes and connections of the target views, as in the 'view_elements' of a manifest built by `build_manifest`. Calculated per changed view if not given.
     """
 
-    def compare_view_elements(source_view_elements: Iterable[dict], target_view_elements: Iterable[dict]) -> Iterable[Tuple[str, str]]:
-        """
-        Compare the contents of a single view. 
-        Returns a set of differences for the given elements.
-        This function works for nodes as well as connections. 
-
-        :returns: A set of differences for the given elements.
-        :rtype: Iterable[Tuple[str, str]]
-
-        :param Iterable[dict] source_view_elements: The contents of the base view
-        :param Iterable[dict] target_view_elements: The contents of the view that should be compared against the base view
-        """
-        # Flatten the list of view elements to include nested nodes
-        flat_source_elements = ArchimateUtils.get_view_nodes(
-            source_view_elements
-        ) if source_view_elements is not None else []
-
-        flat_target_elements = ArchimateUtils.get_view_nodes(
-            target_view_elements
-        ) if target_view_elements is not None else []
-
-        return compare_concepts(
-            source_concepts=flat_source_elements,
-            target_concepts=flat_target_elements,
-            id_key='@identifier',
-            view_elements=True
-        )
-    # END compare_view_nodes
-
-    # Index the views in the source and target models by ID
-    source_views_by_id = index_by_property(
-        data=source_views,
-        property_name='id'
-    )
+    def get_view_elements(views: DataFrame, view_elements: Optional[dict]) -> Callable[[str, str], Series]:
+        if view_elements is not None:
+            return lambda id_, content: view_elements[id_][content]
+        # END IF
 
-    target_views_by_id = index_by_property(
-        data=target_views,
-        property_name='id'
+        # Index the views by ID
+        views_by_id = views.drop_duplicates(
+            subset='id', keep='last').set_index('id')
+        return lambda id_, content: fingerprint_view_elements(views_by_id.at[id_, content])
+    # END get_view_elements
+
+    if source_fingerprints is None:
+        source_fingerprints = fingerprint_concepts(source_views)
+    # END IF
+
+    if target_fingerprints is None:
+        target_fingerprints = fingerprint_concepts(target_views)
+    # END IF
+
+    return _compare_view_element_fingerprints(
+        source_fingerprints=source_fingerprints,
+        target_fingerprints=target_fingerprints,
+        get_source_elements=get_view_elements(
+            source_views, source_view_elements),
+        get_target_elements=get_view_elements(
+            target_views, target_view_elements)
     )
-
-    # Retrieve the ids of the elements that are in both the source and target views by taking the keys of the respective indices
-    source_ids = source_views_by_id.keys()
-    target_ids = target_views_by_id.keys()
-
-    # A concept is in both the source and target views if its ID is present in both indices
-    shared_ids = source_ids & target_ids
-
-    # Only determine the differences for views that are in both models
-    for id_ in shared_ids:
-
-        source_view = source_views_by_id[id_]
-        target_view = target_views_by_id[id_]
-
-        node_differences = compare_view_elements(
-            source_view_elements=source_view['nodes'],
-            target_view_elements=target_view['nodes']
-        )
-
-        for difference in node_differences:
-            yield difference
-        # END LOOP
-
-        edge_differences = compare_view_elements(
-            source_view_elements=source_view['connections'],
-            target_view_elements=target_view['connections']
-        )
-
-        for difference in edge_differences:
-            yield difference
-        # END LOOP
-    # END LOOP
 # END compare_view_contents
 
 
@@ -197,139 +189,112 @@ def merge_models(source_model: ArchimateModel, target_model: ArchimateModel, mod
         # END IF
 
         # Otherwise, create a new replacement id and add it to the mapping before returning it
-        replacement_id = f'{id_}_model_2'
+        replacement_id = _get_replacement_id(id_)
         id_mapping[id_] = replacement_id
         return replacement_id
     # END get_replacement_id
 
-    def replace_view_element_id(view_element: dict) -> dict:
+    def replace_view_element_ids(view_element: dict) -> dict:
         """
-        Replaces the id of the given view element, as well as any child elements
+        Replaces the id of the given view element, as well as the ids of any child elements.
+        References to changed concepts are updated, and the source and target of a connection reflect the updated ids of the view elements they connect.
 
-        :returns: The view element with its id replaced
+        :returns: The view element with its ids replaced
         :rtype: dict
 
-        :param dict view_element: The view element for which the id should be replaced
+        :param dict view_element: The view element for which the ids should be replaced
         """
-        def replace_child_element_ids() -> Iterable[dict]:
-            """
-            Replaces the ids of any child elements.
-
-            :returns: The child elements with their ids replaced.
-            :rtype: Iterable[dict]
-            """
-            if('ar3_node' in view_element):
-                children = view_element['ar3_node']
-                for child in children:
-                    yield replace_view_element_id(child)
-                # END LOOP
-            # END IF
-        # END replace_child_element_ids
 
         updated_element = {
-            **view_element,
-            '@identifier': get_replacement_id(view_element['@identifier']),\
-            # Also replace the ids of any child elements
-            'ar3_node': list(replace_child_element_ids())
+            key: concept_id_mapping.get(value, value) if key in VIEW_REFERENCE_KEYS else value
+            for key, value in view_element.items()
         }
 
-        return updated_element
-    # END replace_view_element_ids
+        # Replace the ids of all view elements to avoid a bug in Archi
+        updated_element['@identifier'] = get_replacement_id(
+            view_element['@identifier'])
 
-    def replace_view_connection_source_and_target_ids(view_connection: dict) -> dict:
-        """
-        Ensures the source and target of the given connection reflect the updated ids
+        # The ids of all view elements are replaced, so the sources and targets of connections are always replaced as well. This also accounts for connections to connections.
+        for key in ('@source', '@target'):
+            if key in view_element:
+                updated_element[key] = get_replacement_id(view_element[key])
+            # END IF
+        # END LOOP
 
-        :returns: The given connection with with updated source and target.
-        :rtype: dict
+        # Also replace the ids of any child elements
+        updated_element['ar3_node'] = list(
+            map(replace_view_element_ids, view_element.get('ar3_node', [])))
 
-        :param dict view_connection: The view connection for which the source and target should be updated
-        """
-        updated_connection = {
-            **view_connection,
-            '@source': get_replacement_id(view_connection['@source']),
-            '@target': get_replacement_id(view_connection['@target'])
-        }
-        return updated_connection
-    # END replace_view_connection_source_and_target_ids
+        return updated_element
+    # END replace_view_element_ids
 
-    def replace_view_content_ids(view: dict) -> dict:
+    def replace_view_content_ids(view_elements) -> list:
         """
-        Replaces the ids of all nodes and connections in the given view.
+        Replaces the ids of all given nodes or connections of a view.
         Replaced ids are added to the global id mapping.
 
-        :returns: The given view with the ids of its nodes and connections updated
-        :rtype: dict
+        :returns: The given view elements with their ids updated
+        :rtype: list
 
-        :param dict view: The view for which the ids of its nodes and edges should be updated
+        :param view_elements: The nodes or connections of a view
         """
-        # Replace the base ids of the nodes and connections in the view
-        nodes = map(replace_view_element_id, view['nodes'])
-        connections_with_updated_ids = map(
-            replace_view_element_id,
-            view['connections']
-        )
-        # Replace the sources and targets of the view connections after replacing the base ids to account for relations to relations
-        connections_with_updated_source_and_target = map(
-            replace_view_connection_source_and_target_ids,
-            connections_with_updated_ids
-        )
-
-        updated_view = {
-            **view,
-            'nodes': list(nodes),
-            'connections': list(connections_with_updated_source_and_target)
-        }
 
-        return updated_view
+        if not isinstance(view_elements, list):
+            return []
+        # END IF
+
+        return list(map(replace_view_element_ids, view_elements))
     # END replace_view_content_ids
 
     # For all changed elements, the IDs need to be replaced in the target model, so we can keep both the source and target versions in the merged model
-    # Rather than traverse the model as a datastructure, convert the model to a json string and replace the id of the changed element wherever it occurs
-    target_model_json = ArchimateUtils.to_JSON(target_model)
-
     for id_, difference in model_differences:
         if difference == 'changed':
-            target_model_json = target_model_json.replace(
-                id_,
-                get_replacement_id(id_)
-            )
+            get_replacement_id(id_)
         # END IF
     # END LOOP
 
-    # Convert the json string with the updated IDs back into a model
-    target_model_with_updated_ids = ArchimateUtils.load_model(
-        target_model_json
-    )
+    # Only references to concepts are updated with this mapping, the ids of view elements are added to the global mapping separately
+    concept_id_mapping = dict(id_mapping)
 
-    # Replace the ids of all view elements to avoid a bug in Archi
-    target_views_with_updated_content_ids = map(
-        replace_view_content_ids,
-        target_model_with_updated_ids.views.to_dict(orient='records')
-    )
-    target_model_with_updated_ids.views = DataFrame(
-        target_views_with_updated_content_ids
-    )
+    # Replace the ids of the changed concepts wherever the target model refers to them
+    target_nodes = target_model.nodes.copy()
+    target_nodes['id'] = _remap_ids(target_nodes['id'], concept_id_mapping)
+
+    target_edges = target_model.edges.copy()
+    for column in ('id', 'source', 'target'):
+        target_edges[column] = _remap_ids(
+            target_edges[column], concept_id_mapping)
+    # END LOOP
+
+    target_views = target_model.views.copy()
+    target_views['id'] = _remap_ids(target_views['id'], concept_id_mapping)
+    target_views['nodes'] = target_views['nodes'].map(replace_view_content_ids)
+    target_views['connections'] = target_views['connections'].map(
+        replace_view_content_ids)
+
+    target_organizations = target_model.organizations.copy()
+    target_organizations['idRef'] = _remap_ids(
+        target_organizations['idRef'], concept_id_mapping)
 
     # Merge the nodes, edges, views and organizations of the source and updated target model
     merged_nodes = concat([
         source_model.nodes,
-        target_model_with_updated_ids.nodes
+        target_nodes
     ]).drop_duplicates(subset='id')
 
     merged_edges = concat([
         source_model.edges,
-        target_model_with_updated_ids.edges
+        target_edges
     ]).drop_duplicates(subset='id')
 
     merged_views = concat([
         source_model.views,
-        target_model_with_updated_ids.views
+        target_views
     ]).drop_duplicates(subset='id')
 
     merged_organizations = concat([
         source_model.organizations,
-        target_model_with_updated_ids.organizations
+        target_organizations
     ]).drop_duplicates(subset='idRef')
 
     # Create a new model with the merged content
@@ -445,7 +410,7 @@ def map_difference_ids(differences: Iterable[Tuple[str, str]], id_mapping: dict)
 # END map_difference_ids
 
 
-def compare_models(source_model: ArchimateModel, target_model: ArchimateModel) -> Tuple[Iterable[Tuple[str, str]], ArchimateModel]:
+def compare_models(source_model: ArchimateModel, target_model: ArchimateModel, source_fingerprints: Optional[dict] = None, target_fingerprints: Optional[dict] = None) -> Tuple[Iterable[Tuple[str, str]], ArchimateModel]:
     """
     Compares the given models by nodes, edges, views and view contents. 
     Returns the differences found, as well as a model that combines the source and target model to reflect the differences found.
@@ -456,31 +421,43 @@ def compare_models(source_model: ArchimateModel, target_model: ArchimateModel) -
 
     :param ArchimateModel source_model: The base model
     :param ArchimateModel target_model: The model to compare against the base model
+    :param Optional[dict] source_fingerprints: The fingerprints of the base model, as returned by `fingerprint_model` or `build_manifest`. Calculated if not given.
+    :param Optional[dict] target_fingerprints: The fingerprints of the model to compare against the base model, as returned by `fingerprint_model` or `build_manifest`. Calculated if not given.
     """
 
-    # Start by comparing the elements, relationshps and views in the model
-    node_differences = compare_concepts(
-        source_concepts=source_model.nodes.to_dict(orient='records'),
-        target_concepts=target_model.nodes.to_dict(orient='records')
-    )
+    # Start by comparing the elements, relationshps and views in the model by their fingerprints
+    if source_fingerprints is None:
+        source_fingerprints = fingerprint_model(source_model)
+    # END IF
 
-    edge_differences = compare_concepts(
-        source_concepts=source_model.edges.to_dict(orient='records'),
-        target_concepts=target_model.edges.to_dict(orient='records')
+    if target_fingerprints is None:
+        target_fingerprints = fingerprint_model(target_model)
+    # END IF
+
+    node_differences = compare_fingerprints(
+        source_fingerprints=source_fingerprints['nodes'],
+        target_fingerprints=target_fingerprints['nodes']
     )
 
-    source_views = source_model.views.to_dict(orient='records')
-    target_views = target_model.views.to_dict(orient='records')
+    edge_differences = compare_fingerprints(
+        source_fingerprints=source_fingerprints['edges'],
+        target_fingerprints=target_fingerprints['edges']
+    )
 
-    view_differences = compare_concepts(
-        source_concepts=source_views,
-        target_concepts=target_views
+    view_differences = compare_fingerprints(
+        source_fingerprints=source_fingerprints['views'],
+        target_fingerprints=target_fingerprints['views']
     )
 
-    # Also compare the contents of the views for visual changes
+    # Also compare the contents of the views for visual changes.
+    # A manifest already holds the fingerprints of the view contents, so these are only calculated if the fingerprints were not given as a manifest.
     view_content_differences = compare_view_contents(
-        source_views=source_views,
-        target_views=target_views
+        source_views=source_model.views,
+        target_views=target_model.views,
+        source_fingerprints=source_fingerprints['views'],
+        target_fingerprints=target_fingerprints['views'],
+        source_view_elements=source_fingerprints.get('view_elements'),
+        target_view_elements=target_fingerprints.get('view_elements')
     )
 
     # Merge the source and target models.
@@ -515,3 +492,54 @@ def compare_models(source_model: ArchimateModel, target_model: ArchimateModel) -
     # Return the differences and the merged model
     return differences, merged_model_with_difference_folders
 # END compare_models
+
+
+def compare_manifests(source_manifest: dict, target_manifest: dict) -> Iterable[Tuple[str, str]]:
+    """
+    Compares two versions of a model by their manifests, as built by `build_manifest`, without loading the models themselves.
+    Returns the same differences as `compare_models` would for the models the manifests describe, including the differences for the ids which are reassigned when the models are merged.
+
+    :returns: The differences found as a tuple of the concept id and the difference classification.
+    :rtype: Iterable[Tuple[str, str]]
+
+    :param dict source_manifest: The manifest of the base model
+    :param dict target_manifest: The manifest of the model to compare against the base model
+    """
+
+    def get_view_elements(manifest: dict) -> Callable[[str, str], Series]:
+        return lambda id_, content: manifest['view_elements'][id_][content]
+    # END get_view_elements
+
+    model_differences = [
+        *compare_fingerprints(source_manifest['nodes'], target_manifest['nodes']),
+        *compare_fingerprints(source_manifest['edges'], target_manifest['edges']),
+        *compare_fingerprints(source_manifest['views'], target_manifest['views'])
+    ]
+
+    view_content_differences = _compare_view_element_fingerprints(
+        source_fingerprints=source_manifest['views'],
+        target_fingerprints=target_manifest['views'],
+        get_source_elements=get_view_elements(source_manifest),
+        get_target_elements=get_view_elements(target_manifest)
+    )
+
+    # When merging, the ids of changed concepts and of all view elements of the target model are reassigned, see `merge_models`
+    id_mapping = {
+        id_: _get_replacement_id(id_)
+        for id_, difference in model_differences if difference == 'changed'
+    }
+
+    for view_elements in target_manifest['view_elements'].values():
+        for content in ('nodes', 'connections'):
+            for element_id in view_elements[content].index:
+                id_mapping.setdefault(
+                    element_id, _get_replacement_id(element_id))
+            # END LOOP
+        # END LOOP
+    # END LOOP
+
+    return map_difference_ids(
+        differences=(*model_differences, *view_content_differences),
+        id_mapping=id_mapping
+    )
+# END compare_manifests
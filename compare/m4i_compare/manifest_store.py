@@ -0,0 +1,162 @@
+import json
+import zlib
+from typing import Optional
+
+import numpy as np
+from pandas import Series
+
+from m4i_backend_core.utils import DiskCache
+
+# The manifests are stored on local disk, so they are shared by all workers on the same machine
+MANIFEST_STORE_PATH = 'compare_manifests.sqlite'
+MANIFEST_STORE_MAX_SIZE = 1024 * 1024 * 1024  # bytes = 1 GB
+
+# Identifies the way fingerprints are calculated. Increment whenever the fingerprints change, so previously stored manifests are no longer used.
+MANIFEST_VERSION = 2
+
+_manifest_store = None
+
+
+def get_manifest_store() -> DiskCache:
+    """
+    Returns the store for model manifests. Opens the store on first use.
+
+    :return: The store for model manifests
+    :rtype: DiskCache
+    """
+
+    global _manifest_store
+    if _manifest_store is None:
+        _manifest_store = DiskCache(
+            MANIFEST_STORE_PATH, MANIFEST_STORE_MAX_SIZE)
+    # END IF
+    return _manifest_store
+# END get_manifest_store
+
+
+def has_version(model_options: dict) -> bool:
+    """
+    Returns whether the given `model_options` refer to a specific version of a model.
+    Only specific versions never change, so only their manifests can be stored.
+    """
+
+    return model_options.get('version') is not None
+# END has_version
+
+
+def get_manifest_key(model_options: dict) -> str:
+    """
+    Returns the key under which the manifest of the model which matches the given `model_options` is stored.
+    A version of a model never changes, so the manifest is identified by project, branch and version.
+
+    :return: The key for the manifest of the model
+    :rtype: str
+    """
+
+    return json.dumps([
+        model_options['fullProjectName'],
+        model_options['branchName'],
+        model_options['version'],
+        MANIFEST_VERSION
+    ])
+# END get_manifest_key
+
+
+def _encode_fingerprints(fingerprints: Series) -> list:
+    return [fingerprints.index.tolist(), fingerprints.to_numpy().tolist()]
+# END _encode_fingerprints
+
+
+def _decode_fingerprints(encoded_fingerprints: list) -> Series:
+    ids, fingerprints = encoded_fingerprints
+    return Series(np.array(fingerprints, dtype=np.uint64), index=ids, dtype=np.uint64)
+# END _decode_fingerprints
+
+
+def encode_manifest(manifest: dict) -> bytes:
+    """
+    Serializes the given manifest, as built by `build_manifest`, as compressed JSON
+
+    :return: The serialized manifest
+    :rtype: bytes
+    """
+
+    return zlib.compress(json.dumps({
+        'nodes': _encode_fingerprints(manifest['nodes']),
+        'edges': _encode_fingerprints(manifest['edges']),
+        'views': _encode_fingerprints(manifest['views']),
+        'view_elements': {
+            view_id: {
+                content: _encode_fingerprints(fingerprints)
+                for content, fingerprints in view_elements.items()
+            }
+            for view_id, view_elements in manifest['view_elements'].items()
+        }
+    }).encode('utf-8'))
+# END encode_manifest
+
+
+def decode_manifest(encoded_manifest: bytes) -> dict:
+    """
+    Deserializes a manifest which was serialized with `encode_manifest`
+
+    :return: The manifest
+    :rtype: dict
+    """
+
+    manifest = json.loads(zlib.decompress(encoded_manifest).decode('utf-8'))
+
+    return {
+        'nodes': _decode_fingerprints(manifest['nodes']),
+        'edges': _decode_fingerprints(manifest['edges']),
+        'views': _decode_fingerprints(manifest['views']),
+        'view_elements': {
+            view_id: {
+                content: _decode_fingerprints(fingerprints)
+                for content, fingerprints in view_elements.items()
+            }
+            for view_id, view_elements in manifest['view_elements'].items()
+        }
+    }
+# END decode_manifest
+
+
+def get_stored_manifest(model_options: dict) -> Optional[dict]:
+    """
+    Retrieves the stored manifest of the model which matches the given `model_options`.
+    Does not check whether the user is authorized to view the model.
+
+    :return: The stored manifest, or `None` if the manifest has not been stored or if the `model_options` do not refer to a specific version
+    :rtype: Optional[dict]
+    """
+
+    if not has_version(model_options):
+        return None
+    # END IF
+
+    encoded_manifest = get_manifest_store().get(
+        get_manifest_key(model_options))
+
+    if encoded_manifest is None:
+        return None
+    # END IF
+
+    return decode_manifest(encoded_manifest)
+# END get_stored_manifest
+
+
+def store_manifest(model_options: dict, manifest: dict):
+    """
+    Stores the given manifest for the model which matches the given `model_options`.
+    Does nothing if the `model_options` do not refer to a specific version.
+    """
+
+    if not has_version(model_options):
+        return
+    # END IF
+
+    get_manifest_store().set(
+        get_manifest_key(model_options),
+        encode_manifest(manifest)
+    )
+# END store_manifest
@@ -0,0 +1,80 @@
+import json
+import zlib
+from typing import Optional
+
+from m4i_backend_core.utils import DiskCache
+
+# The compare results are cached on local disk, so they are shared by all workers on the same machine
+RESULT_CACHE_PATH = 'compare_results.sqlite'
+RESULT_CACHE_MAX_SIZE = 2 * 1024 * 1024 * 1024  # bytes = 2 GB
+
+# Identifies the format of the cached responses. Increment whenever the response of the compare route changes, so previously cached results are no longer used.
+RESULT_CACHE_VERSION = 1
+
+_result_cache = None
+
+
+def get_result_cache() -> DiskCache:
+    """
+    Returns the cache for compare results. Opens the cache on first use.
+
+    :return: The cache for compare results
+    :rtype: DiskCache
+    """
+
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = DiskCache(RESULT_CACHE_PATH, RESULT_CACHE_MAX_SIZE)
+    # END IF
+    return _result_cache
+# END get_result_cache
+
+
+def get_result_key(base_model_options: dict, other_model_options: dict, differences_only: bool) -> str:
+    """
+    Returns the key under which the result of comparing the given model versions is cached.
+    Versions of a model never change, so the result is identified by the project, both branches and versions, and whether or not the merged model is included.
+    The access token is not part of the key, so a result calculated for one user serves every user.
+
+    :return: The key for the compare result
+    :rtype: str
+    """
+
+    return json.dumps([
+        base_model_options['fullProjectName'],
+        base_model_options['branchName'],
+        base_model_options['version'],
+        other_model_options['branchName'],
+        other_model_options['version'],
+        differences_only,
+        RESULT_CACHE_VERSION
+    ])
+# END get_result_key
+
+
+def get_cached_result(result_key: str) -> Optional[str]:
+    """
+    Retrieves the cached response body for the given result key.
+    Does not check whether the user is authorized to view the models.
+
+    :return: The cached response body, or `None` if no result is cached for the key
+    :rtype: Optional[str]
+    """
+
+    cached_result = get_result_cache().get(result_key)
+
+    if cached_result is None:
+        return None
+    # END IF
+
+    return zlib.decompress(cached_result).decode('utf-8')
+# END get_cached_result
+
+
+def cache_result(result_key: str, result: str):
+    """
+    Caches the given response body under the given result key
+    """
+
+    get_result_cache().set(result_key, zlib.compress(result.encode('utf-8')))
+# END cache_result
@@ -0,0 +1,102 @@
+from pandas import DataFrame
+
+from m4i_compare.logic.model_differences import compare_concepts
+
+SOURCE_CONCEPTS = [
+    {'id': 'a', 'name': 'Plant A', 'type': {'typename': 'Facility'}},
+    {'id': 'b', 'name': 'Plant B', 'type': {'typename': 'Facility'}},
+    {'id': 'c', 'name': 'Pump', 'type': {'typename': 'Equipment'}, 'properties': [{'key': 'x', 'value': 1}]},
+    {'id': 'd', 'name': 'Removed', 'type': {'typename': 'Goal'}},
+    {'id': 'v', 'name': 'Main view', 'nodes': [{'@identifier': 'n1', '@elementRef': 'a', 'ar3_node': [{'@identifier': 'n2', '@elementRef': 'b'}]}]}
+]
+
+TARGET_CONCEPTS = [
+    {'id': 'a', 'name': 'Plant A', 'type': {'typename': 'Facility'}},
+    # A changed top level field
+    {'id': 'b', 'name': 'Plant C', 'type': {'typename': 'Facility'}},
+    # A changed nested field
+    {'id': 'c', 'name': 'Pump', 'type': {'typename': 'Equipment'}, 'properties': [{'key': 'x', 'value': 2}]},
+    {'id': 'e', 'name': 'Added', 'type': {'typename': 'Goal'}},
+    # A changed field deep within the node tree of a view
+    {'id': 'v', 'name': 'Main view', 'nodes': [{'@identifier': 'n1', '@elementRef': 'a', 'ar3_node': [{'@identifier': 'n2', '@elementRef': 'e'}]}]}
+]
+
+
+def compare_concepts_by_equality(source_concepts, target_concepts, view_elements=False):
+    """
+    The comparison of whole dictionaries which `compare_concepts` used before fingerprints
+    """
+
+    source_by_id = {concept['id']: concept for concept in source_concepts}
+    target_by_id = {concept['id']: concept for concept in target_concepts}
+
+    for id_ in source_by_id.keys() - target_by_id.keys():
+        yield (id_, 'model 1 view only' if view_elements else 'model 1 only')
+    # END LOOP
+
+    for id_ in target_by_id.keys() - source_by_id.keys():
+        yield (id_, 'model 2 view only' if view_elements else 'model 2 only')
+    # END LOOP
+
+    for id_ in source_by_id.keys() & target_by_id.keys():
+        if source_by_id[id_] != target_by_id[id_]:
+            yield (id_, 'changed in view' if view_elements else 'changed')
+        else:
+            yield (id_, 'unchanged')
+        # END IF
+    # END LOOP
+# END compare_concepts_by_equality
+
+
+def test_compare_concepts_matches_equality():
+    for view_elements in [False, True]:
+        expected = set(compare_concepts_by_equality(
+            SOURCE_CONCEPTS, TARGET_CONCEPTS, view_elements))
+        actual = set(compare_concepts(
+            SOURCE_CONCEPTS, TARGET_CONCEPTS, view_elements=view_elements))
+
+        assert actual == expected
+    # END LOOP
+# END test_compare_concepts_matches_equality
+
+
+def test_compare_concepts_of_frames_matches_records():
+    source_concepts = [
+        concept for concept in SOURCE_CONCEPTS if 'properties' not in concept and 'nodes' not in concept
+    ]
+    target_concepts = [
+        concept for concept in TARGET_CONCEPTS if 'properties' not in concept and 'nodes' not in concept
+    ]
+
+    expected = set(compare_concepts_by_equality(
+        source_concepts, target_concepts))
+    actual = set(compare_concepts(
+        DataFrame(source_concepts), DataFrame(target_concepts)))
+
+    assert actual == expected
+    assert ('b', 'changed') in actual
+# END test_compare_concepts_of_frames_matches_records
+
+
+def test_compare_concepts_ignores_upcast_numeric_columns():
+    source_concepts = [
+        {'id': 'a', 'name': 'Plant A', 'level': 1},
+        {'id': 'b', 'name': 'Plant B', 'level': 2}
+    ]
+    # The missing level of b upcasts the levels in the target frame to floats
+    target_concepts = [
+        {'id': 'a', 'name': 'Plant A', 'level': 1},
+        {'id': 'b', 'name': 'Plant B'}
+    ]
+
+    source_frame, target_frame = DataFrame(
+        source_concepts), DataFrame(target_concepts)
+    assert source_frame['level'].dtype != target_frame['level'].dtype
+
+    expected = set(compare_concepts_by_equality(
+        source_concepts, target_concepts))
+    actual = set(compare_concepts(source_frame, target_frame))
+
+    assert actual == expected
+    assert ('a', 'unchanged') in actual
+# END test_compare_concepts_ignores_upcast_numeric_columns
@@ -1,7 +1,7 @@
 import asyncio
 from json import dumps
 
-from flask import Flask, abort, request
+from flask import Flask, Response, abort, request, stream_with_context
 from requests_cache import install_cache
 
 from m4i_analytics.m4i.ApiUtils import ApiUtils
@@ -10,6 +10,13 @@ from m4i_backend_core.auth import requires_auth
 from m4i_backend_core.shared import register as register_shared
 
 from .report import calculate_metric, generate_metric
+from .report.chart import CHART_BOKEH, CHART_STATIC
+from .report.full_report import generate_full_report
+from .report.paginate import get_pagination_query, paginate_result
+from .report.precompute import enqueue_precompute, get_precompute_status
+from .report.serialize import (FORMAT_COLUMNAR, FORMAT_RECORDS, encode_json,
+                               to_records)
+from .report.view_membership import get_views_containing
 from .report import report as report_structure
 
 app = Flask(__name__)
@@ -18,9 +25,10 @@ app = Flask(__name__)
 register_shared(app)
 
 # Enable chache-ing for GET requests. This helps load models faster on repeated requests.
+# Metric results are not cached here, since they are kept in a dedicated result store instead.
 CACHE_NAME = 'consistency_metrics'
 EXPIRE_AFTER = 60 * 60 * 24  # seconds = 1 day
-CACHED_PATHS = ['private/metric', 'model/retrieve']
+CACHED_PATHS = ['model/retrieve']
 install_cache(
     CACHE_NAME,
     backend='sqlite',
@@ -32,6 +40,7 @@ install_cache(
 
 
 # Application routes
+# The metric and report routes accept profile=true, which adds the measurements of every metric involved to the response in a `_profile` block.
 # This is the entry route for the front end. Can be used to retrieve metrics and metric categories.
 @app.route('/metric', methods=['GET'])
 @requires_auth
@@ -53,23 +62,52 @@ def metric(access_token=None):
         abort(403)
     # END TRY
 
+    # Read the pagination parameters before calculating the metric, so malformed parameters fail fast
+    try:
+        pagination_query = get_pagination_query(request.args)
+    except ValueError:
+        abort(400)
+    # END TRY
+
+    # The columnar format is opt-in, since the front end expects records by default
+    response_format = request.args.get('format', FORMAT_RECORDS)
+    if response_format not in [FORMAT_COLUMNAR, FORMAT_RECORDS]:
+        abort(400)
+    # END IF
+
+    # The chart of a metric category is rendered with Bokeh by default. A static chart description can be rendered by the client instead.
+    chart_format = request.args.get('chart', CHART_BOKEH)
+    if chart_format not in [CHART_BOKEH, CHART_STATIC]:
+        abort(400)
+    # END IF
+
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
 
     metric_future = generate_metric(
         metric_key=request.args.get('metric'),
-        model_options=model_options
+        model_options=model_options,
+        chart_format=chart_format,
+        profile_metrics=request.args.get('profile') == 'true'
     )
     
     metric = loop.run_until_complete(metric_future)
 
     loop.close()
 
-    # Ensure keys are not sorted to preserve the report structure
-    return dumps(
-        metric,
-        sort_keys=False
-    )
+    try:
+        metric = paginate_result(metric, pagination_query)
+    except ValueError:
+        abort(400)
+    # END TRY
+
+    # Results are columnar, so records are only built for the rows on the requested page
+    if response_format == FORMAT_RECORDS:
+        metric = to_records(metric)
+    # END IF
+
+    # Keys are not sorted to preserve the report structure
+    return encode_json(metric)
 # END metric
 
 # Internal route used by the app for caching of metrics. Can be used to retrieve metrics ONLY.
@@ -84,26 +122,184 @@ def private_metric(access_token=None):
         'access_token': access_token
     }
 
+    # Stored results are shared between users, so check whether this user has access to the project before returning one.
+    # If this fails for whatever reason, abort with a 403 (forbidden) status.
+    try:
+        PlatformApi.get_user_role(request.args.get(
+            'project'), access_token=access_token)
+    except:
+        abort(403)
+    # END TRY
+
+    # Read the pagination parameters before calculating the metric, so malformed parameters fail fast
+    try:
+        pagination_query = get_pagination_query(request.args)
+    except ValueError:
+        abort(400)
+    # END TRY
+
+    # The columnar format is opt-in, since the front end expects records by default
+    response_format = request.args.get('format', FORMAT_RECORDS)
+    if response_format not in [FORMAT_COLUMNAR, FORMAT_RECORDS]:
+        abort(400)
+    # END IF
+
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
 
     metric_future = calculate_metric(
         metric_key=request.args.get('metric'),
-        model_options=model_options
+        model_options=model_options,
+        profile_metrics=request.args.get('profile') == 'true'
     )
 
     metric = loop.run_until_complete(metric_future)
 
     loop.close()
 
-    # Ensure keys are not sorted to preserve the report structure
-    return dumps(
-        metric,
-        sort_keys=False
-    )
+    try:
+        metric = paginate_result(metric, pagination_query)
+    except ValueError:
+        abort(400)
+    # END TRY
+
+    # Results are columnar, so records are only built for the rows on the requested page
+    if response_format == FORMAT_RECORDS:
+        metric = to_records(metric)
+    # END IF
+
+    # Keys are not sorted to preserve the report structure
+    return encode_json(metric)
 # END private_metric
 
 
+# Queues the calculation of all metrics for the given model version, so later requests for its metrics are served from the result store.
+@app.route('/precompute', methods=['POST'])
+@requires_auth
+def precompute(access_token=None):
+    model_options = {
+        'fullProjectName': request.args.get('project'),
+        'branchName': request.args.get('branch'),
+        'version': int(request.args.get('version')),
+        'userid': 'consistency_metrics',
+        'access_token': access_token
+    }
+
+    # Retrieve the role of the user in the given project.
+    # If this fails for whatever reason, abort with a 403 (forbidden) status.
+    try:
+        PlatformApi.get_user_role(request.args.get(
+            'project'), access_token=access_token)
+    except:
+        abort(403)
+    # END TRY
+
+    return dumps(enqueue_precompute(model_options))
+# END precompute
+
+
+# Returns the status of precomputing the metrics for the given model version.
+@app.route('/precompute', methods=['GET'])
+@requires_auth
+def precompute_status(access_token=None):
+    model_options = {
+        'fullProjectName': request.args.get('project'),
+        'branchName': request.args.get('branch'),
+        'version': int(request.args.get('version'))
+    }
+
+    # Retrieve the role of the user in the given project.
+    # If this fails for whatever reason, abort with a 403 (forbidden) status.
+    try:
+        PlatformApi.get_user_role(request.args.get(
+            'project'), access_token=access_token)
+    except:
+        abort(403)
+    # END TRY
+
+    return dumps(get_precompute_status(model_options))
+# END precompute_status
+
+
+# Resolves every metric category in the report at once. The categories are streamed as newline delimited JSON, in order of completion.
+@app.route('/report/full', methods=['GET'])
+@requires_auth
+def full_report(access_token=None):
+    model_options = {
+        'fullProjectName': request.args.get('project'),
+        'branchName': request.args.get('branch'),
+        'version': int(request.args.get('version')),
+        'userid': 'consistency_metrics',
+        'access_token': access_token
+    }
+
+    # Retrieve the role of the user in the given project.
+    # If this fails for whatever reason, abort with a 403 (forbidden) status.
+    try:
+        PlatformApi.get_user_role(request.args.get(
+            'project'), access_token=access_token)
+    except:
+        abort(403)
+    # END TRY
+
+    chart_format = request.args.get('chart', CHART_BOKEH)
+    if chart_format not in [CHART_BOKEH, CHART_STATIC]:
+        abort(400)
+    # END IF
+
+    def generate():
+        categories = generate_full_report(
+            model_options,
+            chart_format=chart_format,
+            profile_metrics=request.args.get('profile') == 'true'
+        )
+        for category in categories:
+            # Categories of which a metric failed have no result
+            if category['result'] is not None:
+                category = {**category, 'result': to_records(category['result'])}
+            # END IF
+            yield encode_json(category) + b'\n'
+        # END LOOP
+    # END generate
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson'
+    )
+# END full_report
+
+
+# Returns the ids of the views in which the given elements occur. Accepts one or more `element` parameters.
+# The view membership of a model version is stored, so the model is only retrieved on the first lookup.
+@app.route('/views', methods=['GET'])
+@requires_auth
+def views(access_token=None):
+    model_options = {
+        'fullProjectName': request.args.get('project'),
+        'branchName': request.args.get('branch'),
+        'version': int(request.args.get('version')),
+        'userid': 'consistency_metrics',
+        'access_token': access_token
+    }
+
+    # The stored view membership is shared between users, so check whether this user has access to the project before returning it.
+    # If this fails for whatever reason, abort with a 403 (forbidden) status.
+    try:
+        PlatformApi.get_user_role(request.args.get(
+            'project'), access_token=access_token)
+    except:
+        abort(403)
+    # END TRY
+
+    element_ids = request.args.getlist('element')
+    if len(element_ids) == 0:
+        abort(400)
+    # END IF
+
+    return dumps(get_views_containing(model_options, element_ids))
+# END views
+
+
 @app.route('/report', methods=['GET'])
 def report():
     return dumps(report_structure, sort_keys=False)
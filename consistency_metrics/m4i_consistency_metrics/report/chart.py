@@ -0,0 +1,84 @@
+from hashlib import sha1
+
+from bokeh.embed import json_item
+from bokeh.plotting import Figure
+from m4i_backend_core.utils import TTLCache
+from m4i_metrics.MetricCategory import MetricCategory
+from pandas import DataFrame
+from pandas.util import hash_pandas_object
+
+CHART_BOKEH = 'bokeh'
+CHART_STATIC = 'static'
+
+# Rendered charts are kept for an hour. Charts for the same summary data are identical, so they do not go stale.
+CHART_CACHE_TTL = 60 * 60  # seconds
+_charts = TTLCache(CHART_CACHE_TTL)
+
+
+def get_summary_hash(metric_category: MetricCategory, data: DataFrame) -> str:
+    """
+    Returns a hash of the given summary data of the given `metric_category`.
+    The hash includes the column names and the index, so summaries only share a hash if their charts are identical.
+
+    :return: The hexadecimal digest of the summary data
+    :rtype: str
+    """
+
+    digest = sha1(metric_category.id.encode('utf-8'))
+    digest.update(repr(list(data.columns)).encode('utf-8'))
+    digest.update(hash_pandas_object(data, index=True).values.tobytes())
+
+    return digest.hexdigest()
+# END get_summary_hash
+
+
+def _format_chart(chart: Figure) -> Figure:
+    """
+    Ensures the given `chart` has a responsive layout and does not display the Bokeh logo
+
+    :return: The given `chart` with responsive layout and hidden Bokeh logo
+    :rtype: bokeh.plotting.Figure
+    """
+
+    chart.sizing_mode = 'stretch_both'
+    chart.toolbar.logo = None
+    return chart
+# END _format_chart
+
+
+def render_chart(metric_category: MetricCategory, data: DataFrame, chart_format: str = CHART_BOKEH) -> dict:
+    """
+    Creates the chart for the given summary data of the given `metric_category`.
+
+    With the `bokeh` format, returns the chart as a Bokeh JSON item. Rendered charts are cached by the hash of the summary data.
+    With the `static` format, returns a description of the chart which the client can render, without any Bokeh work on the server.
+
+    :return: A JSON serializable chart
+    :rtype: dict
+
+    :exception ValueError: Thrown when the chart format is not supported
+    """
+
+    if chart_format == CHART_STATIC:
+        return metric_category.create_chart_spec(data)
+    # END IF
+
+    if chart_format != CHART_BOKEH:
+        raise ValueError(f'Chart format {chart_format} is not supported')
+    # END IF
+
+    key = get_summary_hash(metric_category, data)
+
+    chart = _charts.get(key)
+
+    if chart is None:
+        chart = json_item(
+            model=_format_chart(
+                chart=metric_category.create_graph(data)
+            )
+        )
+        _charts.set(key, chart)
+    # END IF
+
+    return chart
+# END render_chart
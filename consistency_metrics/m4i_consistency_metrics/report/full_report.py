@@ -0,0 +1,166 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Tuple
+
+from m4i_analytics.graphs.languages.archimate.ArchimateUtils import \
+    ArchimateUtils
+from m4i_metrics.MetricCategory import MetricCategory
+from m4i_metrics.MetricRunner import iter_metrics, resolve_metrics
+
+from .chart import CHART_BOKEH
+from .report import (PROFILE_ALL_METRICS, STORED_PROFILE, _format_metric,
+                     _from_stored_result, _get_metric_exemptions,
+                     _summarize_metric_category, metrics, report)
+from .incremental import get_previous_results
+from .metric_pool import get_metric_pool
+from .result_store import get_stored_result, store_result
+
+
+def _get_categories() -> List[Tuple[str, MetricCategory]]:
+    """
+    Returns every category in the report structure along with its name, in the order of the report
+    """
+
+    return [
+        (category_name, metrics[category['Summary']])
+        for category_name, category in report.items()
+    ]
+# END _get_categories
+
+
+def generate_full_report(model_options: dict, chart_format: str = CHART_BOKEH, profile_metrics: bool = False) -> Iterator[dict]:
+    """
+    Resolves every metric category in the report for the model which matches the given `model_options`, and yields every category as soon as it is complete.
+
+    Results of metrics are taken from the result store where possible.
+    The model is retrieved at most once, while the exemptions of all metrics are retrieved at the same time.
+    Missing metrics are calculated in parallel, and their results are added to the result store, so the details of every metric can be retrieved via the `/metric` route afterwards.
+    Decomposable metrics of which a result is stored for another version of the same branch are recalculated from it.
+
+    Every item is a dictionary with the following keys:
+
+        * `category`: The name of the category in the report structure
+        * `metric`: The id of the metric category
+        * `result`: The JSON serializable result of the metric category, as returned by the `/metric` route. `None` if any metric of the category failed, since the summary would report the failed metric as compliant.
+        * `error`: A message which names the failed metrics of the category, or `None` if all metrics succeeded
+        * `errors`: A description of the exception raised by every metric of the category which failed, keyed by metric id
+        * `_profile`: The measurements of every metric of the category, keyed by metric id. Only included if `profile_metrics` is set.
+
+    :return: The result of every metric category, in order of completion
+    :rtype: Iterator[dict]
+    """
+
+    categories = _get_categories()
+
+    submetrics, _ = resolve_metrics(
+        [category for _, category in categories])
+
+    results = {}
+    errors = {}
+    profiles = {}
+
+    for metric in submetrics:
+        stored_result = get_stored_result(model_options, metric)
+        if stored_result is not None:
+            results[metric.id] = _from_stored_result(stored_result)
+            profiles[metric.id] = STORED_PROFILE
+        # END IF
+    # END LOOP
+
+    missing_metrics = {
+        metric.id: metric for metric in submetrics if metric.id not in results
+    }
+
+    pending_categories = list(categories)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+
+        # Retrieve the exemptions in the background, while the metrics are being resolved
+        exemptions_future = pool.submit(asyncio.run, _get_metric_exemptions(
+            project_name=model_options['fullProjectName'],
+            branch_name=model_options['branchName'],
+            version=model_options['version'],
+            metric_names=[metric.id for metric in submetrics],
+            access_token=model_options['access_token']
+        ))
+
+        def summarize_completed_categories():
+            for category_name, category in list(pending_categories):
+                if all(metric.id in results for metric in category.metrics):
+                    pending_categories.remove((category_name, category))
+
+                    failed_metrics = [
+                        metric for metric in category.metrics if metric.id in errors
+                    ]
+
+                    item = {
+                        'category': category_name,
+                        'metric': category.id,
+                        'result': None,
+                        'error': None,
+                        'errors': {
+                            metric.id: errors[metric.id] for metric in failed_metrics
+                        }
+                    }
+
+                    if len(failed_metrics) > 0:
+                        item['error'] = 'Not summarized, since these metrics failed: ' + \
+                            ', '.join(metric.label for metric in failed_metrics)
+                    else:
+                        item['result'] = _summarize_metric_category(
+                            category,
+                            [results[metric.id] for metric in category.metrics],
+                            exemptions_future.result(),
+                            chart_format=chart_format
+                        )
+                    # END IF
+
+                    if profile_metrics:
+                        item['_profile'] = {
+                            metric.id: profiles.get(metric.id)
+                            for metric in category.metrics
+                        }
+                    # END IF
+
+                    yield item
+                # END IF
+            # END LOOP
+        # END summarize_completed_categories
+
+        # Categories of which all results are stored can be summarized right away
+        yield from summarize_completed_categories()
+
+        if len(missing_metrics) > 0:
+            model = ArchimateUtils.load_model_from_repository(**model_options)
+
+            metric_runs = iter_metrics(
+                model,
+                missing_metrics.values(),
+                pool=get_metric_pool(),
+                profile_metrics=profile_metrics or PROFILE_ALL_METRICS,
+                previous_results=get_previous_results(
+                    model_options, missing_metrics.values(), model)
+            )
+
+            for metric_id, run in metric_runs:
+                if 'profile' in run:
+                    profiles[metric_id] = {
+                        'source': 'calculation', **run['profile']}
+                # END IF
+
+                if run['error'] is not None:
+                    errors[metric_id] = run['error']
+                    results[metric_id] = None
+                else:
+                    store_result(model_options, missing_metrics[metric_id], {
+                        'type': 'table',
+                        'data': _format_metric(run['result'])
+                    })
+                    results[metric_id] = run['result']
+                # END IF
+
+                yield from summarize_completed_categories()
+            # END LOOP
+        # END IF
+    # END WITH
+# END generate_full_report
@@ -0,0 +1,92 @@
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from m4i_compare.logic import build_manifest, compare_fingerprints
+from m4i_compare.manifest_store import get_stored_manifest, store_manifest
+from m4i_metrics.Metric import Metric
+
+from .result_store import get_previous_result
+from .serialize import from_columnar
+
+
+def _get_differences(model_options: dict, version: int, manifest: dict) -> Optional[List[Tuple[str, str]]]:
+    """
+    Compares the stored manifest of the given version of the branch which matches the given `model_options` to the given manifest.
+
+    :return: The id and difference classification of every concept which is not unchanged, or `None` if no manifest is stored for the given version
+    :rtype: Optional[List[Tuple[str, str]]]
+    """
+
+    previous_manifest = get_stored_manifest(
+        {**model_options, 'version': version})
+
+    if previous_manifest is None:
+        return None
+    # END IF
+
+    differences = chain.from_iterable(
+        compare_fingerprints(previous_manifest[concepts], manifest[concepts])
+        for concepts in ['nodes', 'edges', 'views']
+    )
+
+    return [
+        (concept_id, difference) for concept_id, difference in differences
+        if difference != 'unchanged'
+    ]
+# END _get_differences
+
+
+def get_previous_results(model_options: dict, metrics: Iterable[Metric], model) -> Dict[str, Tuple[dict, List[Tuple[str, str]]]]:
+    """
+    Looks up the results from which the given metrics can be recalculated for the given model, which matches the given `model_options`. See `Metric.recalculate`.
+
+    A decomposable metric can be recalculated if its result is stored for another version of the same branch, and if the manifest of that version is stored as well.
+    Stored results only count for the same implementation of the metric, see `get_previous_result`.
+    The manifest of the given model is stored along the way, so the next version of the model can be compared to it.
+
+    :return: The stored result of every metric which can be recalculated, along with the differences between its version and the given model, keyed by metric id
+    :rtype: Dict[str, Tuple[dict, List[Tuple[str, str]]]]
+    """
+
+    decomposable_metrics = [
+        metric for metric in metrics if metric.is_decomposable
+    ]
+
+    if len(decomposable_metrics) == 0:
+        return {}
+    # END IF
+
+    manifest = build_manifest(model)
+    store_manifest(model_options, manifest)
+
+    # Usually all results stem from the same version, so every version is only compared once
+    differences_per_version = {}
+    previous_results = {}
+
+    for metric in decomposable_metrics:
+        previous_result = get_previous_result(model_options, metric)
+
+        if previous_result is None:
+            continue
+        # END IF
+
+        version, stored_result = previous_result
+
+        if version not in differences_per_version:
+            differences_per_version[version] = _get_differences(
+                model_options, version, manifest)
+        # END IF
+
+        differences = differences_per_version[version]
+
+        if differences is not None:
+            previous_data = {
+                dataset_name: {**dataset, 'data': from_columnar(dataset)}
+                for dataset_name, dataset in stored_result['data'].items()
+            }
+            previous_results[metric.id] = (previous_data, differences)
+        # END IF
+    # END LOOP
+
+    return previous_results
+# END get_previous_results
@@ -0,0 +1,34 @@
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+
+from m4i_metrics.MetricRunner import create_metric_pool
+
+# The number of processes on which the metrics of full reports and precompute jobs are calculated. Defaults to the number of processors.
+# Every server worker has its own pool, so the total number of processes is this number times the number of server workers.
+METRIC_PROCESSES = None
+
+_pool = None
+_pool_lock = Lock()
+
+
+def get_metric_pool() -> ProcessPoolExecutor:
+    """
+    Returns the pool of processes on which metrics are calculated, which is shared by all requests and precompute jobs in this process.
+    The pool is created on first use by a full report or precompute job, so server workers which never calculate metrics do not start any processes.
+    The processes themselves are started when the first metric is submitted, without waiting for them to be ready.
+
+    The processes are started with the 'spawn' method, since forking a server worker which runs gevent is not safe.
+    This means the pool has to be created in every server worker after it is forked, and not before the app is preloaded.
+
+    :return: The shared pool of metric processes
+    :rtype: ProcessPoolExecutor
+    """
+
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = create_metric_pool(max_workers=METRIC_PROCESSES)
+        # END IF
+        return _pool
+    # END WITH
+# END get_metric_pool
@@ -0,0 +1,218 @@
+from json import loads
+from typing import Any, Dict, List, Optional, Union
+
+PAGINATION_PARAMETERS = ['offset', 'limit', 'sort', 'order', 'filter']
+
+
+def get_pagination_query(args: Dict[str, str]) -> Optional[Dict[str, dict]]:
+    """
+    Reads the pagination parameters from the given request arguments.
+
+    The parameters `offset`, `limit`, `sort`, `order` and `filter` apply to every dataset.
+    The `datasets` parameter is a JSON object which overrides these parameters per dataset, keyed by dataset name.
+
+    :return: The pagination query, with the parameters for all datasets under the key `None`. Returns `None` if no pagination parameters are given.
+    :rtype: Optional[Dict[str, dict]]
+
+    :exception ValueError: Thrown when any of the parameters is malformed
+    """
+
+    defaults = {
+        key: args[key] for key in PAGINATION_PARAMETERS if key in args
+    }
+
+    per_dataset = loads(args['datasets']) if 'datasets' in args else {}
+
+    if not isinstance(per_dataset, dict) or not all(isinstance(options, dict) for options in per_dataset.values()):
+        raise ValueError('The datasets parameter should be a JSON object of objects')
+    # END IF
+
+    if len(defaults) == 0 and len(per_dataset) == 0:
+        return None
+    # END IF
+
+    return {None: defaults, **per_dataset}
+# END get_pagination_query
+
+
+def _is_missing(value: Any) -> bool:
+    # NaN is the only value which is not equal to itself
+    return value is None or value != value
+# END _is_missing
+
+
+def _sort_key(value: Any):
+    # Numbers, text and other values are sorted separately, so values of different types are never compared.
+    # Values which cannot be ordered, like lists and objects, are compared by their text representation.
+    if isinstance(value, (int, float)):
+        return (0, value, '')
+    # END IF
+
+    if isinstance(value, str):
+        return (1, 0, value)
+    # END IF
+
+    return (2, 0, str(value))
+# END _sort_key
+
+
+def _parse_count(options: dict, name: str, default: Optional[int] = None) -> Optional[int]:
+    """
+    Reads the given non-negative integer option, which is either a number from the JSON `datasets` parameter or the text of a request argument
+
+    :exception ValueError: Thrown when the option is not a non-negative integer
+    """
+
+    if name not in options:
+        return default
+    # END IF
+
+    value = options[name]
+
+    if isinstance(value, str):
+        value = int(value)
+    # Booleans are integers in Python, but not valid counts
+    elif isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f'The {name} should be an integer')
+    # END IF
+
+    if value < 0:
+        raise ValueError(f'The {name} should not be negative')
+    # END IF
+
+    return value
+# END _parse_count
+
+
+def _matches(values: Dict[str, list], position: int, filter_: Union[str, Dict[str, str]]) -> bool:
+    """
+    Returns whether the row at the given position matches the given filter.
+    A text filter matches if any value of the row contains the text. An object filter matches if the value of every given column contains the given text.
+    Matching is case-insensitive. Missing values never match.
+    """
+
+    if isinstance(filter_, dict):
+        return all(
+            column in values
+            and not _is_missing(values[column][position])
+            and str(filter_value).lower() in str(values[column][position]).lower()
+            for column, filter_value in filter_.items()
+        )
+    # END IF
+
+    filter_ = str(filter_).lower()
+    return any(
+        filter_ in str(column[position]).lower() for column in values.values() if not _is_missing(column[position])
+    )
+# END _matches
+
+
+def paginate_columns(columns: List[str], data: List[list], offset: int = 0, limit: Optional[int] = None, sort: Optional[str] = None, order: str = 'asc', filter_: Optional[Union[str, Dict[str, str]]] = None) -> (List[list], int):
+    """
+    Filters, sorts and pages the rows of a dataset in columnar format.
+    Rows are never built, only the positions of the matching rows are tracked.
+
+    :return: The values of every column on the requested page, and the total number of rows which match the filter
+    :rtype: (List[list], int)
+
+    :param columns: The names of the columns of the dataset
+    :type columns: List[str]
+    :param data: The values of every column of the dataset, in the same order as `columns`
+    :type data: List[list]
+    """
+
+    values = dict(zip(columns, data))
+    positions = range(len(data[0]) if len(data) > 0 else 0)
+
+    if filter_:
+        positions = [
+            position for position in positions if _matches(values, position, filter_)
+        ]
+    # END IF
+
+    if sort in values:
+        # Rows without a value for the sort column always go last
+        column = values[sort]
+        positions = sorted(
+            (position for position in positions if not _is_missing(
+                column[position])),
+            key=lambda position: _sort_key(column[position]),
+            reverse=order == 'desc'
+        ) + [position for position in positions if _is_missing(column[position])]
+    # END IF
+
+    total = len(positions)
+
+    end = offset + limit if limit is not None else None
+
+    if isinstance(positions, range):
+        # Without a filter or sort order, the page is a slice of every column
+        return [column[offset:end] for column in data], total
+    # END IF
+
+    page = positions[offset:end]
+    return [[column[position] for position in page] for column in data], total
+# END paginate_columns
+
+
+def paginate_result(result: dict, query: Optional[Dict[str, dict]]) -> dict:
+    """
+    Applies the given pagination query to every dataset of the given JSON serializable metric result, which is in columnar format.
+    Every dataset is extended with a `total` which is the number of rows matching the filter, regardless of the page.
+    If the query is `None`, all rows are returned.
+
+    :return: A copy of the result with only the requested rows
+    :rtype: dict
+
+    :exception ValueError: Thrown when the offset or limit is not a non-negative integer, when the order is not `asc` or `desc`, when the sort column is not a name, or when the filter is neither a text nor an object
+    """
+
+    datasets = {}
+    for dataset_name, dataset in result['data'].items():
+
+        options = {}
+        if query is not None:
+            options = {**query.get(None, {}), **query.get(dataset_name, {})}
+        # END IF
+
+        offset = _parse_count(options, 'offset', 0)
+        limit = _parse_count(options, 'limit')
+        order = options.get('order', 'asc')
+        sort = options.get('sort')
+
+        if order not in ['asc', 'desc']:
+            raise ValueError('The order should be either asc or desc')
+        # END IF
+
+        if sort is not None and not isinstance(sort, str):
+            raise ValueError('The sort column should be a column name')
+        # END IF
+
+        filter_ = options.get('filter')
+        if isinstance(filter_, str) and filter_.startswith('{'):
+            filter_ = loads(filter_)
+        # END IF
+
+        if filter_ is not None and not isinstance(filter_, (str, dict)):
+            raise ValueError('The filter should be either a text or an object')
+        # END IF
+
+        data, total = paginate_columns(
+            dataset['columns'],
+            dataset['data'],
+            offset=offset,
+            limit=limit,
+            sort=sort,
+            order=order,
+            filter_=filter_
+        )
+
+        datasets[dataset_name] = {
+            **dataset,
+            'data': data,
+            'total': total
+        }
+    # END LOOP
+
+    return {**result, 'data': datasets}
+# END paginate_result
@@ -0,0 +1,228 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import time
+from traceback import print_exc
+from typing import Dict, List, Optional, Tuple
+
+from jose import jwt
+from m4i_analytics.graphs.languages.archimate.ArchimateUtils import \
+    ArchimateUtils
+from m4i_metrics.Metric import Metric
+from m4i_metrics.MetricCategory import MetricCategory
+from m4i_metrics.MetricRunner import iter_metrics
+from m4i_metrics.ViewMembershipIndex import ViewMembershipIndex
+
+from .incremental import get_previous_results
+from .metric_pool import get_metric_pool
+from .report import PROFILE_ALL_METRICS, _format_metric, metrics
+from .result_store import get_stored_result, store_result
+from .view_membership import store_view_membership
+
+# The number of precompute jobs that run at the same time. Every job calculates its metrics on the shared pool of metric processes.
+PRECOMPUTE_WORKERS = 1
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_NOT_STARTED = 'not started'
+
+_executor = None
+
+# The jobs which are queued, running or failed in this process, keyed by project, branch and version.
+# Finished jobs are removed, since their results can be found in the result store.
+_jobs: Dict[Tuple[str, str, int], dict] = {}
+_jobs_lock = Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PRECOMPUTE_WORKERS)
+    # END IF
+    return _executor
+# END _get_executor
+
+
+def _get_job_key(model_options: dict) -> Tuple[str, str, int]:
+    return (
+        model_options['fullProjectName'],
+        model_options['branchName'],
+        model_options['version']
+    )
+# END _get_job_key
+
+
+def _get_metrics() -> List[Metric]:
+    """
+    Returns all metrics in the report, excluding metric categories, since those are summarized on request
+    """
+
+    return [
+        metric for metric in metrics.values()
+        if not issubclass(metric, MetricCategory)
+    ]
+# END _get_metrics
+
+
+def _get_missing_metrics(model_options: dict) -> List[Metric]:
+    """
+    Returns the metrics of which no result is stored yet for the model which matches the given `model_options`
+    """
+
+    return [
+        metric for metric in _get_metrics()
+        if get_stored_result(model_options, metric) is None
+    ]
+# END _get_missing_metrics
+
+
+def _record_error(key: Tuple[str, str, int], name: str, error: str):
+    """
+    Records the given error in the job with the given key. The job dictionaries are shared with status requests, so they are only accessed under the lock.
+    """
+
+    with _jobs_lock:
+        _jobs[key]['errors'][name] = error
+    # END WITH
+# END _record_error
+
+
+def _is_token_expired(access_token: Optional[str]) -> bool:
+    """
+    Returns whether the given access token has expired.
+    The token was verified when the job was queued, so only its expiry time is read here.
+    """
+
+    if access_token is None:
+        return False
+    # END IF
+
+    try:
+        expires_at = jwt.get_unverified_claims(access_token).get('exp')
+    except jwt.JWTError:
+        return False
+    # END TRY
+
+    return expires_at is not None and expires_at <= time()
+# END _is_token_expired
+
+
+def _precompute(model_options: dict):
+    """
+    Calculates all metrics which are not stored yet for the model which matches the given `model_options`, and stores the results.
+    Decomposable metrics of which a result is stored for another version of the same branch are recalculated from it.
+    Metrics which fail are recorded in the job, while the other metrics are stored as usual.
+    The job fails right away if the access token of the user who queued it has expired in the meantime.
+    """
+
+    key = _get_job_key(model_options)
+
+    with _jobs_lock:
+        _jobs[key]['status'] = JOB_RUNNING
+    # END WITH
+
+    try:
+        missing_metrics = _get_missing_metrics(model_options)
+
+        if len(missing_metrics) > 0:
+            if _is_token_expired(model_options.get('access_token')):
+                raise PermissionError(
+                    'The access token expired before the job started. Please queue the job again.')
+            # END IF
+
+            model = ArchimateUtils.load_model_from_repository(**model_options)
+
+            # The view membership is served by the /views route without retrieving the model again
+            store_view_membership(model_options, ViewMembershipIndex(model))
+
+            previous_results = get_previous_results(
+                model_options, missing_metrics, model)
+
+            for metric_id, run in iter_metrics(model, missing_metrics, pool=get_metric_pool(), profile_metrics=PROFILE_ALL_METRICS, previous_results=previous_results):
+                if run['error'] is not None:
+                    _record_error(key, metric_id, run['error'])
+                    continue
+                # END IF
+
+                store_result(model_options, metrics[metric_id], {
+                    'type': 'table',
+                    'data': _format_metric(run['result'])
+                })
+            # END LOOP
+        # END IF
+    except Exception as e:
+        print_exc()
+        _record_error(key, 'job', repr(e))
+    # END TRY
+
+    with _jobs_lock:
+        job = _jobs[key]
+        if len(job['errors']) > 0:
+            job['status'] = JOB_FAILED
+        else:
+            del _jobs[key]
+        # END IF
+    # END WITH
+# END _precompute
+
+
+def get_precompute_status(model_options: dict) -> dict:
+    """
+    Returns the status of precomputing the metrics for the model which matches the given `model_options`.
+
+    The status of a job is only known to the process in which it was queued.
+    For other processes, the status is derived from the results in the store, which is shared.
+
+    :return: The status of the job, the number of stored metric results, the total number of metrics and any errors
+    :rtype: dict
+    """
+
+    total = len(_get_metrics())
+    completed = total - len(_get_missing_metrics(model_options))
+
+    with _jobs_lock:
+        job = _jobs.get(_get_job_key(model_options))
+
+        if job is not None:
+            status, errors = job['status'], dict(job['errors'])
+        elif completed == total:
+            status, errors = JOB_DONE, {}
+        else:
+            status, errors = JOB_NOT_STARTED, {}
+        # END IF
+    # END WITH
+
+    return {
+        'status': status,
+        'completed': completed,
+        'total': total,
+        'errors': errors
+    }
+# END get_precompute_status
+
+
+def enqueue_precompute(model_options: dict) -> dict:
+    """
+    Queues a job which calculates and stores all metrics for the model which matches the given `model_options`.
+    If a job for the same model is already queued or running, no new job is queued. A failed job is retried.
+
+    The job uses the access token in the `model_options` to retrieve the model. If the token expires before the job starts, the job fails and can be queued again.
+
+    :return: The status of the job
+    :rtype: dict
+    """
+
+    key = _get_job_key(model_options)
+
+    with _jobs_lock:
+        job = _jobs.get(key)
+
+        if job is None or job['status'] == JOB_FAILED:
+            _jobs[key] = {'status': JOB_QUEUED, 'errors': {}}
+            _get_executor().submit(_precompute, dict(model_options))
+        # END IF
+    # END WITH
+
+    return get_precompute_status(model_options)
+# END enqueue_precompute
@@ -1,17 +1,17 @@
 import asyncio
 import concurrent
-from json import loads
-from typing import Dict
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from bokeh.embed import json_item
-from bokeh.plotting import Figure
-from flask import request
 from m4i_analytics.graphs.languages.archimate.ArchimateUtils import \
-  ArchimateUtils
-from m4i_analytics.m4i.ApiUtils import ApiUtils
+    ArchimateUtils
+from m4i_analytics.m4i.platform.model.MetricExemption import MetricExemption
 from m4i_analytics.m4i.platform.PlatformApi import PlatformApi
+from m4i_backend_core.utils import TTLCache
+from m4i_metrics.Metric import Metric
 from m4i_metrics.MetricCategory import MetricCategory
 from m4i_metrics.MetricConfig import MetricConfig
+from m4i_metrics.MetricProfiler import get_input_sizes, log_profile, profile
+from m4i_metrics.ModelIndex import ModelIndex
 from m4i_metrics.physical import (DistributionNetworksMetric,
                                   EquipmentAssignedToFacilityMetric,
                                   FacilityRelationsMetric, MaterialFlowMetric,
@@ -29,8 +29,22 @@ from m4i_metrics.structural import (ElementsNotInAnyViewMetric,
 from m4i_metrics.textual import (ConceptLabelFormattingMetric,
                                  LabelAndConceptDuplicationMetric,
                                  TextualMetric)
-from numpy import nan
-from pandas import DataFrame
+
+from .chart import CHART_BOKEH, render_chart
+from .incremental import get_previous_results
+from .result_store import get_stored_result, store_result
+from .serialize import from_columnar, to_columnar
+
+# Project and branch ids are cached for 5 minutes
+PROJECT_AND_BRANCH_CACHE_TTL = 60 * 5  # seconds
+_project_and_branch_ids = TTLCache(PROJECT_AND_BRANCH_CACHE_TTL)
+
+# Set to profile and log every metric calculation, rather than only those for which a profile is requested.
+# Profiling traces memory allocations, which slows down the metrics considerably.
+PROFILE_ALL_METRICS = False
+
+# The profile of a metric of which the result was taken from the result store
+STORED_PROFILE = {'source': 'store'}
 
 # This variable defines the structure of the report
 report = {
@@ -89,9 +103,11 @@ metrics = {
 }
 
 
-def generate_metric(metric_key: str, model_options: dict) -> dict:
+def generate_metric(metric_key: str, model_options: dict, chart_format: str = CHART_BOKEH, profile_metrics: bool = False) -> dict:
     """
     Calculates the metric associated with the given `metric_key` for the model which matches the given `model_options`.
+    The `chart_format` determines how the chart of a metric category is returned. See `render_chart` for the supported formats.
+    If `profile_metrics` is set, the result includes a `_profile` with the measurements of every metric involved, keyed by metric id.
 
     This is the entry point for the `/metric` route.
 
@@ -107,27 +123,31 @@ def generate_metric(metric_key: str, model_options: dict) -> dict:
 
     '''
     We distinguish between metrics and metric categories, which are aggregates of metrics.
-    To calculate a metric category, we make requests to this API to retrieve the submetrics.
-    This enables us to use the same cache that is hit by the front-end.
+    Both are resolved in process. Results of metrics are kept in the result store, which is shared with the `/private/metric` route.
     '''
     if(issubclass(metric, MetricCategory)):
         return _calculate_metric_category(
             metric_category=metric,
-            model_options=model_options
+            model_options=model_options,
+            chart_format=chart_format,
+            profile_metrics=profile_metrics
         )
     else:
-        return _get_metric(
-            metric_name=metric_key,
-            access_token=model_options['access_token'],
-            format_data=False
+        return calculate_metric(
+            metric_key=metric_key,
+            model_options=model_options,
+            profile_metrics=profile_metrics
         )
     # END IF
 # END generate_metric
 
 
-async def calculate_metric(metric_key: str, model_options: dict) -> dict:
+async def calculate_metric(metric_key: str, model_options: dict, profile_metrics: bool = False) -> dict:
     """
     Retrieves the model for the given parameters and resolves the given `metric` based on it.
+    If the result was calculated before for the same model version and metric implementation, returns the stored result instead.
+    If the result was calculated before for another version of the same branch, a decomposable metric is recalculated from it.
+    If `profile_metrics` is set, the result includes a `_profile` with the measurements of the metric, keyed by metric id.
 
     This is the entry point for the `/private/metric` route.
 
@@ -147,7 +167,78 @@ async def calculate_metric(metric_key: str, model_options: dict) -> dict:
             'The given metric key belongs to a metric category')
     # END IF
 
-    # Retrieve the model
+    stored_result = get_stored_result(model_options, metric)
+    if stored_result is not None:
+        if profile_metrics:
+            return {**stored_result, '_profile': {metric.id: STORED_PROFILE}}
+        # END IF
+        return stored_result
+    # END IF
+
+    model = await _load_model(model_options)
+
+    previous_results = get_previous_results(model_options, [metric], model)
+
+    # Calculate the metric result
+    metric_result, measurements = _run_metric(
+        metric, model, profile_metric=profile_metrics, previous_result=previous_results.get(metric.id))
+
+    # Create a JSON serializable result and store it for later requests
+    result = {
+        'type': 'table',
+        'data': _format_metric(metric_result)
+    }
+
+    store_result(model_options, metric, result)
+
+    if profile_metrics:
+        return {**result, '_profile': {metric.id: measurements}}
+    # END IF
+
+    return result
+# END calculate_metric
+
+
+def _run_metric(metric: Metric, model, model_index: Optional[ModelIndex] = None, profile_metric: bool = False, previous_result: Optional[Tuple[dict, list]] = None) -> Tuple[dict, Optional[dict]]:
+    """
+    Calculates the given `metric` for the given model.
+    If a `previous_result` is given, as returned by `get_previous_results`, the metric is recalculated from it. See `Metric.recalculate`.
+    The calculation is profiled and logged if `profile_metric` is set, or if `PROFILE_ALL_METRICS` is set.
+
+    :return: The result of the metric, and its profile if `profile_metric` is set
+    :rtype: Tuple[dict, Optional[dict]]
+    """
+
+    source = 'calculation'
+    if previous_result is None:
+        previous_result = (None, ())
+    else:
+        source = 'recalculation'
+    # END IF
+
+    if not (profile_metric or PROFILE_ALL_METRICS):
+        return metric.recalculate(model, *previous_result, model_index), None
+    # END IF
+
+    with profile(input_sizes=get_input_sizes(model)) as measurements:
+        metric_result = metric.recalculate(
+            model, *previous_result, model_index)
+    # END WITH
+
+    log_profile(metric, measurements)
+
+    return metric_result, ({'source': source, **measurements} if profile_metric else None)
+# END _run_metric
+
+
+async def _load_model(model_options: dict):
+    """
+    Retrieves the model which matches the given `model_options` from the repository
+
+    :return: The model which matches the given `model_options`
+    :rtype: ArchimateModel
+    """
+
     loop = asyncio.get_event_loop()
     with concurrent.futures.ThreadPoolExecutor() as pool:
 
@@ -161,20 +252,103 @@ async def calculate_metric(metric_key: str, model_options: dict) -> dict:
         )
     # END WITH
 
-    # Calculate the metric result
-    metric_result = metric.calculate(model)
+    return model
+# END _load_model
+
+
+def _from_stored_result(stored_result: dict) -> dict:
+    """
+    Turns a stored metric result back into the format of a calculated metric result, with the data of each dataset as a DataFrame
+
+    :return: The metric result with its data as DataFrames
+    :rtype: dict
+    """
 
-    # Return a JSON serializable result
     return {
-        'type': 'table',
-        'data': _format_metric(metric_result)
+        dataset_name: {
+            **dataset,
+            'data': from_columnar(dataset)
+        }
+        for dataset_name, dataset in stored_result['data'].items()
     }
-# END calculate_metric
+# END _from_stored_result
 
 
-async def _calculate_metric_category(metric_category: MetricCategory, model_options: dict) -> dict:
+async def _resolve_metrics(metrics: List[Metric], model_options: dict, profiles: Optional[dict] = None) -> List[dict]:
     """
-    Resolves the given `metric_category`
+    Resolves the given `metrics` for the model which matches the given `model_options`.
+
+    Results are taken from the result store where possible.
+    The model is only retrieved if any of the metrics is missing from the store, and then only once for all missing metrics.
+    Decomposable metrics of which a result is stored for another version of the same branch are recalculated from it.
+    Newly calculated results are added to the store.
+
+    If a `profiles` dictionary is given, the profile of every metric is added to it, keyed by metric id.
+
+    :return: The result of every metric with its data as a DataFrame, in the same order as the given `metrics`
+    :rtype: List[dict]
+    """
+
+    results = {}
+
+    for metric in metrics:
+        stored_result = get_stored_result(model_options, metric)
+        if stored_result is not None:
+            results[metric.id] = _from_stored_result(stored_result)
+            if profiles is not None:
+                profiles[metric.id] = STORED_PROFILE
+            # END IF
+        # END IF
+    # END LOOP
+
+    missing_metrics = [
+        metric for metric in metrics if metric.id not in results
+    ]
+
+    if len(missing_metrics) > 0:
+        model = await _load_model(model_options)
+
+        def calculate_missing_metrics():
+            # Index the model once for all metrics
+            model_index = ModelIndex(model)
+
+            previous_results = get_previous_results(
+                model_options, missing_metrics, model)
+
+            for metric in missing_metrics:
+                metric_result, measurements = _run_metric(
+                    metric, model, model_index, profile_metric=profiles is not None, previous_result=previous_results.get(metric.id))
+
+                if profiles is not None:
+                    profiles[metric.id] = measurements
+                # END IF
+
+                store_result(model_options, metric, {
+                    'type': 'table',
+                    'data': _format_metric(metric_result)
+                })
+
+                results[metric.id] = metric_result
+            # END LOOP
+        # END calculate_missing_metrics
+
+        loop = asyncio.get_event_loop()
+        with concurrent.futures.ThreadPoolExecutor() as pool:
+            await loop.run_in_executor(
+                pool,
+                calculate_missing_metrics
+            )
+        # END WITH
+    # END IF
+
+    return [results[metric.id] for metric in metrics]
+# END _resolve_metrics
+
+
+async def _calculate_metric_category(metric_category: MetricCategory, model_options: dict, chart_format: str = CHART_BOKEH, profile_metrics: bool = False) -> dict:
+    """
+    Resolves the given `metric_category`.
+    If `profile_metrics` is set, the result includes a `_profile` with the measurements of every metric and of the summary, keyed by metric id.
 
     :return: A JSON serializable result for the given `metric_category`
     :rtype: dict
@@ -182,25 +356,21 @@ async def _calculate_metric_category(metric_category: MetricCategory, model_opti
 
     metric_names = [metric.id for metric in metric_category.metrics]
 
+    profiles = {} if profile_metrics else None
+
     # Resolve the metrics and exemptions asynchronously
     def resolve_metrics():
-        return asyncio.gather(*(
-            _get_metric(metric_name, model_options['access_token'])
-            for metric_name in metric_names
-        ))
+        return _resolve_metrics(metric_category.metrics, model_options, profiles)
     # END resolve_metrics
 
     def resolve_exemptions():
-        return asyncio.gather(*(
-            _get_metric_exemptions(
-                project_name=model_options['fullProjectName'],
-                branch_name=model_options['branchName'],
-                version=model_options['version'],
-                metric_name=metric_name,
-                access_token=model_options['access_token']
-            )
-            for metric_name in metric_names
-        ))
+        return _get_metric_exemptions(
+            project_name=model_options['fullProjectName'],
+            branch_name=model_options['branchName'],
+            version=model_options['version'],
+            metric_names=metric_names,
+            access_token=model_options['access_token']
+        )
     # END resolve_exceptions
 
     submetrics, exemptions = await asyncio.gather(
@@ -208,41 +378,72 @@ async def _calculate_metric_category(metric_category: MetricCategory, model_opti
         resolve_exemptions()
     )
 
+    if not (profile_metrics or PROFILE_ALL_METRICS):
+        return _summarize_metric_category(
+            metric_category,
+            submetrics,
+            exemptions,
+            chart_format=chart_format
+        )
+    # END IF
+
+    with profile(input_sizes={'metrics': len(metric_category.metrics)}) as measurements:
+        result = _summarize_metric_category(
+            metric_category,
+            submetrics,
+            exemptions,
+            chart_format=chart_format
+        )
+    # END WITH
+
+    log_profile(metric_category, measurements)
+
+    if profile_metrics:
+        profiles[metric_category.id] = {
+            'source': 'calculation', **measurements}
+        result['_profile'] = profiles
+    # END IF
+
+    return result
+# END _calculate_metric_category
+
+
+def _summarize_metric_category(metric_category: MetricCategory, submetrics: List[dict], exemptions: Dict[str, Dict[str, MetricExemption]], chart_format: str = CHART_BOKEH) -> dict:
+    """
+    Summarizes the given results of the metrics which belong to the given `metric_category`
+
+    :return: A JSON serializable result for the given `metric_category`
+    :rtype: dict
+
+    :param submetrics: The results of the metrics of the category, in the same order as `metric_category.metrics`
+    :type submetrics: List[dict]
+    :param exemptions: The exemptions for every metric keyed by metric name, and then keyed by concept id
+    :type exemptions: Dict[str, Dict[str, MetricExemption]]
+    """
+
     summary = metric_category.summarize(
         submetrics,
-        exemptions
+        [list(exemptions[metric.id].values())
+         for metric in metric_category.metrics]
     )
 
     # Return a JSON serializable result
     return {
         'type': 'chart',
-        'chart': json_item(
-            model=_format_chart(
-                chart=metric_category.create_graph(summary['Summary']['data'])
-            )
+        'chart': render_chart(
+            metric_category,
+            summary['Summary']['data'],
+            chart_format=chart_format
         ),
         'data': _format_metric(metric_result=summary),
     }
-# END _calculate_metric_category
-
-
-def _format_chart(chart: Figure) -> Figure:
-    """
-    Ensures the given `chart` has a responsive layout and does not display the Bokeh logo
-
-    :return: The given `chart` with responsive layout and hidden Bokeh logo
-    :rtype: bokeh.plotting.Figure
-    """
-
-    chart.sizing_mode = 'stretch_both'
-    chart.toolbar.logo = None
-    return chart
-# END _format_chart
+# END _summarize_metric_category
 
 
 def _format_metric(metric_result: Dict[str, Dict[str, MetricConfig]]) -> dict:
     """
-    Turns the given `metric_result` into a JSON serializable format
+    Turns the given `metric_result` into a JSON serializable format.
+    The data of every dataset is in columnar format, see `to_columnar`. Use `to_records` to turn it into records.
 
     :return: A JSON serializable metric result
     :rtype: dict
@@ -251,112 +452,101 @@ def _format_metric(metric_result: Dict[str, Dict[str, MetricConfig]]) -> dict:
     :type metric: Dict[str, Dict[str, MetricConfig]]
     """
 
-    def fmt_data(data: DataFrame):
-        return data.reset_index().reset_index().replace({nan: None}).to_dict(
-            orient="records")
-    # END fmt_data
-
+    # Missing values are kept as NaN, which is serialized as null by `encode_json`
     return {
         key: {
             **value,
             'config': value['config'].__dict__(),
-            'data': fmt_data(value['data'])
+            **to_columnar(value['data'].reset_index().reset_index())
         } for key, value in metric_result.items() if value is not None
     }
 # END _format_metric
 
 
-async def _get_metric_exemptions(project_name: str, branch_name: str, version: int, metric_name: str, access_token: str):
+def _resolve_project_and_branch(project_name: str, branch_name: str, access_token: str) -> Tuple[str, Optional[str]]:
     """
-    This function retrieves the exemptions for the project with the given name, branch with the given name, version and metric.
-
-    Because the exemptions api expects a project id and branch id, this function retrieves the project and branch matching the given names first.
-
-    If the lookup fails for whateve reason, returns an empty list.
+    Looks up the ids of the project and branch with the given names.
+    The ids are cached for a while, since they are needed for every request and rarely change.
+    Whether the user has access to the project is checked separately, so the cache is shared between users.
 
-    :return: A list of exemptions for the given project, branch, version and metric
-    :rtype: Sequence[MetricExemption]
+    :return: The id of the project and the id of the branch, or `None` if the project has no branch with the given name
+    :rtype: Tuple[str, Optional[str]]
     """
 
-    result = []
+    key = (project_name, branch_name)
 
-    project = PlatformApi.retrieve_project(
-        project_name, access_token=access_token)
+    ids = _project_and_branch_ids.get(key)
 
-    branches = PlatformApi.get_branches(project.id, access_token=access_token)
+    if ids is None:
+        project = PlatformApi.retrieve_project(
+            project_name, access_token=access_token)
 
-    branch_with_name = next(
-        (branch for branch in branches if branch.name == branch_name), None)
+        branches = PlatformApi.get_branches(
+            project.id, access_token=access_token)
 
-    if(branch_with_name):
+        branch_with_name = next(
+            (branch for branch in branches if branch.name == branch_name), None)
 
-        loop = asyncio.get_event_loop()
+        ids = (project.id, branch_with_name.id if branch_with_name else None)
 
-        def get_exemptions():
-            return PlatformApi.get_metric_exemptions(
-                project.id,
-                branch_id=branch_with_name.id,
-                metric_name=metric_name,
-                version=version,
-                access_token=access_token
-            )
-        # END get_exemptions
-
-        with concurrent.futures.ThreadPoolExecutor() as pool:
-            result = await loop.run_in_executor(
-                pool,
-                get_exemptions,
-            )
-        # END WITH
+        _project_and_branch_ids.set(key, ids)
     # END IF
 
-    return result
-# END _get_metric_exemptions
+    return ids
+# END _resolve_project_and_branch
 
 
-async def _get_metric(metric_name: str, access_token: str, format_data=True) -> dict:
+async def _get_metric_exemptions(project_name: str, branch_name: str, version: int, metric_names: Iterable[str], access_token: str) -> Dict[str, Dict[str, MetricExemption]]:
     """
-    Retrieves the meric result for the metric with the given name. Makes a local HTTP request to potentially hit the cache.
+    This function retrieves the exemptions for the project with the given name, branch with the given name and version, for all of the given metrics at once.
 
-    :return: The metric result for the metric with the given name as if it was calculated directly by the metric
-    :rtype: dict
+    Because the exemptions api expects a project id and branch id, this function resolves the project and branch matching the given names first.
+    The exemptions of the individual metrics are then retrieved in parallel.
+
+    If there is no branch with the given name, returns no exemptions.
+
+    :return: The exemptions for every metric keyed by metric name, and then keyed by concept id
+    :rtype: Dict[str, Dict[str, MetricExemption]]
     """
 
-    # This builds the request url based on path the original call, ensuring the request always makes it to this server
-    request_path = f'{request.url_root}private/metric'
-    request_args = {**request.args, 'metric': metric_name}
+    metric_names = list(metric_names)
 
     loop = asyncio.get_event_loop()
 
     with concurrent.futures.ThreadPoolExecutor() as pool:
 
-        def get_metric():
-            return ApiUtils.get(
-                request_path,
-                params=request_args,
+        project_id, branch_id = await loop.run_in_executor(
+            pool,
+            _resolve_project_and_branch,
+            project_name,
+            branch_name,
+            access_token
+        )
+
+        if branch_id is None:
+            return {metric_name: {} for metric_name in metric_names}
+        # END IF
+
+        def get_exemptions(metric_name: str):
+            return PlatformApi.get_metric_exemptions(
+                project_id,
+                branch_id=branch_id,
+                metric_name=metric_name,
+                version=version,
                 access_token=access_token
             )
-        # ENd get_metric
+        # END get_exemptions
 
-        metric = await loop.run_in_executor(
-            pool,
-            get_metric
-        )
+        exemptions_per_metric = await asyncio.gather(*(
+            loop.run_in_executor(pool, get_exemptions, metric_name)
+            for metric_name in metric_names
+        ))
     # END WITH
 
-    # Retrieve the metric from the API.
-    metric_json = loads(metric)
-
-    if(format_data):
-        # Parse the retrieved JSON and format the data of each dataset as a DataFrame
-        metric_json = {
-            dataset_name: {
-                **dataset,
-                'data': DataFrame(dataset['data'])
-            }
-            for dataset_name, dataset in metric_json['data'].items()
+    return {
+        metric_name: {
+            exemption.concept_id: exemption for exemption in exemptions
         }
-    # END IF
-
-    return metric_json
-# END _get_metric
+        for metric_name, exemptions in zip(metric_names, exemptions_per_metric)
+    }
+# END _get_metric_exemptions
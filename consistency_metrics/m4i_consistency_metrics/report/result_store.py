@@ -0,0 +1,144 @@
+import zlib
+from json import dumps
+from typing import Optional, Tuple
+
+from m4i_backend_core.utils import DiskCache
+from m4i_metrics.Metric import Metric
+
+from .serialize import decode_json, encode_json
+
+# The results are stored on local disk, so they are shared by all workers on the same machine
+RESULT_STORE_PATH = 'consistency_metrics_results.sqlite'
+RESULT_STORE_MAX_SIZE = 1024 * 1024 * 1024  # bytes = 1 GB
+
+# Identifies the format in which results are stored. Increment whenever the format changes, so previously stored results are no longer used.
+RESULT_FORMAT_VERSION = 2
+
+_result_store = None
+
+
+def get_result_store() -> DiskCache:
+    """
+    Returns the store for metric results. Opens the store on first use.
+
+    :return: The store for metric results
+    :rtype: DiskCache
+    """
+
+    global _result_store
+    if _result_store is None:
+        _result_store = DiskCache(RESULT_STORE_PATH, RESULT_STORE_MAX_SIZE)
+    # END IF
+    return _result_store
+# END get_result_store
+
+
+def get_result_key(model_options: dict, metric: Metric) -> str:
+    """
+    Returns the key under which the result of the given metric is stored for the model which matches the given `model_options`.
+    A version of a model never changes, so the result is identified by project, branch, version and the implementation of the metric.
+    The access token is not part of the key, so a result calculated for one user serves every user.
+
+    :return: The key for the result of the given metric
+    :rtype: str
+    """
+
+    return dumps([
+        model_options['fullProjectName'],
+        model_options['branchName'],
+        model_options['version'],
+        metric.id,
+        metric.implementation_version,
+        RESULT_FORMAT_VERSION
+    ])
+# END get_result_key
+
+
+def _get_latest_version_key(model_options: dict, metric: Metric) -> str:
+    """
+    Returns the key under which the version of the most recently stored result of the given metric is kept for the branch which matches the given `model_options`.
+    Like the results themselves, the key includes the implementation of the metric, so results of another implementation are never reused.
+    """
+
+    return dumps([
+        model_options['fullProjectName'],
+        model_options['branchName'],
+        'latest',
+        metric.id,
+        metric.implementation_version,
+        RESULT_FORMAT_VERSION
+    ])
+# END _get_latest_version_key
+
+
+def get_stored_result(model_options: dict, metric: Metric) -> Optional[dict]:
+    """
+    Retrieves the stored result of the given metric for the model which matches the given `model_options`.
+    Does not check whether the user is authorized to view the model.
+
+    :return: The stored result, or `None` if the result has not been stored
+    :rtype: Optional[dict]
+    """
+
+    stored_result = get_result_store().get(
+        get_result_key(model_options, metric))
+
+    if stored_result is None:
+        return None
+    # END IF
+
+    return decode_json(zlib.decompress(stored_result))
+# END get_stored_result
+
+
+def store_result(model_options: dict, metric: Metric, result: dict):
+    """
+    Stores the given JSON serializable result of the given metric for the model which matches the given `model_options`.
+    """
+
+    result_store = get_result_store()
+
+    result_store.set(
+        get_result_key(model_options, metric),
+        zlib.compress(encode_json(result))
+    )
+
+    result_store.set(
+        _get_latest_version_key(model_options, metric),
+        str(model_options['version']).encode('utf-8')
+    )
+# END store_result
+
+
+def get_previous_result(model_options: dict, metric: Metric) -> Optional[Tuple[int, dict]]:
+    """
+    Retrieves the most recently stored result of the given metric for another version of the branch which matches the given `model_options`.
+    Only results of the same implementation of the metric are considered, since another implementation may produce different results.
+    Does not check whether the user is authorized to view the model.
+
+    :return: The version of the model and the stored result, or `None` if no result is stored for another version of the branch
+    :rtype: Optional[Tuple[int, dict]]
+    """
+
+    latest_version = get_result_store().get(
+        _get_latest_version_key(model_options, metric))
+
+    if latest_version is None:
+        return None
+    # END IF
+
+    version = int(latest_version.decode('utf-8'))
+
+    if version == model_options['version']:
+        return None
+    # END IF
+
+    stored_result = get_stored_result(
+        {**model_options, 'version': version}, metric)
+
+    if stored_result is None:
+        return None
+    # END IF
+
+    return version, stored_result
+# END get_previous_result
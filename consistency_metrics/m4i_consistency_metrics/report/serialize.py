@@ -0,0 +1,113 @@
+from typing import Any
+
+import orjson
+from numpy import generic
+from pandas import DataFrame, isna
+from pandas.api.types import is_scalar
+
+# Numpy arrays and scalars are serialized natively. NaN is serialized as null.
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+FORMAT_RECORDS = 'records'
+FORMAT_COLUMNAR = 'columnar'
+
+
+def _default(value: Any):
+    """
+    Serializes the values which orjson does not support natively, such as pandas timestamps and missing values
+    """
+
+    if is_scalar(value) and isna(value):
+        return None
+    # END IF
+
+    if isinstance(value, generic):
+        return value.item()
+    # END IF
+
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    # END IF
+
+    raise TypeError(f'Type is not JSON serializable: {type(value).__name__}')
+# END _default
+
+
+def encode_json(value: Any) -> bytes:
+    """
+    Serializes the given value as JSON. Keys are not sorted, to preserve the report structure.
+
+    :return: The UTF-8 encoded JSON representation of the given value
+    :rtype: bytes
+    """
+
+    return orjson.dumps(value, default=_default, option=JSON_OPTIONS)
+# END encode_json
+
+
+def decode_json(data: bytes) -> Any:
+    """
+    Parses the given JSON document
+
+    :return: The value represented by the given JSON document
+    :rtype: Any
+    """
+
+    return orjson.loads(data)
+# END decode_json
+
+
+def to_columnar(data: DataFrame) -> dict:
+    """
+    Converts the given dataset into columnar format, straight from the columns of the DataFrame.
+    The result has a `columns` list with the column names, while `data` holds one list of values per column, in the same order.
+    Column names are not repeated for every row, which makes the result considerably smaller for large tables.
+
+    :return: The dataset in columnar format
+    :rtype: dict
+    """
+
+    return {
+        'format': FORMAT_COLUMNAR,
+        'columns': data.columns.tolist(),
+        'data': [data.iloc[:, position].tolist() for position in range(len(data.columns))]
+    }
+# END to_columnar
+
+
+def from_columnar(dataset: dict) -> DataFrame:
+    """
+    Converts the data of the given dataset in columnar format back into a DataFrame
+
+    :return: The data of the dataset
+    :rtype: DataFrame
+    """
+
+    return DataFrame(dict(zip(dataset['columns'], dataset['data'])), columns=dataset['columns'])
+# END from_columnar
+
+
+def to_records(result: dict) -> dict:
+    """
+    Converts every dataset of the given JSON serializable metric result from columnar format into a list of records, which is the default response format.
+    Apply this after pagination, so only the rows on the requested page are converted.
+
+    :return: A copy of the result in records format
+    :rtype: dict
+    """
+
+    datasets = {}
+    for dataset_name, dataset in result['data'].items():
+        columns = dataset['columns']
+
+        datasets[dataset_name] = {
+            **{
+                key: value for key, value in dataset.items()
+                if key not in ['format', 'columns']
+            },
+            'data': [dict(zip(columns, row)) for row in zip(*dataset['data'])]
+        }
+    # END LOOP
+
+    return {**result, 'data': datasets}
+# END to_records
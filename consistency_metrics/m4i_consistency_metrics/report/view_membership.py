@@ -0,0 +1,92 @@
+import zlib
+from json import dumps
+from typing import Dict, Iterable, List, Optional
+
+from m4i_analytics.graphs.languages.archimate.ArchimateUtils import \
+    ArchimateUtils
+from m4i_metrics.ViewMembershipIndex import ViewMembershipIndex
+
+from .result_store import RESULT_FORMAT_VERSION, get_result_store
+from .serialize import decode_json, encode_json
+
+
+def _get_view_membership_key(model_options: dict) -> str:
+    """
+    Returns the key under which the view membership of the model which matches the given `model_options` is stored.
+    A version of a model never changes, so the view membership is identified by project, branch and version.
+    """
+
+    return dumps([
+        model_options['fullProjectName'],
+        model_options['branchName'],
+        model_options['version'],
+        'view_membership',
+        RESULT_FORMAT_VERSION
+    ])
+# END _get_view_membership_key
+
+
+def get_stored_view_membership(model_options: dict) -> Optional[Dict[str, List[str]]]:
+    """
+    Retrieves the stored view membership of the model which matches the given `model_options`.
+    Does not check whether the user is authorized to view the model.
+
+    :return: The ids of the views in which every element occurs, keyed by element id, or `None` if the view membership has not been stored
+    :rtype: Optional[Dict[str, List[str]]]
+    """
+
+    stored_view_membership = get_result_store().get(
+        _get_view_membership_key(model_options))
+
+    if stored_view_membership is None:
+        return None
+    # END IF
+
+    return decode_json(zlib.decompress(stored_view_membership))
+# END get_stored_view_membership
+
+
+def store_view_membership(model_options: dict, view_membership: ViewMembershipIndex) -> Dict[str, List[str]]:
+    """
+    Stores the given view membership index for the model which matches the given `model_options`
+
+    :return: The ids of the views in which every element occurs, keyed by element id
+    :rtype: Dict[str, List[str]]
+    """
+
+    views_by_element = {
+        element_id: sorted(view_ids)
+        for element_id, view_ids in view_membership.views_by_element.items()
+    }
+
+    get_result_store().set(
+        _get_view_membership_key(model_options),
+        zlib.compress(encode_json(views_by_element))
+    )
+
+    return views_by_element
+# END store_view_membership
+
+
+def get_views_containing(model_options: dict, element_ids: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Looks up the views in which the elements with the given ids occur, in the model which matches the given `model_options`.
+    The view membership of a model version is stored on first use, so later lookups do not retrieve the model again.
+
+    :return: The ids of the views in which every given element occurs, keyed by element id. Elements which are not in any view have no views.
+    :rtype: Dict[str, List[str]]
+    """
+
+    views_by_element = get_stored_view_membership(model_options)
+
+    if views_by_element is None:
+        model = ArchimateUtils.load_model_from_repository(**model_options)
+        views_by_element = store_view_membership(
+            model_options, ViewMembershipIndex(model))
+    # END IF
+
+    return {
+        element_id: views_by_element.get(element_id, [])
+        for element_id in element_ids
+    }
+# END get_views_containing
@@ -10,6 +10,8 @@ setup(
         "bokeh",
         "flask",
         "m4i-backend-core",
+        "m4i-compare",
+        "orjson",
         "pandas",
         "requests-cache"
     ],
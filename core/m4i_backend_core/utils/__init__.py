@@ -1 +1,4 @@
-from .index_by_property import index_by_property
\ No newline at end of file
+from .index_by_property import index_by_property
+from .disk_cache import DiskCache
+from .ttl_cache import TTLCache
+from .shared_executor import get_shared_executor
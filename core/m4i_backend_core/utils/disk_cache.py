@@ -0,0 +1,159 @@
+import sqlite3
+from contextlib import closing
+from time import time
+from typing import Optional
+
+# The number of seconds for which the last access time of an entry is not updated again.
+# This saves a write on most reads of frequently used entries, while the eviction order stays accurate to within this time.
+ACCESS_TIME_RESOLUTION = 60
+
+
+class DiskCache(object):
+    """
+    A key-value store for binary values on local disk, backed by a sqlite database.
+
+    The cache can be shared between processes on the same machine, e.g. between the workers of a gunicorn server.
+    Whenever the total size of the stored values exceeds `max_size`, the least recently used entries are evicted.
+    The total size is kept up to date in a separate table, so it does not need to be summed on every write.
+    """
+
+    def __init__(self, path: str, max_size: int):
+        """
+        Creates a new `DiskCache`. Creates the database file if it does not exist yet.
+
+        :param path: The path of the sqlite database file
+        :type path: str
+        :param max_size: The maximum total size of the stored values in bytes
+        :type max_size: int
+        """
+
+        self.path = path
+        self.max_size = max_size
+
+        with closing(self._connect()) as connection, connection:
+            # Write-ahead logging allows readers to continue while another process writes
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, '
+                'value BLOB NOT NULL, '
+                'size INTEGER NOT NULL, '
+                'last_access REAL NOT NULL)'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS meta ('
+                'id INTEGER PRIMARY KEY CHECK (id = 0), '
+                'total_size INTEGER NOT NULL)'
+            )
+            # Databases created before the total size was tracked are summed once
+            connection.execute(
+                'INSERT OR IGNORE INTO meta (id, total_size) '
+                'SELECT 0, COALESCE(SUM(size), 0) FROM entries'
+            )
+        # END WITH
+    # END __init__
+
+    def _connect(self) -> sqlite3.Connection:
+        # Wait for other processes to release their locks, rather than failing right away
+        return sqlite3.connect(self.path, timeout=30)
+    # END _connect
+
+    def _begin_write(self, connection: sqlite3.Connection):
+        # Take the write lock before reading the sizes of existing entries, so the total size stays consistent with concurrent writers
+        connection.execute('BEGIN IMMEDIATE')
+    # END _begin_write
+
+    def _add_to_total_size(self, connection: sqlite3.Connection, difference: int):
+        connection.execute(
+            'UPDATE meta SET total_size = total_size + ? WHERE id = 0', (difference,))
+    # END _add_to_total_size
+
+    def _get_size(self, connection: sqlite3.Connection, key: str) -> int:
+        row = connection.execute(
+            'SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+        return 0 if row is None else row[0]
+    # END _get_size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the value stored for the given key, and marks the entry as recently used.
+        The last access time is only updated if it is older than `ACCESS_TIME_RESOLUTION`, so most reads do not write.
+
+        :return: The value stored for the given key, or `None` if there is no such entry
+        :rtype: Optional[bytes]
+        """
+
+        with closing(self._connect()) as connection, connection:
+            row = connection.execute(
+                'SELECT value, last_access FROM entries WHERE key = ?', (key,)).fetchone()
+
+            if row is None:
+                return None
+            # END IF
+
+            value, last_access = row
+
+            now = time()
+            if now - last_access >= ACCESS_TIME_RESOLUTION:
+                connection.execute(
+                    'UPDATE entries SET last_access = ? WHERE key = ?', (now, key))
+            # END IF
+        # END WITH
+
+        return value
+    # END get
+
+    def set(self, key: str, value: bytes):
+        """
+        Stores the given value for the given key, replacing any existing entry.
+        Afterwards, evicts the least recently used entries until the cache fits within its maximum size.
+        """
+
+        with closing(self._connect()) as connection, connection:
+            self._begin_write(connection)
+            previous_size = self._get_size(connection, key)
+            connection.execute(
+                'INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)',
+                (key, value, len(value), time())
+            )
+            self._add_to_total_size(connection, len(value) - previous_size)
+            self._evict(connection)
+        # END WITH
+    # END set
+
+    def delete(self, key: str):
+        """
+        Removes the entry for the given key, if any
+        """
+
+        with closing(self._connect()) as connection, connection:
+            self._begin_write(connection)
+            self._add_to_total_size(connection, -self._get_size(connection, key))
+            connection.execute('DELETE FROM entries WHERE key = ?', (key,))
+        # END WITH
+    # END delete
+
+    def _evict(self, connection: sqlite3.Connection):
+        total_size, = connection.execute(
+            'SELECT total_size FROM meta WHERE id = 0').fetchone()
+
+        if total_size <= self.max_size:
+            return
+        # END IF
+
+        evicted_keys = []
+        evicted_size = 0
+        for key, size in connection.execute('SELECT key, size FROM entries ORDER BY last_access ASC'):
+            if total_size - evicted_size <= self.max_size:
+                break
+            # END IF
+            evicted_keys.append((key,))
+            evicted_size += size
+        # END LOOP
+
+        connection.executemany('DELETE FROM entries WHERE key = ?', evicted_keys)
+        self._add_to_total_size(connection, -evicted_size)
+    # END _evict
+# END DiskCache
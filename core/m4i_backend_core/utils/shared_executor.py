@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from .. import config
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_shared_executor() -> ThreadPoolExecutor:
+    """
+    Returns the thread pool which is shared by all routes in this process. The pool is created on first use.
+
+    Use the shared pool for I/O bound work, like retrieving models from the repository, so the number of threads per worker stays bounded regardless of the number of concurrent requests.
+    The number of threads is set by `SHARED_EXECUTOR_MAX_WORKERS` in the config.
+
+    :return: The shared thread pool
+    :rtype: ThreadPoolExecutor
+    """
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=config.SHARED_EXECUTOR_MAX_WORKERS,
+                thread_name_prefix='m4i-shared'
+            )
+        # END IF
+        return _executor
+    # END WITH
+# END get_shared_executor
@@ -0,0 +1,65 @@
+from threading import Lock
+from time import monotonic
+from typing import Any, Hashable, Optional
+
+
+class TTLCache(object):
+    """
+    An in-memory key-value store of which the entries expire a fixed number of seconds after they were set.
+    Safe to use from multiple threads.
+    """
+
+    def __init__(self, ttl: float):
+        """
+        Creates a new `TTLCache`
+
+        :param ttl: The number of seconds after which an entry expires
+        :type ttl: float
+        """
+
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = Lock()
+    # END __init__
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns the value stored for the given key
+
+        :return: The value stored for the given key, or `None` if there is no such entry or if it has expired
+        :rtype: Optional[Any]
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+            # END IF
+
+            expires_at, value = entry
+            if expires_at <= monotonic():
+                del self._entries[key]
+                return None
+            # END IF
+
+            return value
+        # END WITH
+    # END get
+
+    def set(self, key: Hashable, value: Any):
+        """
+        Stores the given value for the given key, replacing any existing entry. Also removes all expired entries.
+        """
+
+        with self._lock:
+            now = monotonic()
+
+            self._entries = {
+                entry_key: entry for entry_key, entry in self._entries.items()
+                if entry[0] > now
+            }
+            self._entries[key] = (now + self.ttl, value)
+        # END WITH
+    # END set
+# END TTLCache
@@ -13,6 +13,7 @@ from m4i_analytics.m4i.platform.PlatformApi import PlatformApi
 from m4i_metrics.html_report.create_metric_grid import create_metric_grid
 from m4i_metrics.Metric import Metric
 from m4i_metrics.MetricCategory import MetricCategory
+from m4i_metrics.ModelIndex import ModelIndex
 from m4i_metrics.process.ProcessMetric import ProcessMetric
 from m4i_metrics.structural.StructuralMetric import StructuralMetric
 from m4i_metrics.physical.PhysicalMetric import PhysicalMetric
@@ -39,6 +40,9 @@ auth_options = {
 model = ArchimateUtils.load_model_from_repository(
     **model_options, **auth_options)
 
+# Index the model once, so the metrics do not each have to prepare the model data themselves
+model_index = ModelIndex(model)
+
 
 def load_exemptions(metric_name):
     projectid = f"{model_options['projectOwner']}__{model_options['projectName'].replace(' ', '_')}"
@@ -62,7 +66,7 @@ def load_exemptions(metric_name):
 
 
 def get_metric_data(metric: Metric):
-    metric_results = metric.calculate(model)
+    metric_results = metric.calculate(model, model_index)
 
     exemptions = load_exemptions(metric.label)
 
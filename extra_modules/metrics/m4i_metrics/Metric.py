@@ -1,18 +1,134 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, Iterable, Optional, Set, Tuple
 
 from .MetricConfig import MetricConfig
+from .ModelIndex import ModelIndex
+from .utils import slice_model
+
+
+def _get_flagged_ids(metric_result: Dict[str, dict]) -> Set[str]:
+    """
+    Returns the ids of all concepts which occur in the given metric result, based on the id column of every dataset
+    """
+
+    flagged_ids = set()
+    for dataset in metric_result.values():
+        config = dataset['config']
+        id_column = config.id_column if isinstance(
+            config, MetricConfig) else config.get('id_column')
+
+        data = dataset['data']
+        if id_column is None:
+            continue
+        elif isinstance(data, list):
+            flagged_ids.update(
+                row[id_column] for row in data if id_column in row)
+        elif id_column in data.columns:
+            flagged_ids.update(data[id_column])
+        # END IF
+    # END LOOP
+    return flagged_ids
+# END _get_flagged_ids
 
 
 class Metric(ABC):
     metric_label: str = 'metric'
 
+    implementation_version: str = '1'
+    """
+    Identifies the implementation of this metric. Stored results are only reused for the same implementation version.
+    Inheriting classes should increment this whenever a change to the metric affects its results.
+    """
+
+    is_decomposable: bool = False
+    """
+    Whether every row of this metric depends only on the concept it describes and the concepts close to it.
+    Decomposable metrics can be recalculated for only the concepts affected by a change, see `recalculate`.
+    Inheriting classes which set this to `True` should override `get_sample_sizes`, and `get_affected_concepts` if needed.
+    """
+
     def get_name(self):
         return self.metric_label
     # END get_name
 
     @abstractmethod
-    def calculate(model) -> Dict[str, Dict[str, MetricConfig]]:
+    def calculate(model, model_index: ModelIndex = None) -> Dict[str, Dict[str, MetricConfig]]:
+        """
+        Calculates this metric for the given model.
+
+        When calculating multiple metrics for the same model, create a `ModelIndex` for the model once and pass it to every metric.
+        If no `model_index` is given, the metric creates one itself.
+        """
         pass
     # END calculate
+
+    @classmethod
+    def get_sample_sizes(cls, model) -> Optional[Dict[str, int]]:
+        """
+        Returns the sample size of every dataset of this metric for the given model, keyed by dataset name.
+        Returns `None` by default, in which case `recalculate` calculates the metric in full. Decomposable metrics should override.
+        """
+        return None
+    # END get_sample_sizes
+
+    @classmethod
+    def get_affected_concepts(cls, model, concept_ids: Set[str]) -> Set[str]:
+        """
+        Returns the ids of all concepts in the given model of which the result might change when the concepts with the given ids change.
+        By default, only the given concepts are affected. Inheriting classes can override.
+        """
+        return concept_ids
+    # END get_affected_concepts
+
+    @classmethod
+    def recalculate(cls, model, previous_result: Optional[Dict[str, dict]], differences: Iterable[Tuple[str, str]], model_index: ModelIndex = None) -> Dict[str, Dict[str, MetricConfig]]:
+        """
+        Calculates this metric for the given model, reusing the result of the metric for a previous version of the model.
+
+        The differences between the versions are given as tuples of concept id and difference classification, like those produced by `m4i_compare.logic.compare_concepts`.
+        Every concept which is not 'unchanged' is considered touched.
+
+        Decomposable metrics only recalculate the rows for the touched concepts and the concepts in the previous result, along with the concepts affected by those.
+        All other concepts did not change and were compliant before, so they are still compliant.
+        Metrics which are not decomposable, which do not define their sample sizes, or for which there is no previous result, are calculated in full.
+
+        :return: The result of this metric for the given model
+        :rtype: Dict[str, Dict[str, MetricConfig]]
+
+        :param model: The new version of the model
+        :type model: ArchimateModel
+        :param previous_result: The result of this metric for the previous version of the model
+        :type previous_result: Optional[Dict[str, dict]]
+        :param differences: The differences between the previous and the new version of the model
+        :type differences: Iterable[Tuple[str, str]]
+        :param model_index: The index of the new version of the model. Only used for a full calculation.
+        :type model_index: ModelIndex
+        """
+
+        if not cls.is_decomposable or previous_result is None:
+            return cls.calculate(model, model_index)
+        # END IF
+
+        sample_sizes = cls.get_sample_sizes(model)
+
+        if sample_sizes is None:
+            return cls.calculate(model, model_index)
+        # END IF
+
+        touched_ids = {
+            concept_id for concept_id, difference in differences
+            if difference != 'unchanged'
+        }
+
+        affected_ids = cls.get_affected_concepts(
+            model, touched_ids | _get_flagged_ids(previous_result))
+
+        result = cls.calculate(slice_model(model, affected_ids))
+
+        for dataset_name, dataset in result.items():
+            dataset['sample_size'] = sample_sizes[dataset_name]
+        # END LOOP
+
+        return result
+    # END recalculate
 # END Metric
@@ -11,6 +11,15 @@ from m4i_metrics.MetricConfig import MetricConfig
 
 from .utils.filter_exempted_concepts import filter_exempted_concepts
 
+CHART_TITLE = "Distribution of compliance per concept type"
+
+# The colors of the stacked bars in the summary chart, keyed by the column of the summary data which they represent
+CHART_LEGEND = {
+    'compliant': '#228B22',
+    'exempted': '#718dbf',
+    'non compliant': '#e84d60'
+}
+
 
 def _get_id_column(config):
     if isinstance(config, MetricConfig):
@@ -147,24 +156,18 @@ class MetricCategory(ABC):
 
         p = figure(
             x_range=met_['metric'].to_list(),
-            title="Distribution of compliance per concept type",
+            title=CHART_TITLE,
             toolbar_location=None,
             tools=""
         )
 
-        legend = {
-            'compliant': '#228B22',
-            'exempted': '#718dbf',
-            'non compliant': '#e84d60'
-        }
-
         p.vbar_stack(
-            stackers=list(legend.keys()),
+            stackers=list(CHART_LEGEND.keys()),
             x='metric',
             width=0.9,
-            color=list(legend.values()),
+            color=list(CHART_LEGEND.values()),
             source=data_,
-            legend=["%s " % category for category in legend.keys()]
+            legend=["%s " % category for category in CHART_LEGEND.keys()]
         )
 
         p.y_range.start = 0
@@ -175,4 +178,24 @@ class MetricCategory(ABC):
         return p
     # END of create_graph
 
+    @staticmethod
+    def create_chart_spec(data):
+        """
+        Describes the chart created by `create_graph` without building it, so the chart can be rendered by the client.
+        The heights of the bars are taken from the columns of the summary data listed under `stackers`.
+
+        :return: A JSON serializable description of a stacked bar chart of the given summary data
+        :rtype: dict
+        """
+
+        return {
+            'type': 'stacked_bar',
+            'title': CHART_TITLE,
+            'x': 'metric',
+            'x_range': data['metric'].to_list(),
+            'stackers': list(CHART_LEGEND.keys()),
+            'colors': list(CHART_LEGEND.values())
+        }
+    # END create_chart_spec
+
 # END MetricCategory
@@ -48,4 +48,9 @@ class MetricColumnConfig:
             'isTimestamp': self.isTimestamp
         }
     # END __dict__
+
+    def __reduce__(self):
+        # Since __dict__ is overridden, instances are pickled via their constructor instead, e.g. to send them between processes
+        return (MetricColumnConfig, (self.description, self.displayName, self.isNarrow, self.isStatic, self.isTimestamp))
+    # END __reduce__
 # END MetricDataConfig
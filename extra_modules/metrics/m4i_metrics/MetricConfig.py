@@ -44,15 +44,26 @@ class MetricConfig(object):
         self.id_column = id_column
         self.violation_column = violation_column
         self.docsUrl = docsUrl
+
+        self._serialized = None
     # END __init__
 
     def __dict__(self):
-        return {
-            'data': {key: value.__dict__() for key, value in self.data.items()},
-            'description': self.description,
-            'color_column': self.color_column,
-            'id_column': self.id_column,
-            'docsUrl': self.docsUrl
-        }
+        # Configs are shared by every result of a metric, so they are serialized only once. Callers only read the serialized config, so it is returned as is.
+        if self._serialized is None:
+            self._serialized = {
+                'data': {key: value.__dict__() for key, value in self.data.items()},
+                'description': self.description,
+                'color_column': self.color_column,
+                'id_column': self.id_column,
+                'docsUrl': self.docsUrl
+            }
+        # END IF
+        return self._serialized
     # END __dict__
+
+    def __reduce__(self):
+        # Since __dict__ is overridden, instances are pickled via their constructor instead, e.g. to send them between processes
+        return (MetricConfig, (self.data, self.description, self.color_column, self.id_column, self.violation_column, self.docsUrl))
+    # END __reduce__
 # END MetricConfig
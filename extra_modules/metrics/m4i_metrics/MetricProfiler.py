@@ -0,0 +1,119 @@
+import json
+import logging
+import tracemalloc
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter, thread_time
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger('m4i_metrics.profile')
+
+# Memory tracing is shared by all threads in a process, so it is started by the first active profile and stopped by the last.
+# Tracing which was started elsewhere is left running.
+_tracing_lock = Lock()
+_tracing_count = 0
+_owns_tracing = False
+
+
+def _start_tracing():
+    global _tracing_count, _owns_tracing
+    with _tracing_lock:
+        if _tracing_count == 0:
+            _owns_tracing = not tracemalloc.is_tracing()
+            if _owns_tracing:
+                tracemalloc.start()
+            # END IF
+        # END IF
+        _tracing_count += 1
+    # END WITH
+# END _start_tracing
+
+
+def _stop_tracing():
+    global _tracing_count
+    with _tracing_lock:
+        _tracing_count -= 1
+        if _tracing_count == 0 and _owns_tracing:
+            tracemalloc.stop()
+        # END IF
+    # END WITH
+# END _stop_tracing
+
+
+def get_input_sizes(model) -> Dict[str, int]:
+    """
+    Returns the number of elements, relationships and views in the given model
+
+    :return: The size of every part of the model
+    :rtype: Dict[str, int]
+    """
+
+    return {
+        'elements': len(model.nodes.index),
+        'relationships': len(model.edges.index),
+        'views': len(model.views.index)
+    }
+# END get_input_sizes
+
+
+@contextmanager
+def profile(trace_memory: bool = True, input_sizes: Optional[Dict[str, int]] = None) -> Iterator[dict]:
+    """
+    Measures the code which runs within the context. Yields a dictionary which is filled in when the context exits, even if an exception is raised:
+
+        * `wall_time`: The number of seconds which passed
+        * `cpu_time`: The number of seconds of CPU time used by the current thread
+        * `peak_memory`: The peak size in bytes of the memory traced by `tracemalloc`, or `None` if memory is not traced
+        * `input_sizes`: The given input sizes, if any
+
+    Memory tracing is process wide. If other profiles run in parallel threads, the peak memory includes their allocations as well.
+    Tracing memory slows down the code considerably.
+
+    :param trace_memory: Whether or not to measure the peak memory
+    :type trace_memory: bool
+    :param input_sizes: A description of the size of the input, e.g. as returned by `get_input_sizes`
+    :type input_sizes: Optional[Dict[str, int]]
+    """
+
+    measurements = {}
+
+    if trace_memory:
+        _start_tracing()
+    # END IF
+
+    start_wall_time, start_cpu_time = perf_counter(), thread_time()
+
+    try:
+        yield measurements
+    finally:
+        measurements['wall_time'] = perf_counter() - start_wall_time
+        measurements['cpu_time'] = thread_time() - start_cpu_time
+        measurements['peak_memory'] = None
+
+        if trace_memory:
+            _, measurements['peak_memory'] = tracemalloc.get_traced_memory()
+            _stop_tracing()
+        # END IF
+
+        if input_sizes is not None:
+            measurements['input_sizes'] = input_sizes
+        # END IF
+    # END TRY
+# END profile
+
+
+def log_profile(metric, measurements: dict):
+    """
+    Logs the given measurements of the given metric as a single JSON object, so they can be aggregated by a log collector.
+    Messages are logged at INFO level to the `m4i_metrics.profile` logger.
+    """
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({
+            'event': 'metric_profile',
+            'metric': metric.id,
+            'name': metric.__name__,
+            **measurements
+        }))
+    # END IF
+# END log_profile
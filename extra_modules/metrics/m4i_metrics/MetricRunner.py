@@ -0,0 +1,350 @@
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from time import perf_counter
+from uuid import uuid4
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from m4i_analytics.graphs.languages.archimate.ArchimateUtils import \
+    ArchimateUtils
+
+from .MetricCategory import MetricCategory
+from .MetricProfiler import get_input_sizes, log_profile, profile
+from .ModelIndex import ModelIndex
+
+# The model and model index of the current worker process, along with the key of the run they belong to. Set by `_load_worker_model`.
+_worker_model_key = None
+_worker_model = None
+_worker_model_index = None
+
+
+def serialize_model(model) -> bytes:
+    """
+    Serializes the given model into a compact form which can be shared with worker processes
+
+    :return: The compressed JSON representation of the model
+    :rtype: bytes
+    """
+
+    return zlib.compress(ArchimateUtils.to_JSON(model).encode('utf-8'))
+# END serialize_model
+
+
+def deserialize_model(serialized_model: bytes):
+    """
+    Restores a model which was serialized with `serialize_model`
+
+    :return: The deserialized model
+    :rtype: ArchimateModel
+    """
+
+    return ArchimateUtils.load_model(zlib.decompress(serialized_model).decode('utf-8'))
+# END deserialize_model
+
+
+def create_metric_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Creates a pool of worker processes on which metrics can be calculated, see `iter_metrics`.
+
+    Starting the worker processes takes a while, so create the pool once per process and reuse it, rather than creating a pool per request.
+    The processes are started with the 'spawn' method, so they do not inherit the threads or the monkey patching of the parent process, e.g. of a gevent server.
+    The processes are started when the first metric is submitted, not when the pool is created.
+
+    :return: The pool of worker processes
+    :rtype: ProcessPoolExecutor
+
+    :param max_workers: The maximum number of worker processes. Defaults to the number of processors.
+    :type max_workers: Optional[int]
+    """
+
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=get_context('spawn')
+    )
+# END create_metric_pool
+
+
+def _load_worker_model(model_key: str, serialized_model: bytes):
+    """
+    Loads the model of the given run in the current worker process, unless it is loaded already.
+    Only the model of the latest run is kept, since runs usually follow each other.
+    """
+
+    global _worker_model_key, _worker_model, _worker_model_index
+    if _worker_model_key != model_key:
+        _worker_model = deserialize_model(serialized_model)
+        _worker_model_index = None
+        _worker_model_key = model_key
+    # END IF
+# END _load_worker_model
+
+
+def _calculate(metric, model, model_index: ModelIndex, profile_metric: bool = False, previous_result: Optional[Tuple[dict, list]] = None) -> dict:
+    """
+    Calculates the given metric and measures how long it takes.
+    If a `previous_result` is given, as a tuple of the result of the metric for a previous version of the model and the differences since, the metric is recalculated from it. See `Metric.recalculate`.
+    If the metric raises an exception, the error is recorded instead of a result.
+    If `profile_metric` is set, the metric is profiled as well. See `MetricProfiler.profile` for a description of the measurements.
+
+    :return: The result of the metric, its wall time in seconds, the error if any and the profile if requested
+    :rtype: dict
+    """
+
+    if previous_result is None:
+        previous_result = (None, ())
+    # END IF
+
+    measurements = None
+    start = perf_counter()
+    try:
+        if profile_metric:
+            with profile(input_sizes=get_input_sizes(model)) as measurements:
+                result = metric.recalculate(
+                    model, *previous_result, model_index)
+            # END WITH
+        else:
+            result = metric.recalculate(model, *previous_result, model_index)
+        # END IF
+        error = None
+    except Exception as e:
+        result, error = None, repr(e)
+    # END TRY
+
+    run = {
+        'result': result,
+        'wall_time': perf_counter() - start,
+        'error': error
+    }
+
+    if profile_metric:
+        run['profile'] = measurements
+    # END IF
+
+    return run
+# END _calculate
+
+
+def _run_in_worker(model_key: str, serialized_model: bytes, metric, profile_metric: bool = False, previous_result: Optional[Tuple[dict, list]] = None) -> Tuple[str, dict]:
+    """
+    Calculates the given metric for the model of the given run, which is loaded in the current worker process on first use
+    """
+
+    global _worker_model_index
+    _load_worker_model(model_key, serialized_model)
+    if _worker_model_index is None:
+        _worker_model_index = ModelIndex(_worker_model)
+    # END IF
+    return metric.id, _calculate(metric, _worker_model, _worker_model_index, profile_metric, previous_result)
+# END _run_in_worker
+
+
+def resolve_metrics(metrics: Union[Iterable[type], Dict[str, Dict[str, str]]], registry: Optional[Dict[str, type]] = None) -> Tuple[List[type], List[type]]:
+    """
+    Determines which metrics should be calculated, and which metric categories should be summarized.
+    Metric categories are expanded into the metrics which belong to them.
+
+    :return: The metrics and the metric categories, each in order of first occurrence and without duplicates
+    :rtype: Tuple[List[type], List[type]]
+
+    :param metrics: Either a list of `Metric` and `MetricCategory` classes, or a report structure of category names to metric names to metric ids
+    :type metrics: Union[Iterable[type], Dict[str, Dict[str, str]]]
+    :param registry: The metric classes by metric id. Required when passing a report structure.
+    :type registry: Optional[Dict[str, type]]
+    """
+
+    if isinstance(metrics, dict):
+        if registry is None:
+            raise ValueError(
+                'A registry of metrics is required to resolve a report structure')
+        # END IF
+        metrics = [
+            registry[metric_id]
+            for category in metrics.values()
+            for metric_id in category.values()
+        ]
+    # END IF
+
+    resolved_metrics = {}
+    resolved_categories = {}
+
+    for metric in metrics:
+        if issubclass(metric, MetricCategory):
+            resolved_categories[metric.id] = metric
+            for submetric in metric.metrics:
+                resolved_metrics.setdefault(submetric.id, submetric)
+            # END LOOP
+        else:
+            resolved_metrics.setdefault(metric.id, metric)
+        # END IF
+    # END LOOP
+
+    return list(resolved_metrics.values()), list(resolved_categories.values())
+# END resolve_metrics
+
+
+def iter_metrics(model, metrics: Union[Iterable[type], Dict[str, Dict[str, str]]], registry: Optional[Dict[str, type]] = None, exemptions: Optional[Dict[str, list]] = None, pool: Optional[ProcessPoolExecutor] = None, profile_metrics: bool = False, previous_results: Optional[Dict[str, Tuple[dict, list]]] = None) -> Iterator[Tuple[str, dict]]:
+    """
+    Calculates the given metrics for the given model, and yields every result as soon as it is available.
+
+    If a pool is given, metrics are calculated in parallel on its worker processes. The model is serialized once, and loaded by every worker on its first metric.
+    Otherwise, metrics are calculated one after the other in the current process.
+    A metric category is summarized as soon as all of its metrics are calculated.
+
+    Every result is a dictionary with the following keys:
+
+        * `result`: The output of the metric, or the summary of the metric category
+        * `wall_time`: The number of seconds it took to calculate the metric or summarize the category
+        * `error`: A description of the exception raised by the metric, or `None`
+        * `profile`: The measurements of the metric, if `profile_metrics` is set. See `MetricProfiler.profile` for a description of the measurements.
+
+    A metric category of which any metric failed is not summarized, since the summary would report the failed metric as compliant.
+    Its `result` is `None` and its `error` names the failed metrics instead.
+    Profiles are logged via `MetricProfiler.log_profile` as well.
+    Metrics for which a previous result is given are recalculated from it via `Metric.recalculate`, rather than calculated in full.
+
+    :return: Tuples of metric id and result, in order of completion
+    :rtype: Iterator[Tuple[str, dict]]
+
+    :param model: The model for which to calculate the metrics
+    :type model: ArchimateModel
+    :param metrics: Either a list of `Metric` and `MetricCategory` classes, or a report structure of category names to metric names to metric ids
+    :type metrics: Union[Iterable[type], Dict[str, Dict[str, str]]]
+    :param registry: The metric classes by metric id. Required when passing a report structure.
+    :type registry: Optional[Dict[str, type]]
+    :param exemptions: The exemptions for every metric, keyed by metric id. Used to summarize metric categories.
+    :type exemptions: Optional[Dict[str, list]]
+    :param pool: The worker processes on which to calculate the metrics, as created by `create_metric_pool`
+    :type pool: Optional[ProcessPoolExecutor]
+    :param profile_metrics: Whether or not to profile every metric and metric category
+    :type profile_metrics: bool
+    :param previous_results: The result of a metric for a previous version of the model and the differences between that version and the given model, keyed by metric id
+    :type previous_results: Optional[Dict[str, Tuple[dict, list]]]
+    """
+
+    if exemptions is None:
+        exemptions = {}
+    # END IF
+
+    if previous_results is None:
+        previous_results = {}
+    # END IF
+
+    metrics, categories = resolve_metrics(metrics, registry)
+
+    results = {}
+    pending_categories = list(categories)
+
+    def complete(metric, run: dict) -> Tuple[str, dict]:
+        if run.get('profile') is not None:
+            log_profile(metric, run['profile'])
+        # END IF
+        return metric.id, run
+    # END complete
+
+    def summarize(category) -> dict:
+        return category.summarize(
+            [results[metric.id]['result']
+             for metric in category.metrics],
+            [exemptions.get(metric.id, [])
+             for metric in category.metrics]
+        )
+    # END summarize
+
+    def summarize_completed_categories():
+        for category in list(pending_categories):
+            if all(metric.id in results for metric in category.metrics):
+                pending_categories.remove(category)
+
+                failed_metrics = [
+                    metric.__name__ for metric in category.metrics
+                    if results[metric.id]['error'] is not None
+                ]
+
+                if len(failed_metrics) > 0:
+                    run = {
+                        'result': None,
+                        'wall_time': 0.0,
+                        'error': f'Not summarized, since these metrics failed: {", ".join(failed_metrics)}'
+                    }
+                    if profile_metrics:
+                        run['profile'] = None
+                    # END IF
+                    yield complete(category, run)
+                    continue
+                # END IF
+
+                start = perf_counter()
+                run = {'error': None}
+                if profile_metrics:
+                    with profile(input_sizes={'metrics': len(category.metrics)}) as measurements:
+                        run['result'] = summarize(category)
+                    # END WITH
+                    run['profile'] = measurements
+                else:
+                    run['result'] = summarize(category)
+                # END IF
+                run['wall_time'] = perf_counter() - start
+
+                yield complete(category, run)
+            # END IF
+        # END LOOP
+    # END summarize_completed_categories
+
+    # Categories without metrics can be summarized right away
+    yield from summarize_completed_categories()
+
+    if pool is None:
+        model_index = ModelIndex(model)
+        for metric in metrics:
+            results[metric.id] = _calculate(
+                metric, model, model_index, profile_metrics, previous_results.get(metric.id))
+            yield complete(metric, results[metric.id])
+            yield from summarize_completed_categories()
+        # END LOOP
+        return
+    # END IF
+
+    # The pool outlives this run, so every task refers to the model by a key which is unique to this run
+    model_key = uuid4().hex
+    serialized_model = serialize_model(model)
+
+    futures = {
+        pool.submit(_run_in_worker, model_key, serialized_model, metric, profile_metrics, previous_results.get(metric.id)): metric
+        for metric in metrics
+    }
+
+    try:
+        for future in as_completed(futures):
+            metric_id, result = future.result()
+            results[metric_id] = result
+            yield complete(futures[future], result)
+            yield from summarize_completed_categories()
+        # END LOOP
+    finally:
+        # Free the pool for other runs if this run is abandoned, e.g. when a client disconnects
+        for future in futures:
+            future.cancel()
+        # END LOOP
+    # END TRY
+# END iter_metrics
+
+
+def run_metrics(model, metrics: Union[Iterable[type], Dict[str, Dict[str, str]]], registry: Optional[Dict[str, type]] = None, exemptions: Optional[Dict[str, list]] = None, pool: Optional[ProcessPoolExecutor] = None, profile_metrics: bool = False, previous_results: Optional[Dict[str, Tuple[dict, list]]] = None) -> Dict[str, dict]:
+    """
+    Calculates the given metrics for the given model, and returns all results at once.
+    See `iter_metrics` for a description of the parameters and of the result format.
+
+    :return: The result of every metric and metric category, keyed by metric id
+    :rtype: Dict[str, dict]
+    """
+
+    return dict(iter_metrics(
+        model,
+        metrics,
+        registry=registry,
+        exemptions=exemptions,
+        pool=pool,
+        profile_metrics=profile_metrics,
+        previous_results=previous_results
+    ))
+# END run_metrics
@@ -0,0 +1,221 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .RelationshipRules import evaluate_relationship_rules
+from .ViewMembershipIndex import ViewMembershipIndex
+
+
+def _group_positions(keys: np.ndarray) -> Dict[int, List[int]]:
+    """
+    Groups the positions of the given keys by key value.
+
+    :return: A dictionary of every key value and the positions at which it occurs, in ascending order
+    :rtype: Dict[int, List[int]]
+    """
+
+    groups = {}
+    for position, key in enumerate(keys.tolist()):
+        groups.setdefault(key, []).append(position)
+    # END LOOP
+    return groups
+# END _group_positions
+
+
+class ModelIndex(object):
+    """
+    A precomputed representation of the nodes and edges of an `ArchimateModel`, which can be shared between metrics.
+
+    Building the index once per model avoids that every metric copies the nodes and edges of the model, resolves the type names of all concepts and joins the relationships with their source and target elements.
+
+    Every node and relationship is assigned an integer code, which is its position in `elems` and `rels` respectively.
+    Type names are assigned an integer code as well, which is their position in `type_names`.
+    """
+
+    elems: pd.DataFrame
+    """
+    The elements of the model with the columns `id`, `name` and `type_`
+    """
+
+    rels: pd.DataFrame
+    """
+    The relationships of the model with the columns `id`, `source`, `target` and `type_`
+    """
+
+    type_agg: pd.DataFrame
+    """
+    The relationships of the model joined with their source and target elements.
+    Has the columns `id_src`, `name_src`, `type_src`, `id_rel`, `type_rel`, `id_tgt`, `name_tgt` and `type_tgt`.
+    Relationships which do not connect two elements are not included.
+    """
+
+    node_codes: Dict[str, int]
+    """
+    The integer code of every node, keyed by node id
+    """
+
+    type_names: pd.Index
+    """
+    The type names of all concepts in the model. The position of a type name is its type code.
+    """
+
+    node_type_codes: np.ndarray
+    """
+    The type code of every node, by node code
+    """
+
+    edge_type_codes: np.ndarray
+    """
+    The type code of every relationship, by relationship code
+    """
+
+    type_agg_source_codes: np.ndarray
+    """
+    The node code of the source element of every row in `type_agg`
+    """
+
+    type_agg_target_codes: np.ndarray
+    """
+    The node code of the target element of every row in `type_agg`
+    """
+
+    outgoing: Dict[int, List[int]]
+    """
+    The positions of the rows in `type_agg` which start at a node, keyed by node code
+    """
+
+    incoming: Dict[int, List[int]]
+    """
+    The positions of the rows in `type_agg` which end at a node, keyed by node code
+    """
+
+    def __init__(self, model):
+        """
+        Creates a new `ModelIndex` for the given model
+
+        :param model: The model for which to build the index
+        :type model: ArchimateModel
+        """
+
+        elems = model.nodes[['id', 'name']].copy()
+        elems['type_'] = model.nodes['type'].apply(lambda x: x['typename'])
+
+        rels = model.edges[['id', 'source', 'target']].copy()
+        rels['type_'] = model.edges['type'].apply(lambda x: x['typename'])
+
+        type_agg = elems.merge(
+            rels, how='inner', left_on='id', right_on='source')
+        type_agg.rename(columns={'id_x': 'id_src', 'name': 'name_src',
+                                 'type__x': 'type_src', 'id_y': 'id_rel', 'type__y': 'type_rel'}, inplace=True)
+        type_agg = type_agg.merge(
+            elems, how='inner', left_on='target', right_on='id')
+        type_agg.rename(
+            columns={'id': 'id_tgt', 'name': 'name_tgt', 'type_': 'type_tgt'}, inplace=True)
+        type_agg = type_agg[['id_src', 'name_src', 'type_src',
+                             'id_rel', 'type_rel', 'id_tgt', 'name_tgt', 'type_tgt']]
+
+        self.elems = elems
+        self.rels = rels
+        self.type_agg = type_agg
+
+        self.node_codes = dict(zip(elems['id'], range(len(elems.index))))
+
+        self.type_names = pd.Index(
+            sorted(set(elems['type_']) | set(rels['type_']))
+        )
+        self.node_type_codes = self.type_names.get_indexer(elems['type_'])
+        self.edge_type_codes = self.type_names.get_indexer(rels['type_'])
+
+        self.type_agg_source_codes = type_agg['id_src'].map(
+            self.node_codes).to_numpy(dtype=np.int64)
+        self.type_agg_target_codes = type_agg['id_tgt'].map(
+            self.node_codes).to_numpy(dtype=np.int64)
+
+        self.outgoing = _group_positions(self.type_agg_source_codes)
+        self.incoming = _group_positions(self.type_agg_target_codes)
+
+        self._model = model
+        self._view_membership = None
+        self._rule_matches = None
+    # END __init__
+
+    @property
+    def view_membership(self) -> ViewMembershipIndex:
+        """
+        The views in which every element of the model occurs. Built on first access, since only some metrics need it.
+        """
+
+        if self._view_membership is None:
+            self._view_membership = ViewMembershipIndex(self._model)
+        # END IF
+        return self._view_membership
+    # END view_membership
+
+    @property
+    def rule_matches(self) -> pd.DataFrame:
+        """
+        The rules in `RelationshipRules.RELATIONSHIP_RULES` which apply to every relationship in `type_agg`, as returned by `evaluate_relationship_rules`.
+        All rules are evaluated together on first access, and shared by the metrics which check them.
+        """
+
+        if self._rule_matches is None:
+            self._rule_matches = evaluate_relationship_rules(self)
+        # END IF
+        return self._rule_matches
+    # END rule_matches
+
+    def get_type_code(self, typename: str) -> int:
+        """
+        Returns the type code for the given type name, or -1 if no concept of that type occurs in the model
+
+        :return: The type code for the given type name
+        :rtype: int
+        """
+
+        return self.type_names.get_indexer([typename])[0]
+    # END get_type_code
+
+    def get_nodes_of_type(self, *typenames: str) -> pd.DataFrame:
+        """
+        Returns the elements with any of the given type names
+
+        :return: The elements with any of the given type names
+        :rtype: pandas.DataFrame
+        """
+
+        return self.elems[self.elems['type_'].isin(typenames)]
+    # END get_nodes_of_type
+
+    def get_relationships_between(self, source_types, target_types) -> pd.DataFrame:
+        """
+        Returns the rows of `type_agg` for which the source element has any of the given source types, and the target element has any of the given target types
+
+        :return: The relationships between elements of the given types
+        :rtype: pandas.DataFrame
+        """
+
+        return self.type_agg[
+            self.type_agg['type_src'].isin(source_types)
+            & self.type_agg['type_tgt'].isin(target_types)
+        ]
+    # END get_relationships_between
+
+    def get_rule_violations(self, rule_name: str) -> Tuple[int, pd.DataFrame]:
+        """
+        Checks the relationships of the model against the rules with the given name in `RelationshipRules.RELATIONSHIP_RULES`.
+        A relationship to which multiple of the rules apply is invalid if any of them considers it invalid.
+
+        :return: The number of relationships to which the rules apply, and the rows of `type_agg` which violate them, with a fresh index so positions in `type_agg` do not end up in results
+        :rtype: Tuple[int, pandas.DataFrame]
+        """
+
+        matches = self.rule_matches[self.rule_matches['rule'] == rule_name]
+
+        sample_size = len(matches['position'].unique())
+        invalid_positions = np.unique(
+            matches['position'][~matches['is_valid']].to_numpy())
+
+        return sample_size, self.type_agg.iloc[invalid_positions].reset_index(drop=True)
+    # END get_rule_violations
+# END ModelIndex
@@ -0,0 +1,365 @@
+from itertools import product
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from m4i_analytics.graphs.languages.archimate.metamodel.Concepts import (
+    ElementType, RelationshipType)
+
+
+class RelationshipRule(object):
+    """
+    Describes which types of relationships are allowed between elements of given types.
+
+    A rule applies to every relationship of which the source element has any of the `source_types`, the target element has any of the `target_types` and the relationship has any of the `relationship_types`.
+    A relationship to which the rule applies is valid if its type is allowed and not forbidden.
+    """
+
+    name: str
+    source_types: Optional[List[str]]
+    target_types: Optional[List[str]]
+    relationship_types: Optional[List[str]]
+    allowed: Optional[List[str]]
+    forbidden: List[str]
+    bidirectional: bool
+
+    def __init__(
+        self,
+        name: str,
+        source_types: Optional[Iterable[str]] = None,
+        target_types: Optional[Iterable[str]] = None,
+        relationship_types: Optional[Iterable[str]] = None,
+        allowed: Optional[Iterable[str]] = None,
+        forbidden: Iterable[str] = (),
+        bidirectional: bool = False
+    ):
+        """
+        Creates a new `RelationshipRule`
+
+        :param name: The name by which metrics look up the violations of this rule. Multiple rules can share a name, in which case a relationship is valid only if it is valid for all of them.
+        :type name: str
+        :param source_types: The type names of the source elements to which the rule applies. Applies to any element type if `None`.
+        :type source_types: Optional[Iterable[str]]
+        :param target_types: The type names of the target elements to which the rule applies. Applies to any element type if `None`.
+        :type target_types: Optional[Iterable[str]]
+        :param relationship_types: The type names of the relationships to which the rule applies. Applies to any relationship type if `None`.
+        :type relationship_types: Optional[Iterable[str]]
+        :param allowed: The type names of the relationships which are valid. Any type is allowed if `None`.
+        :type allowed: Optional[Iterable[str]]
+        :param forbidden: The type names of the relationships which are never valid
+        :type forbidden: Iterable[str]
+        :param bidirectional: Whether the rule also applies to relationships from the target types to the source types
+        :type bidirectional: bool
+        """
+
+        self.name = name
+        self.source_types = None if source_types is None else list(source_types)
+        self.target_types = None if target_types is None else list(target_types)
+        self.relationship_types = None if relationship_types is None else list(
+            relationship_types)
+        self.allowed = None if allowed is None else list(allowed)
+        self.forbidden = list(forbidden)
+        self.bidirectional = bidirectional
+    # END __init__
+
+    def get_type_pairs(self) -> List[Tuple[str, str]]:
+        """
+        Returns the source type name and target type name of every pair of elements to which this rule applies.
+        Only available if the source and target types are given.
+
+        :return: The pairs of element types to which this rule applies
+        :rtype: List[Tuple[str, str]]
+        """
+
+        if self.source_types is None or self.target_types is None:
+            raise ValueError(
+                f'Rule {self.name} applies to any element type')
+        # END IF
+
+        type_pairs = list(product(self.source_types, self.target_types))
+
+        if self.bidirectional:
+            type_pairs += [(target, source) for source, target in type_pairs]
+        # END IF
+
+        return list(dict.fromkeys(type_pairs))
+    # END get_type_pairs
+# END RelationshipRule
+
+
+BUSINESS_LAYER = [
+    ElementType.BUSINESS_ACTOR['typename'], ElementType.BUSINESS_ROLE['typename'],
+    ElementType.BUSINESS_COLLABORATION['typename'], ElementType.BUSINESS_INTERFACE['typename'],
+    ElementType.BUSINESS_PROCESS['typename'], ElementType.BUSINESS_FUNCTION['typename'],
+    ElementType.BUSINESS_INTERACTION['typename'], ElementType.BUSINESS_EVENT['typename'],
+    ElementType.BUSINESS_SERVICE['typename'], ElementType.BUSINESS_OBJECT['typename'],
+    ElementType.CONTRACT['typename'], ElementType.REPRESENTATION['typename'],
+    ElementType.PRODUCT['typename']
+]
+
+APPLICATION_LAYER = [
+    ElementType.APPLICATION_COMPONENT['typename'], ElementType.APPLICATION_COLLABORATION['typename'],
+    ElementType.APPLICATION_INTERFACE['typename'], ElementType.APPLICATION_FUNCTION['typename'],
+    ElementType.APPLICATION_INTERACTION['typename'], ElementType.APPLICATION_PROCESS['typename'],
+    ElementType.APPLICATION_EVENT['typename'], ElementType.APPLICATION_SERVICE['typename'],
+    ElementType.DATA_OBJECT['typename']
+]
+
+TECHNOLOGY_LAYER = [
+    ElementType.NODE['typename'], ElementType.DEVICE['typename'],
+    ElementType.SYSTEM_SOFTWARE['typename'], ElementType.TECHNOLOGY_COLLABORATION['typename'],
+    ElementType.TECHNOLOGY_INTERFACE['typename'], ElementType.PATH['typename'],
+    ElementType.COMMUNICATION_NETWORK['typename'], ElementType.TECHNOLOGY_FUNCTION['typename'],
+    ElementType.TECHNOLOGY_PROCESS['typename'], ElementType.TECHNOLOGY_INTERACTION['typename'],
+    ElementType.TECHNOLOGY_EVENT['typename'], ElementType.TECHNOLOGY_SERVICE['typename'],
+    ElementType.ARTIFACT['typename']
+]
+
+PHYSICAL_LAYER = [
+    ElementType.EQUIPMENT['typename'], ElementType.FACILITY['typename'],
+    ElementType.DISTRIBUTION_NETWORK['typename'], ElementType.MATERIAL['typename']
+]
+
+JUNCTIONS = [
+    ElementType.OR_JUNCTION['typename'], ElementType.AND_JUNCTION['typename']
+]
+
+PROCESS_TYPES = [
+    ElementType.BUSINESS_PROCESS['typename'],
+    ElementType.APPLICATION_PROCESS['typename'],
+    ElementType.TECHNOLOGY_PROCESS['typename']
+]
+
+EVENT_TYPES = [
+    ElementType.BUSINESS_EVENT['typename'],
+    ElementType.APPLICATION_EVENT['typename'],
+    ElementType.TECHNOLOGY_EVENT['typename']
+]
+
+RELATIONSHIP_RULES: List[RelationshipRule] = [
+    RelationshipRule(
+        name='facility_relations',
+        source_types=[ElementType.FACILITY['typename']],
+        target_types=[ElementType.FACILITY['typename']],
+        # specialization between similar-type nodes is allowed always
+        allowed=[RelationshipType.AGGREGATION['typename'], RelationshipType.COMPOSITION['typename'],
+                 RelationshipType.REALIZATION['typename'], RelationshipType.SPECIALIZATION['typename']]
+    ),
+    RelationshipRule(
+        name='equipment_assigned_to_facility',
+        source_types=[ElementType.EQUIPMENT['typename']],
+        target_types=[ElementType.FACILITY['typename']],
+        allowed=[RelationshipType.ASSIGNMENT['typename']],
+        bidirectional=True
+    ),
+    RelationshipRule(
+        name='distribution_networks',
+        source_types=[ElementType.DISTRIBUTION_NETWORK['typename']],
+        target_types=[ElementType.DISTRIBUTION_NETWORK['typename']],
+        allowed=[RelationshipType.AGGREGATION['typename'], RelationshipType.COMPOSITION['typename'],
+                 RelationshipType.FLOW['typename'], RelationshipType.TRIGGERING['typename'],
+                 RelationshipType.SPECIALIZATION['typename']]
+    ),
+    RelationshipRule(
+        name='material_flow',
+        source_types=[ElementType.FACILITY['typename']],
+        target_types=PROCESS_TYPES,
+        forbidden=[RelationshipType.TRIGGERING['typename']],
+        bidirectional=True
+    ),
+    # these relationship-checks go one direction only,
+    # because assignment is only possible using this direction in Archi
+    RelationshipRule(
+        name='actor_and_role_assignment',
+        source_types=[ElementType.BUSINESS_ACTOR['typename']],
+        target_types=[ElementType.BUSINESS_ROLE['typename']],
+        allowed=[RelationshipType.ASSIGNMENT['typename']]
+    ),
+    RelationshipRule(
+        name='actor_and_role_assignment',
+        source_types=[ElementType.BUSINESS_ACTOR['typename'],
+                      ElementType.BUSINESS_ROLE['typename']],
+        target_types=[ElementType.BUSINESS_PROCESS['typename'],
+                      ElementType.BUSINESS_FUNCTION['typename']],
+        allowed=[RelationshipType.ASSIGNMENT['typename']]
+    ),
+    *(
+        RelationshipRule(
+            name='event_triggers_process',
+            source_types=[event_type],
+            target_types=[process_type],
+            allowed=[RelationshipType.TRIGGERING['typename']],
+            bidirectional=True
+        )
+        for event_type, process_type in zip(EVENT_TYPES, PROCESS_TYPES)
+    ),
+    # Processes are only compared to processes of the same layer
+    *(
+        RelationshipRule(
+            name='process_sequence',
+            source_types=[process_type],
+            target_types=[process_type],
+            # specialization between similar-type nodes is allowed always
+            allowed=[RelationshipType.AGGREGATION['typename'], RelationshipType.COMPOSITION['typename'],
+                     RelationshipType.TRIGGERING['typename'], RelationshipType.SPECIALIZATION['typename']]
+        )
+        for process_type in PROCESS_TYPES
+    ),
+    # Every association counts, but associations between elements of the core layers are not allowed
+    RelationshipRule(
+        name='use_of_association',
+        relationship_types=[RelationshipType.ASSOCIATION['typename']]
+    ),
+    RelationshipRule(
+        name='use_of_association',
+        source_types=BUSINESS_LAYER + APPLICATION_LAYER +
+        TECHNOLOGY_LAYER + PHYSICAL_LAYER + JUNCTIONS,
+        target_types=BUSINESS_LAYER + APPLICATION_LAYER +
+        TECHNOLOGY_LAYER + PHYSICAL_LAYER + JUNCTIONS,
+        relationship_types=[RelationshipType.ASSOCIATION['typename']],
+        forbidden=[RelationshipType.ASSOCIATION['typename']]
+    )
+]
+"""
+The rules which are evaluated for every model by `ModelIndex.get_rule_violations`, looked up by name.
+All rules are evaluated at once, so adding a rule does not add another pass over the relationships.
+"""
+
+
+def get_rules(name: str, rules: Iterable[RelationshipRule] = RELATIONSHIP_RULES) -> List[RelationshipRule]:
+    """
+    Returns the rules with the given name
+
+    :return: The rules with the given name
+    :rtype: List[RelationshipRule]
+    """
+
+    return [rule for rule in rules if rule.name == name]
+# END get_rules
+
+
+def get_rule_type_pairs(name: str, rules: Iterable[RelationshipRule] = RELATIONSHIP_RULES) -> List[Tuple[str, str]]:
+    """
+    Returns the source type name and target type name of every pair of elements to which the rules with the given name apply, e.g. to count them with `count_relationships_between`
+
+    :return: The pairs of element types to which the rules with the given name apply
+    :rtype: List[Tuple[str, str]]
+    """
+
+    return list(dict.fromkeys(
+        type_pair for rule in get_rules(name, rules) for type_pair in rule.get_type_pairs()
+    ))
+# END get_rule_type_pairs
+
+
+def _get_codes(type_names: pd.Index, names: Optional[List[str]]) -> np.ndarray:
+    """
+    Returns the type codes of the given type names which occur in the model, or all type codes if no names are given
+    """
+
+    if names is None:
+        return np.arange(len(type_names), dtype=np.int64)
+    # END IF
+
+    codes = type_names.get_indexer(names)
+    return np.unique(codes[codes >= 0]).astype(np.int64)
+# END _get_codes
+
+
+def build_rule_table(type_names: pd.Index, rules: Iterable[RelationshipRule]) -> pd.DataFrame:
+    """
+    Expands the given rules into one row for every combination of source type, target type and relationship type to which they apply.
+
+    Every combination is identified by an integer `key`, which is calculated from the type codes as `(source * T + target) * T + relationship`, where `T` is the number of type names.
+    Types which do not occur in the model are left out, since no relationship can match them.
+
+    :return: A table with the columns `key`, `rule` and `is_valid`
+    :rtype: pandas.DataFrame
+
+    :param type_names: The type names of all concepts in the model, as in `ModelIndex.type_names`
+    :type type_names: pandas.Index
+    :param rules: The rules to expand
+    :type rules: Iterable[RelationshipRule]
+    """
+
+    type_count = len(type_names)
+    tables = []
+
+    for rule in rules:
+        relationship_codes = _get_codes(type_names, rule.relationship_types)
+
+        is_valid = np.ones(len(relationship_codes), dtype=bool)
+        if rule.allowed is not None:
+            is_valid &= np.isin(relationship_codes,
+                                _get_codes(type_names, rule.allowed))
+        # END IF
+        is_valid &= ~np.isin(relationship_codes,
+                             _get_codes(type_names, rule.forbidden))
+
+        directions = [(rule.source_types, rule.target_types)]
+        if rule.bidirectional:
+            directions.append((rule.target_types, rule.source_types))
+        # END IF
+
+        for source_types, target_types in directions:
+            pair_codes = np.add.outer(
+                _get_codes(type_names, source_types) * type_count,
+                _get_codes(type_names, target_types)
+            ).ravel()
+
+            keys = np.add.outer(pair_codes * type_count,
+                                relationship_codes).ravel()
+
+            tables.append(pd.DataFrame({
+                'key': keys,
+                'rule': rule.name,
+                'is_valid': np.tile(is_valid, len(pair_codes))
+            }))
+        # END LOOP
+    # END LOOP
+
+    if len(tables) == 0:
+        return pd.DataFrame({
+            'key': np.array([], dtype=np.int64),
+            'rule': np.array([], dtype=object),
+            'is_valid': np.array([], dtype=bool)
+        })
+    # END IF
+
+    # A bidirectional rule between the same types would otherwise match its relationships twice
+    return pd.concat(tables, ignore_index=True).drop_duplicates()
+# END build_rule_table
+
+
+def evaluate_relationship_rules(model_index, rules: Iterable[RelationshipRule] = RELATIONSHIP_RULES) -> pd.DataFrame:
+    """
+    Matches every relationship in `type_agg` of the given model index with the given rules in a single join.
+
+    :return: One row for every relationship and rule which applies to it, with the columns `position` of the relationship in `type_agg`, `rule` name and `is_valid`
+    :rtype: pandas.DataFrame
+
+    :param model_index: The index of the model for which to evaluate the rules
+    :type model_index: ModelIndex
+    :param rules: The rules to evaluate
+    :type rules: Iterable[RelationshipRule]
+    """
+
+    type_names = model_index.type_names
+    type_count = len(type_names)
+    type_agg = model_index.type_agg
+
+    keys = (
+        type_names.get_indexer(type_agg['type_src']).astype(np.int64) * type_count
+        + type_names.get_indexer(type_agg['type_tgt'])
+    ) * type_count + type_names.get_indexer(type_agg['type_rel'])
+
+    relationships = pd.DataFrame({
+        'key': keys,
+        'position': np.arange(len(keys), dtype=np.int64)
+    })
+
+    matches = relationships.merge(
+        build_rule_table(type_names, rules), how='inner', on='key')
+
+    return matches[['position', 'rule', 'is_valid']]
+# END evaluate_relationship_rules
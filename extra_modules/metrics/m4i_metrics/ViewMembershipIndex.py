@@ -0,0 +1,103 @@
+from typing import Dict, Iterable, List, Set
+
+
+def walk_view_elements(view: List[dict]) -> Iterable[str]:
+    """
+    Yields the ids of all elements referenced by the given view, including elements nested in other elements.
+    Nodes which are not elements, e.g. labels, are skipped along with their children.
+
+    The view is walked iteratively, so deeply nested views do not run into the recursion limit.
+
+    :return: The ids of all elements in the view
+    :rtype: Iterable[str]
+
+    :param view: The nodes of an archimate view. Every node is a dictionary, with its nested nodes stored under the key 'ar3_node'.
+    :type view: List[dict]
+    """
+
+    stack = [view]
+    while stack:
+        for node in stack.pop():
+            if node.get('@xsi_type') != 'ar3_Element':
+                continue
+            # END IF
+
+            if '@elementRef' in node:
+                yield node['@elementRef']
+            # END IF
+
+            children = node.get('ar3_node')
+            if isinstance(children, list):
+                stack.append(children)
+            # END IF
+        # END LOOP
+    # END LOOP
+# END walk_view_elements
+
+
+class ViewMembershipIndex(object):
+    """
+    Records which elements of an `ArchimateModel` are shown in which views.
+
+    The views of the model are walked once when the index is created, after which membership questions are answered by lookup.
+    """
+
+    views_by_element: Dict[str, Set[str]]
+    """
+    The ids of the views in which an element occurs, keyed by element id.
+    Elements which are not part of any view are not included.
+    """
+
+    node_count_by_view: Dict[str, int]
+    """
+    The number of element nodes in every view, keyed by view id
+    """
+
+    def __init__(self, model):
+        """
+        Creates a new `ViewMembershipIndex` for the given model
+
+        :param model: The model for which to build the index
+        :type model: ArchimateModel
+        """
+
+        self.views_by_element = {}
+        self.node_count_by_view = {}
+
+        for view_id, view in zip(model.views['id'], model.views['nodes']):
+            node_count = 0
+            # Views without nodes are stored as None
+            if view is not None:
+                for element_id in walk_view_elements(view):
+                    self.views_by_element.setdefault(
+                        element_id, set()).add(view_id)
+                    node_count += 1
+                # END LOOP
+            # END IF
+            self.node_count_by_view[view_id] = node_count
+        # END LOOP
+    # END __init__
+
+    @property
+    def element_ids(self) -> Set[str]:
+        """
+        The ids of all elements which occur in at least one view
+        """
+
+        return set(self.views_by_element.keys())
+    # END element_ids
+
+    def get_views_containing(self, element_id: str) -> Set[str]:
+        """
+        Returns the ids of the views in which the element with the given id occurs
+
+        :return: The ids of the views containing the element. Empty if the element is not in any view.
+        :rtype: Set[str]
+
+        :param element_id: The id of the element to look up
+        :type element_id: str
+        """
+
+        return self.views_by_element.get(element_id, set())
+    # END get_views_containing
+# END ViewMembershipIndex
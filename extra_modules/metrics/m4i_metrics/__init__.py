@@ -2,4 +2,9 @@ from __future__ import absolute_import
 
 from m4i_metrics import Metric
 from m4i_metrics import MetricCategory
+from m4i_metrics import MetricProfiler
+from m4i_metrics import MetricRunner
+from m4i_metrics import ModelIndex
+from m4i_metrics import RelationshipRules
+from m4i_metrics import ViewMembershipIndex
 from m4i_metrics import config
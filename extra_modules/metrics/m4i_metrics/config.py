@@ -17,4 +17,18 @@ EXEMPTION_TYPE_VERSION = 'version'
 
 COMPLIANT_TAG = 'compliant'
 NON_COMPLIANT_TAG = 'non compliant'
-EXCEPTION_TAG = 'exception'
\ No newline at end of file
+EXCEPTION_TAG = 'exception'
+
+'''
+Cycle detection
+'''
+
+# 'scc' reports every strongly connected component as a group and enumerates the cycles within small components only, within the limits below.
+# 'all' enumerates every cycle in the model without limits.
+CYCLE_DETECTION_MODE = 'scc'
+# Components with more elements than this are reported as a whole, without enumerating their cycles
+CYCLE_DETECTION_MAX_SCC_SIZE = 25
+# The maximum number of cycles to enumerate per relationship slice
+CYCLE_DETECTION_MAX_CYCLES = 1000
+# The maximum number of seconds to spend enumerating cycles per relationship slice
+CYCLE_DETECTION_TIME_BUDGET = 10
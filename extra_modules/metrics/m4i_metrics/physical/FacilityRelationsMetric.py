@@ -1,11 +1,9 @@
-import pandas as pd
-
-from m4i_analytics.graphs.languages.archimate.metamodel.Concepts import (
-    ElementType, RelationshipType)
-
 from m4i_metrics.Metric import Metric
 from m4i_metrics.MetricColumnConfig import MetricColumnConfig
 from m4i_metrics.MetricConfig import MetricConfig
+from m4i_metrics.ModelIndex import ModelIndex
+from m4i_metrics.RelationshipRules import get_rule_type_pairs
+from m4i_metrics.utils import count_relationships_between
 
 invalid_between_facilities_agg_config = MetricConfig(**{
     'description': 'These relationships are not aggregation/composition/realization or specialization between facilities',
@@ -42,42 +40,18 @@ invalid_between_facilities_agg_config = MetricConfig(**{
 class FacilityRelationsMetric(Metric):
     id = '9d782080-b992-4f4d-ab76-c58fb0ab52b8'
     label = 'Facility Relations'
+    is_decomposable = True
+    # Version 2 lists the violations in the order of the relationships instead of grouped by type
+    implementation_version = '2'
 
     @staticmethod
-    def calculate(model):
-        elems = model.nodes.copy()
-        elems['type_'] = elems['type'].apply(lambda x: x['typename'])
-        rels = model.edges.copy()
-        rels['type_'] = rels['type'].apply(lambda x: x['typename'])
-
-        elems = elems[['id', 'name', 'type_']]
-        rels = rels[['id', 'source', 'target', 'type_']]
-
-        facility_elems = elems[(
-            elems['type_'] == ElementType.FACILITY['typename'])]
-
-        facility_agg = facility_elems.merge(
-            rels, how='inner', left_on='id', right_on='source')
-        facility_agg.rename(columns={'id_x': 'id_src', 'name': 'name_src',
-                                     'type__x': 'type_src', 'id_y': 'id_rel', 'type__y': 'type_rel'}, inplace=True)
-        facility_agg = facility_agg.merge(
-            facility_elems, how='inner', left_on='target', right_on='id')
-        facility_agg.rename(
-            columns={'id': 'id_tgt', 'name': 'name_tgt', 'type_': 'type_tgt'}, inplace=True)
-        facility_agg = facility_agg[['id_src', 'name_src', 'type_src',
-                                     'id_rel', 'type_rel', 'id_tgt', 'name_tgt', 'type_tgt']]
-
-        between_facilities_agg = facility_agg
-
-        allRelsCount = len(between_facilities_agg)
-
-        invalid_between_facilities_agg = between_facilities_agg[
-            ~((between_facilities_agg['type_rel'] == RelationshipType.AGGREGATION['typename'])
-              | (between_facilities_agg['type_rel'] == RelationshipType.COMPOSITION['typename'])
-              | (between_facilities_agg['type_rel'] == RelationshipType.REALIZATION['typename'])
-              # specialization between similar-type nodes is allowed always
-              | (between_facilities_agg['type_rel'] == RelationshipType.SPECIALIZATION['typename']))]
+    def calculate(model, model_index: ModelIndex = None):
+        if model_index is None:
+            model_index = ModelIndex(model)
+        # END IF
 
+        allRelsCount, invalid_between_facilities_agg = model_index.get_rule_violations(
+            'facility_relations')
         return {
             "Relationships between facilities": {
                 "config": invalid_between_facilities_agg_config,
@@ -88,6 +62,23 @@ class FacilityRelationsMetric(Metric):
         }
     # END of calculate
 
+    @classmethod
+    def get_sample_sizes(cls, model):
+        return {
+            "Relationships between facilities": count_relationships_between(
+                model, get_rule_type_pairs('facility_relations'))
+        }
+    # END get_sample_sizes
+
+    @classmethod
+    def get_affected_concepts(cls, model, concept_ids):
+        # The result includes the names and types of the source and target elements, so a change to an element affects its relationships
+        edges = model.edges
+        is_connected = edges['source'].isin(
+            concept_ids) | edges['target'].isin(concept_ids)
+        return concept_ids | set(edges['id'][is_connected])
+    # END get_affected_concepts
+
 
     def get_name(self):
         return 'FacilityRelationsMetric'
@@ -1,11 +1,9 @@
-import pandas as pd
-
-from m4i_analytics.graphs.languages.archimate.metamodel.Concepts import (
-    ElementType, RelationshipType)
-
 from m4i_metrics.Metric import Metric
 from m4i_metrics.MetricColumnConfig import MetricColumnConfig
 from m4i_metrics.MetricConfig import MetricConfig
+from m4i_metrics.ModelIndex import ModelIndex
+from m4i_metrics.RelationshipRules import get_rule_type_pairs
+from m4i_metrics.utils import count_relationships_between
 
 invalid_actors_roles_processes_functions_agg_config = MetricConfig(**{
     'description': 'These relationships are not assignment between business actors and business roles or business actors/business roles and business processes/business functions',
@@ -42,64 +40,18 @@ invalid_actors_roles_processes_functions_agg_config = MetricConfig(**{
 class ActorAndRoleAssignmentMetric(Metric):
     id = '32e068fe-973b-4b9a-982b-5eea2a70b2d7'
     label = 'Actor & Role Assignment'
+    is_decomposable = True
+    # Version 2 lists the violations in the order of the relationships instead of grouped by type
+    implementation_version = '2'
 
     @staticmethod
-    def calculate(model):
-        elems = model.nodes.copy()
-        elems['type_'] = elems['type'].apply(lambda x: x['typename'])
-        rels = model.edges.copy()
-        rels['type_'] = rels['type'].apply(lambda x: x['typename'])
-
-        elems = elems[['id', 'name', 'type_']]
-        rels = rels[['id', 'source', 'target', 'type_']]
-
-        business_elems = elems[
-            (elems['type_'] == ElementType.BUSINESS_ACTOR['typename'])
-            | (elems['type_'] == ElementType.BUSINESS_ROLE['typename'])
-            | (elems['type_'] == ElementType.BUSINESS_PROCESS['typename'])
-            | (elems['type_'] == ElementType.BUSINESS_FUNCTION['typename'])]
-
-        business_agg = business_elems.merge(
-            rels, how='inner', left_on='id', right_on='source')
-        business_agg.rename(columns={'id_x': 'id_src', 'name': 'name_src',
-                                     'type__x': 'type_src', 'id_y': 'id_rel', 'type__y': 'type_rel'}, inplace=True)
-        business_agg = business_agg.merge(
-            business_elems, how='inner', left_on='target', right_on='id')
-        business_agg.rename(
-            columns={'id': 'id_tgt', 'name': 'name_tgt', 'type_': 'type_tgt'}, inplace=True)
-        business_agg = business_agg[['id_src', 'name_src', 'type_src',
-                                     'id_rel', 'type_rel', 'id_tgt', 'name_tgt', 'type_tgt']]
-
-        # these 5 relationship-checks go one direction only,
-        # because assignment is only possible using this direction in Archi
-        actors_roles_agg = business_agg[(
-            (business_agg['type_src'] == ElementType.BUSINESS_ACTOR['typename']) &
-            (business_agg['type_tgt'] == ElementType.BUSINESS_ROLE['typename']))]
-
-        actors_processes_agg = business_agg[(
-            (business_agg['type_src'] == ElementType.BUSINESS_ACTOR['typename']) &
-            (business_agg['type_tgt'] == ElementType.BUSINESS_PROCESS['typename']))]
+    def calculate(model, model_index: ModelIndex = None):
+        if model_index is None:
+            model_index = ModelIndex(model)
+        # END IF
 
-        roles_processes_agg = business_agg[(
-            (business_agg['type_src'] == ElementType.BUSINESS_ROLE['typename']) &
-            (business_agg['type_tgt'] == ElementType.BUSINESS_PROCESS['typename']))]
-
-        actors_functions_agg = business_agg[(
-            (business_agg['type_src'] == ElementType.BUSINESS_ACTOR['typename']) &
-            (business_agg['type_tgt'] == ElementType.BUSINESS_FUNCTION['typename']))]
-
-        roles_functions_agg = business_agg[(
-            (business_agg['type_src'] == ElementType.BUSINESS_ROLE['typename']) &
-            (business_agg['type_tgt'] == ElementType.BUSINESS_FUNCTION['typename']))]
-
-        actors_roles_processes_functions_agg = pd.concat(
-            [actors_roles_agg, actors_processes_agg, roles_processes_agg,
-             actors_functions_agg, roles_functions_agg])
-             
-        allRelsCount = len(actors_roles_processes_functions_agg)
-
-        invalid_actors_roles_processes_functions_agg = actors_roles_processes_functions_agg[
-            actors_roles_processes_functions_agg['type_rel'] != RelationshipType.ASSIGNMENT['typename']]
+        allRelsCount, invalid_actors_roles_processes_functions_agg = model_index.get_rule_violations(
+            'actor_and_role_assignment')
 
         return {
             "Relationships between business actors, business roles, business processes and business functions": {
@@ -111,6 +63,23 @@ class ActorAndRoleAssignmentMetric(Metric):
         }
     # END of calculate
 
+    @classmethod
+    def get_sample_sizes(cls, model):
+        return {
+            "Relationships between business actors, business roles, business processes and business functions": count_relationships_between(
+                model, get_rule_type_pairs('actor_and_role_assignment'))
+        }
+    # END get_sample_sizes
+
+    @classmethod
+    def get_affected_concepts(cls, model, concept_ids):
+        # The result includes the names and types of the source and target elements, so a change to an element affects its relationships
+        edges = model.edges
+        is_connected = edges['source'].isin(
+            concept_ids) | edges['target'].isin(concept_ids)
+        return concept_ids | set(edges['id'][is_connected])
+    # END get_affected_concepts
+
 
     def get_name(self):
         return 'ActorAndRoleAssignmentMetric'
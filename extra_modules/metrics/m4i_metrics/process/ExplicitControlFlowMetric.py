@@ -8,6 +8,7 @@ from m4i_analytics.graphs.languages.archimate.metamodel.Concepts import (
 from ..Metric import Metric
 from ..MetricColumnConfig import MetricColumnConfig
 from ..MetricConfig import MetricConfig
+from ..ModelIndex import ModelIndex
 
 trigger_flow_const_config = MetricConfig(**{
     'description': 'These elements connect to multiple in- or outgoing, flow or trigger relationships',
@@ -46,14 +47,13 @@ class ExplicitControlFlowMetric(Metric):
     label = 'Explicit Control Flow'
 
     @staticmethod
-    def calculate(model):
+    def calculate(model, model_index: ModelIndex = None):
+        if model_index is None:
+            model_index = ModelIndex(model)
+        # END IF
 
-        # Create local copies of the model's nodes and edges dataframes so we can safely modify them
-        elems = model.nodes.copy()
-        elems['type_'] = elems['type'].apply(lambda x: x['typename'])
-
-        rels = model.edges.copy()
-        rels['type_'] = rels['type'].apply(lambda x: x['typename'])
+        elems = model_index.elems
+        rels = model_index.rels
 
         business_process = elems[elems.type_ ==
                                  ElementType.BUSINESS_PROCESS['typename']]
@@ -8,6 +8,7 @@ from m4i_analytics.graphs.languages.archimate.metamodel.Concepts import (
 from ..Metric import Metric
 from ..MetricColumnConfig import MetricColumnConfig
 from ..MetricConfig import MetricConfig
+from ..ModelIndex import ModelIndex
 
 parent_non_compliant_elem_config = MetricConfig(**{
     'description': 'These process steps trigger other process steps at different abstraction levels in the model',
@@ -42,11 +43,13 @@ class ProcessBoundariesMetric(Metric):
     label = 'Process Boundaries'
 
     @staticmethod
-    def calculate(model):
-        elems = model.nodes.copy()
-        elems['type_'] = elems['type'].apply(lambda x: x['typename'])
-        rels = model.edges.copy()
-        rels['type_'] = rels['type'].apply(lambda x: x['typename'])
+    def calculate(model, model_index: ModelIndex = None):
+        if model_index is None:
+            model_index = ModelIndex(model)
+        # END IF
+
+        elems = model_index.elems
+        rels = model_index.rels
 
         business_process = elems[elems.type_ ==
                                  ElementType.BUSINESS_PROCESS['typename']]
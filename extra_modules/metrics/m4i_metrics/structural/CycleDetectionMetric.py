@@ -1,3 +1,6 @@
+from time import monotonic
+from typing import List, Optional, Tuple
+
 import networkx as nx
 import numpy as np
 import pandas as pd
@@ -8,9 +11,11 @@ from m4i_analytics.graphs.languages.archimate.ArchimateUtils import \
 from m4i_analytics.graphs.languages.archimate.metamodel.Concepts import \
     RelationshipType
 
+from .. import config
 from ..Metric import Metric
 from ..MetricColumnConfig import MetricColumnConfig
 from ..MetricConfig import MetricConfig
+from ..ModelIndex import ModelIndex
 
 cycles_config = MetricConfig(**{
     'description': 'The set of elements connected via aggretation or composition relationships that form a cycle.',
@@ -32,10 +37,103 @@ cycles_config = MetricConfig(**{
             'displayName': 'Relation Types',
             'description': 'The ArchiMate type of the connecting relationships between elements in cycle.'
         }),
+        'group': MetricColumnConfig(**{
+            'displayName': 'Group',
+            'description': 'The number of the strongly connected component of which the cycle is part. Cycles in the same group share elements.'
+        }),
+        'truncated': MetricColumnConfig(**{
+            'displayName': 'Truncated',
+            'description': 'Whether not all cycles in the group were enumerated. If so, the row may represent the group as a whole.'
+        }),
     }
 })
 
 
+def find_cycles_(graph, max_scc_size: Optional[int] = None, max_cycles: Optional[int] = None, time_budget: Optional[float] = None) -> List[Tuple[int, List[str], bool]]:
+    '''
+    Finds the cycles in the given graph. Every non-trivial strongly connected component of the graph is a group of cycles.
+    Cycles are only enumerated within components of at most `max_scc_size` nodes, and only until `max_cycles` cycles are found or `time_budget` seconds have passed.
+    The limits are checked before every component and between cycles. Once either is reached, the remaining components are not enumerated at all.
+    A component for which no cycles were enumerated is returned as a whole instead. Pass `None` for any limit to disable it.
+
+    :return: For every cycle, the number of its group, its nodes and whether the cycles in its group were truncated
+    :rtype: List[Tuple[int, List[str], bool]]
+    '''
+
+    deadline = monotonic() + time_budget if time_budget is not None else None
+
+    components = [
+        component for component in nx.strongly_connected_components(graph)
+        # a single node only forms a cycle if it has a self-loop
+        if len(component) > 1 or any(graph.has_edge(node, node) for node in component)
+    ]
+
+    def is_exhausted(cycle_count: int) -> bool:
+        return (max_cycles is not None and cycle_count >= max_cycles) \
+            or (deadline is not None and monotonic() > deadline)
+    # END is_exhausted
+
+    result = []
+    for group, component in enumerate(components):
+        cycles = []
+        truncated = (max_scc_size is not None and len(component) > max_scc_size) \
+            or is_exhausted(len(result))
+
+        if not truncated:
+            for cycle in nx.simple_cycles(graph.subgraph(component)):
+                if is_exhausted(len(result) + len(cycles)):
+                    truncated = True
+                    break
+                # END IF
+                cycles.append(cycle)
+            # END LOOP
+        # END IF
+
+        if len(cycles) == 0:
+            cycles.append(sorted(component))
+        # END IF
+
+        result.extend((group, cycle, truncated) for cycle in cycles)
+    # END LOOP
+
+    return result
+# END find_cycles_
+
+
+def describe_cycles_(graph, cycles: List[Tuple[int, List[str], bool]]) -> pd.DataFrame:
+    '''
+    Expands the given cycles with the types of their elements and of the relationships between them
+
+    :return: A row for every cycle
+    :rtype: pandas.DataFrame
+    '''
+
+    rel_types = []
+    element_types = []
+    for _, nodes, _ in cycles:
+        # get the relationship types present between elements in the cycle
+        # Truncated components can be large, so membership is tested against a set
+        node_set = set(nodes)
+        edges_temp = list(graph.edges(nodes, data=True))
+        filtered_edges_temp = [x for x in edges_temp if (
+            x[0] in node_set and x[1] in node_set)]
+        rel_types.append(', '.join({i[2]['type_name']
+                                    for i in filtered_edges_temp}))
+
+        # get the unique element types present in the cycle
+        element_types.append(
+            ', '.join({graph.nodes[i]['type_name'] for i in nodes}))
+    # END LOOP
+
+    return pd.DataFrame({'elements_id': [', '.join(nodes) for _, nodes, _ in cycles],
+                         'cycle_size': [len(nodes) for _, nodes, _ in cycles],
+                         'element_types': element_types,
+                         'rel_types': rel_types,
+                         'group': [group for group, _, _ in cycles],
+                         'truncated': [truncated for _, _, truncated in cycles]})
+# END describe_cycles_
+
+
 class CycleDetectionMetric(Metric):
     '''
     Determines if their Exists Cycles in Hierarchical Relationships 
@@ -43,9 +141,11 @@ class CycleDetectionMetric(Metric):
     '''
     id = 'f77bcf19-0141-4950-ae98-0ba919398d7a'
     label = 'Cycle Detection Metric'
+    # Version 2 adds the group and truncated columns
+    implementation_version = '2'
 
     @staticmethod
-    def calculate(model):
+    def calculate(model, model_index: ModelIndex = None):
         # sliced model for hierarchical relationships
         model_sliced = ArchimateUtils.sliceByEdgeType(
             model, [RelationshipType.COMPOSITION, RelationshipType.AGGREGATION])
@@ -54,55 +154,25 @@ class CycleDetectionMetric(Metric):
         model2_sliced = ArchimateUtils.sliceByEdgeType(
             model, [RelationshipType.SPECIALIZATION])
 
+        if config.CYCLE_DETECTION_MODE == 'scc':
+            limits = {
+                'max_scc_size': config.CYCLE_DETECTION_MAX_SCC_SIZE,
+                'max_cycles': config.CYCLE_DETECTION_MAX_CYCLES,
+                'time_budget': config.CYCLE_DETECTION_TIME_BUDGET
+            }
+        else:
+            limits = {}
+        # END IF
+
         # convert model to graph to apply NetworkX cycle finding algorithm
         # - algorithm applies to a directed graph representation of model
         # - includes self-loop
         G_sliced = GraphUtils.toNXGraph(model_sliced)
-        cycles_list = list(nx.simple_cycles(G_sliced))
+        cycles = describe_cycles_(G_sliced, find_cycles_(G_sliced, **limits))
 
         G2_sliced = GraphUtils.toNXGraph(model2_sliced)
-        cycles2_list = list(nx.simple_cycles(G2_sliced))
-
-        # expand cycle list with attributes of elements & relationships
-        rel_types = []
-        element_types = []
-        for nodes in cycles_list:
-            # get the relationship types present between elements in the cycle
-            edges_temp = list(G_sliced.edges(nodes, data=True))
-            filtered_edges_temp = [x for x in edges_temp if (
-                x[0] in nodes and x[1] in nodes)]
-            rel_types.append(', '.join({i[2]['type_name']
-                                        for i in filtered_edges_temp}))
-
-            # get the unique element types present in the cycle
-            element_types.append(
-                ', '.join({G_sliced.nodes[i]['type_name'] for i in nodes}))
-        # END LOOP
-
-        # expand cycle list with attributes of elements & relationships
-        rel_types2 = []
-        element_types2 = []
-        for nodes in cycles2_list:
-            # get the relationship types present between elements in the cycle
-            edges_temp = list(G2_sliced.edges(nodes, data=True))
-            filtered_edges_temp = [x for x in edges_temp if (
-                x[0] in nodes and x[1] in nodes)]
-            rel_types2.append(
-                ', '.join({i[2]['type_name'] for i in filtered_edges_temp}))
-
-            # get the unique element types present in the cycle
-            element_types2.append(
-                ', '.join({G2_sliced.nodes[i]['type_name'] for i in nodes}))
-        # END LOOP
-
-        cycles = pd.DataFrame({'elements_id': [', '.join(i) for i in cycles_list],
-                               'cycle_size': [len(i) for i in cycles_list],
-                               'element_types': element_types,
-                               'rel_types': rel_types})
-        cycles2 = pd.DataFrame({'elements_id': [', '.join(i) for i in cycles2_list],
-                                'cycle_size': [len(i) for i in cycles2_list],
-                                'element_types': element_types2,
-                                'rel_types': rel_types2})
+        cycles2 = describe_cycles_(
+            G2_sliced, find_cycles_(G2_sliced, **limits))
 
         return {
             "detected cycles": {
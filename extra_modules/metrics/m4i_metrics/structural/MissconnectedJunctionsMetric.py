@@ -6,6 +6,7 @@ from m4i_analytics.graphs.languages.archimate.metamodel.Concepts import \
 from ..Metric import Metric
 from ..MetricColumnConfig import MetricColumnConfig
 from ..MetricConfig import MetricConfig
+from ..ModelIndex import ModelIndex
 
 invalid_junctions_direction_agg_config = MetricConfig(**{
     'description': 'These junctions have no outgoing or no incoming relations connected to them',
@@ -55,26 +56,47 @@ class MissconnectedJunctionsMetric(Metric):
     label = 'Misconnected Junctions'
 
     @staticmethod
-    def calculate(model):
-        elems = model.nodes.copy()
-        elems['type_'] = elems['type'].apply(lambda x: x['typename'])
-        rels = model.edges.copy()
-        rels['type_'] = rels['type'].apply(lambda x: x['typename'])
-
-        elems = elems[['id', 'name', 'type_']]
-        rels = rels[['id', 'source', 'target', 'type_']]
-
-        elems['relTypes'] = elems['id'].apply(lambda x: set(
-            rels[rels['source'] == x]['type_'].tolist() + rels[rels['target'] == x]['type_'].tolist()))
-        elems['relTypesCount'] = elems['relTypes'].apply(lambda x: len(x))
-        elems['relTypes'] = elems['relTypes'].apply(lambda x: ", ".join(x))
-        elems['incomingRelsCount'] = elems['id'].apply(
-            lambda x: len(rels[rels['target'] == x]))
-        elems['outgoingRelsCount'] = elems['id'].apply(
-            lambda x: len(rels[rels['source'] == x]))
+    def calculate(model, model_index: ModelIndex = None):
+        if model_index is None:
+            model_index = ModelIndex(model)
+        # END IF
 
+        elems = model_index.elems
+        rels = model_index.rels
+
+        # Take a copy of the junctions since columns are added below
         junctions_agg = elems[(elems['type_'] == ElementType.OR_JUNCTION['typename']) |
-                              (elems['type_'] == ElementType.AND_JUNCTION['typename'])]
+                              (elems['type_'] == ElementType.AND_JUNCTION['typename'])].copy()
+
+        outgoing = rels[rels['source'].isin(junctions_agg['id'])]
+        incoming = rels[rels['target'].isin(junctions_agg['id'])]
+
+        # Every relationship connected to a junction, with its direction. Outgoing relationships come first, so their types are listed first.
+        connected = pd.concat([
+            outgoing[['source', 'type_']].rename(columns={'source': 'id'}).assign(
+                outgoing=1, incoming=0),
+            incoming[['target', 'type_']].rename(columns={'target': 'id'}).assign(
+                outgoing=0, incoming=1)
+        ])
+
+        # Every relationship type is listed once, in the order in which it first occurs
+        junction_stats = connected.groupby('id', sort=False).agg(
+            relTypes=('type_', lambda types: list(dict.fromkeys(types))),
+            incomingRelsCount=('incoming', 'sum'),
+            outgoingRelsCount=('outgoing', 'sum')
+        )
+
+        junction_stats = junction_stats.reindex(junctions_agg['id'])
+        junctions_agg['relTypes'] = [
+            types if isinstance(types, list) else [] for types in junction_stats['relTypes']
+        ]
+        junctions_agg['relTypesCount'] = junctions_agg['relTypes'].apply(len)
+        junctions_agg['relTypes'] = junctions_agg['relTypes'].apply(
+            lambda x: ", ".join(x))
+        for column in ('incomingRelsCount', 'outgoingRelsCount'):
+            junctions_agg[column] = junction_stats[column].fillna(
+                0).astype(int).to_numpy()
+        # END LOOP
 
         junctions_agg.rename(columns={
                              'id': 'id_junction', 'name': 'name_junction', 'type_': 'type_junction'}, inplace=True)
@@ -7,6 +7,7 @@ from m4i_analytics.graphs.languages.archimate.metamodel.Concepts import \
 from ..Metric import Metric
 from ..MetricColumnConfig import MetricColumnConfig
 from ..MetricConfig import MetricConfig
+from ..ModelIndex import ModelIndex
 
 no_relations_config = MetricConfig(**{
     'description': 'These concepts are nested in a View but do not have a relationship.',
@@ -152,7 +153,7 @@ class NestedElementsInViewMetric(Metric):
     label = 'Nested Elements in View'
 
     @staticmethod
-    def calculate(model):
+    def calculate(model, model_index: ModelIndex = None):
 
         df = find_nested_elements(model)
         elems, rels = get_elems_rels(model)
@@ -1,6 +1,7 @@
-from collections import defaultdict
-from typing import Iterable, Set
+from typing import List, Tuple
 
+import networkx as nx
+import numpy as np
 import pandas as pd
 from m4i_analytics.graphs.languages.archimate.ArchimateUtils import \
     ArchimateUtils
@@ -12,6 +13,7 @@ from m4i_analytics.graphs.languages.archimate.model.ArchimateModel import \
 from ..Metric import Metric
 from ..MetricColumnConfig import MetricColumnConfig
 from ..MetricConfig import MetricConfig
+from ..ModelIndex import ModelIndex
 
 tree_property_config = MetricConfig(**{
     'description': 'Elements connected via aggregation, composition or specialization relations should form a tree structure i.e. have a single parent each. A child element violates the metric by having two or more parent elements',
@@ -43,89 +45,79 @@ tree_property_config = MetricConfig(**{
 })
 
 
-class BidirectionalMultiMap(defaultdict):
+def build_transition_matrix(edges: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
+    """
+    Determines the parent and child of every given edge. For aggregation and composition relationships the source is the parent, otherwise the target is the parent.
+    Every node is assigned an integer code. Duplicate parent-child pairs are removed.
 
-    inverse: defaultdict
+    :return: The parent codes and child codes of the edges, and the node ids by code
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray, pandas.Index]
+    """
 
-    def __init__(self):
-        super().__init__(set)
-        self.inverse = defaultdict(set)
-    # END __init__
+    edge_types = edges['type'].apply(lambda type: type['typename'])
+    is_top_down = edge_types.isin([
+        RelationshipType.COMPOSITION['typename'],
+        RelationshipType.AGGREGATION['typename']
+    ]).to_numpy()
 
-    def add(self, key: str, *values: str):
-        for value in values:
-            self[key].add(value)
-            self.inverse[value].add(key)
-        # END LOOP
-    # END add
-
-# END BidirectionalMultiMap
+    sources = edges['source'].to_numpy()
+    targets = edges['target'].to_numpy()
 
+    parent_ids = np.where(is_top_down, sources, targets)
+    child_ids = np.where(is_top_down, targets, sources)
 
-def build_transition_matrix(edges: pd.DataFrame):
-    matrix = BidirectionalMultiMap()
-    for _, edge in edges.iterrows():
-        edge_type = edge['type']
-        if edge_type in [RelationshipType.COMPOSITION, RelationshipType.AGGREGATION]:
-            matrix.add(edge['source'], edge['target'])
-        else:
-            matrix.add(edge['target'], edge['source'])
-        # END IF
-    # END LOOP
-    return matrix
-# END build_transition_matrix
-
+    codes, node_ids = pd.factorize(
+        np.concatenate([parent_ids, child_ids]))
 
-def find_root_nodes(matrix: BidirectionalMultiMap):
-    for node_id in matrix.keys():
-        if node_id not in matrix.inverse:
-            yield node_id
-        # END IF
-    # END LOOP
-# END find_root_nodes
+    pairs = pd.DataFrame({
+        'parent': codes[:len(parent_ids)],
+        'child': codes[len(parent_ids):]
+    }).drop_duplicates()
 
+    return pairs['parent'].to_numpy(), pairs['child'].to_numpy(), pd.Index(node_ids)
+# END build_transition_matrix
 
-def find_nodes_in_tree(root_node: str, matrix: BidirectionalMultiMap, seen: Set[str] = None):
 
-    # Track the nodes we have already seen to avoid getting stuck in a cycle.
-    # Initialize the set if it is not given.
-    if seen is None:
-        seen = set()
-    # END IF
+def label_nodes_by_tree(parents: np.ndarray, children: np.ndarray, node_count: int) -> Tuple[List[int], List[int]]:
+    """
+    Labels every node by the roots of the trees it is part of. A root is a node which has children, but no parents.
 
-    # If we have already seen this node, return.
-    if root_node in seen:
-        return
-    # END IF
+    The root labels are propagated in a single pass over the strongly connected components of the graph, in topological order.
+    Nodes in the same component are reachable from the same roots, which keeps the propagation safe in the presence of cycles.
 
-    # Return the current node and add it to the tracking set.
-    yield root_node
-    seen.add(root_node)
+    :return: For every node code, the root labels as a bitset in which bit `i` represents the `i`-th root. Also the node codes of the roots.
+    :rtype: Tuple[List[int], List[int]]
+    """
 
-    # Check whether the key is present to avoid modifying the dictionary when using a defaultdict.
-    if root_node in matrix:
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(node_count))
+    graph.add_edges_from(zip(parents.tolist(), children.tolist()))
 
-        # Return all child nodes and their children.
-        for child_node in matrix[root_node]:
-            yield from find_nodes_in_tree(child_node, matrix, seen)
-        # END LOOP
-    # END IF
-# END find_nodes_in_tree
+    has_parent = np.zeros(node_count, dtype=bool)
+    has_parent[children] = True
+    has_child = np.zeros(node_count, dtype=bool)
+    has_child[parents] = True
 
+    roots = np.flatnonzero(has_child & ~has_parent).tolist()
 
-def label_nodes_by_tree(transition_matrix: BidirectionalMultiMap):
+    condensed = nx.condensation(graph)
+    component_by_node = condensed.graph['mapping']
 
-    labeled_nodes = defaultdict(set)
+    component_labels = [0] * condensed.number_of_nodes()
+    for bit, root in enumerate(roots):
+        component_labels[component_by_node[root]] |= 1 << bit
+    # END LOOP
 
-    # Each root node represents a tree in the model.
-    for root_node in find_root_nodes(transition_matrix):
-        # Label every node in the tree by its root node. A node can have multiple lables.
-        for node_id in find_nodes_in_tree(root_node, transition_matrix):
-            labeled_nodes[node_id].add(root_node)
-        # END LOOP
+    for component in nx.topological_sort(condensed):
+        labels = component_labels[component]
+        if labels:
+            for successor in condensed.successors(component):
+                component_labels[successor] |= labels
+            # END LOOP
+        # END IF
     # END LOOP
 
-    return labeled_nodes
+    return [component_labels[component_by_node[node]] for node in range(node_count)], roots
 # END label_nodes_by_tree
 
 
@@ -136,10 +128,22 @@ def get_violating_nodes_for_relationship_type(model: ArchimateModel, relationshi
     nodes = model_sliced.nodes
     sample_size = len(nodes)
 
-    transition_matrix = build_transition_matrix(model_sliced.edges)
-    labeled_nodes = label_nodes_by_tree(transition_matrix)
+    parents, children, node_ids = build_transition_matrix(model_sliced.edges)
+    labels, roots = label_nodes_by_tree(parents, children, len(node_ids))
+
+    root_counts = pd.Series(
+        [bin(label).count('1') for label in labels], index=node_ids, dtype=int)
+    # The tree of a node is represented by the first of its roots
+    first_roots = pd.Series(
+        [node_ids[roots[(label & -label).bit_length() - 1]] if label else None
+         for label in labels],
+        index=node_ids,
+        dtype=object
+    )
+    parent_counts = pd.Series(children).value_counts()
+    parent_counts.index = node_ids[parent_counts.index]
 
-    nodes['cnt'] = nodes['id'].apply(lambda id: len(labeled_nodes[id]))
+    nodes['cnt'] = nodes['id'].map(root_counts).fillna(0).astype(int)
 
     violating_nodes = nodes[nodes['cnt'] > 1]
 
@@ -147,24 +151,15 @@ def get_violating_nodes_for_relationship_type(model: ArchimateModel, relationshi
         lambda type: type['typename']
     )
 
-    def get_node_name(node_id: str):
-        nodes_matching_id = model.nodes[model.nodes['id'] == node_id]
-        _, node = next(nodes_matching_id.iterrows())
-        return node['name']
-    # END get_node_name
+    node_names = model.nodes.drop_duplicates('id').set_index('id')['name']
 
-    violating_nodes['tree'] = violating_nodes['id'].apply(
-        lambda id: get_node_name(next(iter(labeled_nodes[id])))
-    )
+    violating_nodes['tree'] = violating_nodes['id'].map(
+        first_roots).map(node_names)
 
     violating_nodes['rel_type'] = relationship_type["typename"]
 
-    violating_nodes['is_violation'] = violating_nodes['id'].apply(
-        lambda id: (
-            id in transition_matrix.inverse
-            and len(transition_matrix.inverse[id]) > 1
-        )
-    )
+    violating_nodes['is_violation'] = violating_nodes['id'].map(
+        parent_counts).fillna(0) > 1
 
     return sample_size, violating_nodes
 # END get_violating_nodes_for_relationship_type
@@ -178,7 +173,7 @@ class TreeStructuresMetric(Metric):
     label = 'Tree Structures'
 
     @staticmethod
-    def calculate(model):
+    def calculate(model, model_index: ModelIndex = None):
 
         all_violating_nodes = pd.DataFrame()
 
@@ -1,8 +1,5 @@
-import copy
-
-import networkx as nx
+import numpy as np
 import pandas as pd
-from m4i_analytics.graphs.GraphUtils import GraphUtils
 from m4i_analytics.graphs.languages.archimate.model.ArchimateModel import \
     ArchimateModel
 from m4i_analytics.graphs.model.Graph import EdgeAttribute, NodeAttribute
@@ -10,6 +7,7 @@ from m4i_analytics.graphs.model.Graph import EdgeAttribute, NodeAttribute
 from ..Metric import Metric
 from ..MetricColumnConfig import MetricColumnConfig
 from ..MetricConfig import MetricConfig
+from ..ModelIndex import ModelIndex
 
 unconnected_elems_config = MetricConfig(**{
     'description': 'These elements are not connected to any other elements',
@@ -60,43 +58,66 @@ clusters_config = MetricConfig(**{
 UNCONNECTED_CLUSTER_ID = 'Unconnected'
 
 
-def cluster_nodes(clusters):
+def find_components(sources: np.ndarray, targets: np.ndarray, vertex_count: int) -> np.ndarray:
     """
-    Flatten the given clusters into a sequence of tuples of node IDs and cluster IDs.
-    Nodes with no incoming or outgoing relationships are grouped into a single cluster.
+    Finds the connected components of an undirected graph with a vectorized union-find.
+    Every edge hooks the larger label of its endpoints onto the smaller one, after which the labels are compressed by pointer jumping.
+    This repeats until no edge connects two different labels.
+
+    :return: For every vertex, the smallest vertex in its component
+    :rtype: numpy.ndarray
+
+    :param sources: The source vertex of every edge
+    :type sources: numpy.ndarray
+    :param targets: The target vertex of every edge
+    :type targets: numpy.ndarray
+    :param vertex_count: The number of vertices in the graph
+    :type vertex_count: int
     """
-    # Start with ID 1
-    for index, cluster in enumerate(clusters, 1):
 
-        # Group all elements that do not have any incoming or outgoing relationships into
-        # a single cluster
-        cluster_id = index if len(cluster) > 1 else UNCONNECTED_CLUSTER_ID
+    labels = np.arange(vertex_count)
 
-        # Assign every node in the cluster its cluster ID and return the tuple
-        for node in cluster:
-            yield (cluster_id, node)
-        # END LOOP
-    # END LOOP
-# END cluster_nodes
+    while True:
+        source_labels = labels[sources]
+        target_labels = labels[targets]
 
+        is_crossing = source_labels != target_labels
+        if not is_crossing.any():
+            break
+        # END IF
 
-def get_partitions(model):
-    """
-    Finds unconnected clusters in the given model and returns the nodes per cluster as a pandas DataFrame
-    """
-    # Turn the given model into a graph and find the clusters
-    graph = GraphUtils.toNXGraph(model)
-    clusters = nx.connected_components(graph.to_undirected())
+        source_labels = source_labels[is_crossing]
+        target_labels = target_labels[is_crossing]
+
+        # Hook the root of the larger label onto the smaller label
+        np.minimum.at(
+            labels,
+            np.maximum(source_labels, target_labels),
+            np.minimum(source_labels, target_labels)
+        )
+
+        # Compress the label trees until every vertex points at its root
+        while True:
+            compressed = labels[labels]
+            if np.array_equal(compressed, labels):
+                break
+            # END IF
+            labels = compressed
+        # END LOOP
+    # END LOOP
 
-    # Get the nodes per cluster as a flat sequence
-    clustered_nodes = cluster_nodes(clusters)
+    return labels
+# END find_components
 
-    # Return the nodes per cluster as a pandas DataFrame
-    return pd.DataFrame(clustered_nodes, columns=['group', 'id'])
-# END get_partitions
 
+def get_partitions(model: ArchimateModel):
+    """
+    Finds unconnected clusters in the given model and returns the nodes per cluster as a pandas DataFrame.
+    Relationships are treated as nodes which connect their source and target, so they are included in the result as well.
 
-def edges_to_nodes(model: ArchimateModel):
+    Clusters are numbered from 1 in the order in which their first concept occurs, with relationships before elements.
+    Nodes with no incoming or outgoing relationships are grouped into a single cluster.
+    """
 
     node_id_key = model.getNodeAttributeMapping(NodeAttribute.ID)
 
@@ -104,64 +125,42 @@ def edges_to_nodes(model: ArchimateModel):
     source_key = model.getEdgeAttributeMapping(EdgeAttribute.SOURCE)
     target_key = model.getEdgeAttributeMapping(EdgeAttribute.TARGET)
 
-    nodes = {}
-    edges = {}
-
-    # Replace the edges in the model by nodes
-    for index, edge in model.edges.iterrows():
-
-        # Get the attributes of the edge
-        edge_id = edge[edge_id_key]
-        source = edge[source_key]
-        target = edge[target_key]
-
-        # Create the node that replaces the edge
-        node = {node_id_key: edge_id}
-
-        # Create new incoming and outgoing edges
-        incoming_edge_id = f'{edge_id}_in'
-        incoming = {
-            edge_id_key: incoming_edge_id,
-            source_key: source,
-            target_key: edge_id
-        }
-
-        outgoing_edge_id = f'{edge_id}_out'
-        outgoing = {
-            edge_id_key: outgoing_edge_id,
-            source_key: edge_id,
-            target_key: target
-        }
-
-        # Append the new node and edges to the result, indexed by ID
-        nodes = {**nodes, edge_id: node}
-        edges = {
-            **edges,
-            incoming_edge_id: incoming,
-            outgoing_edge_id: outgoing
-        }
-    # END LOOP
+    edge_ids = model.edges[edge_id_key].to_numpy()
+    sources = model.edges[source_key].to_numpy()
+    targets = model.edges[target_key].to_numpy()
+
+    # Every relationship is connected to its source and target. Endpoints which are not a concept in the model are included as well.
+    codes, vertex_ids = pd.factorize(np.concatenate([
+        edge_ids,
+        model.nodes[node_id_key].to_numpy(),
+        np.column_stack([sources, targets]).ravel()
+    ]))
+
+    edge_count = len(edge_ids)
+    node_count = len(model.nodes.index)
+    edge_codes = codes[:edge_count]
+    endpoint_codes = codes[edge_count + node_count:]
+
+    labels = find_components(
+        sources=np.concatenate([endpoint_codes[0::2], edge_codes]),
+        targets=np.concatenate([edge_codes, endpoint_codes[1::2]]),
+        vertex_count=len(vertex_ids)
+    )
 
-    # Also include the already existing nodes
-    for index, node in model.nodes.iterrows():
-        node_id = node[node_id_key]
-        nodes = {**nodes, node_id: {node_id_key: node_id}}
-    # END LOOP
+    # Every component is labelled by its first vertex, so the order of the labels is the order of the clusters
+    component_roots, component_indices, component_sizes = np.unique(
+        labels, return_inverse=True, return_counts=True)
 
-    # Return the model including the new nodes and edges. Keep other settings.
-    model_with_edges_as_nodes = copy.copy(model)
+    cluster_ids = [
+        int(index) if size > 1 else UNCONNECTED_CLUSTER_ID
+        for index, size in enumerate(component_sizes, 1)
+    ]
 
-    model_with_edges_as_nodes.nodes = pd.DataFrame(
-        nodes.values(),
-        columns=model.nodes.columns
-    )
-    model_with_edges_as_nodes.edges = pd.DataFrame(
-        edges.values(),
-        columns=model.edges.columns
-    )
-
-    return model_with_edges_as_nodes
-# END edges_to_nodes
+    return pd.DataFrame({
+        'group': [cluster_ids[index] for index in component_indices],
+        'id': vertex_ids
+    }, columns=['group', 'id'])
+# END get_partitions
 
 
 class UnconnectedElementsMetric(Metric):
@@ -170,11 +169,9 @@ class UnconnectedElementsMetric(Metric):
     unconnected_elems = None
 
     @staticmethod
-    def calculate(model):
-
-        model_with_edges_as_nodes = edges_to_nodes(model)
+    def calculate(model, model_index: ModelIndex = None):
 
-        partitions = get_partitions(model_with_edges_as_nodes)
+        partitions = get_partitions(model)
 
         clusters = pd.DataFrame()
         unconnected_elems = pd.DataFrame()
@@ -7,6 +7,7 @@ import m4i_metrics.config as config
 from ..Metric import Metric
 from ..MetricColumnConfig import MetricColumnConfig
 from ..MetricConfig import MetricConfig
+from ..ModelIndex import ModelIndex
 
 elems_non_compliant_config = MetricConfig(**{
     'description': 'The names of these elements are not structured as a sentence',
@@ -73,9 +74,10 @@ sentence = re.compile(
 class ConceptLabelFormattingMetric(Metric):
     id = '8ddd174e-0c42-478b-b719-8d678a72304f'
     label = 'Concept Label Formatting'
+    is_decomposable = True
 
     @staticmethod
-    def calculate(model):
+    def calculate(model, model_index: ModelIndex = None):
 
         elems = model.nodes.copy()
         rels = model.edges.copy()
@@ -123,6 +125,15 @@ class ConceptLabelFormattingMetric(Metric):
         }
     # END of calculate
 
+    @classmethod
+    def get_sample_sizes(cls, model):
+        return {
+            "elements": len(model.nodes.index),
+            "relationships": len(model.edges.index),
+            "views": len(model.views.index)
+        }
+    # END get_sample_sizes
+
     def get_name(self):
         return 'ConceptLabelFormattingMetric'
     # END get_name
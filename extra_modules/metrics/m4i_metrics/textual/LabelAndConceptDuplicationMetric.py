@@ -5,6 +5,7 @@ import m4i_metrics.config as config
 from ..Metric import Metric
 from ..MetricColumnConfig import MetricColumnConfig
 from ..MetricConfig import MetricConfig
+from ..ModelIndex import ModelIndex
 from ..utils import MultiMap, index_by_property
 
 copy_non_compliant_config = MetricConfig(**{
@@ -191,9 +192,10 @@ def calculate_duplicate_relations(model):
 class LabelAndConceptDuplicationMetric(Metric):
     id = '82125c67-f12d-4871-8748-503482ea2acf'
     label = 'Label and Concept Duplication'
+    is_decomposable = True
 
     @staticmethod
-    def calculate(model):
+    def calculate(model, model_index: ModelIndex = None):
         elems, rels = get_model_copy(model)
         copy_non_compliant, copy_count = calculate_copy_text(
             model, elems, rels)
@@ -225,6 +227,36 @@ class LabelAndConceptDuplicationMetric(Metric):
         }
     # END calculate
 
+    @classmethod
+    def get_sample_sizes(cls, model):
+        return {
+            "copy text concepts": len(model.nodes)+len(model.edges)+len(model.views),
+            "elements": len(model.nodes),
+            "relationships": len(model.edges)
+        }
+    # END get_sample_sizes
+
+    @classmethod
+    def get_affected_concepts(cls, model, concept_ids):
+        # Duplicates are counted per group of concepts with the same key, so a change to one concept affects its whole group
+        elems, rels = get_model_copy(model)
+
+        element_keys = pd.MultiIndex.from_arrays(
+            [elems['name'].str.lower(), elems['type']])
+        affected_elements = element_keys.isin(
+            element_keys[elems['id'].isin(concept_ids)])
+
+        relationship_keys = pd.MultiIndex.from_arrays([
+            model.edges['source'],
+            model.edges['target'],
+            model.edges['type'].apply(lambda x: x['shorthand'])
+        ])
+        affected_relationships = relationship_keys.isin(
+            relationship_keys[model.edges['id'].isin(concept_ids)])
+
+        return concept_ids | set(elems['id'][affected_elements]) | set(model.edges['id'][affected_relationships])
+    # END get_affected_concepts
+
     def get_name(self):
         return 'LabelAndConceptDuplicationMetric'
     # END get_name
@@ -1,3 +1,6 @@
 from .filter_exempted_concepts import filter_exempted_concepts
 from .multimap import MultiMap
-from .index_by_property import index_by_property
\ No newline at end of file
+from .index_by_property import index_by_property
+from .find_junction_paths import find_junction_paths, walk_junction_paths
+from .slice_model import slice_model
+from .count_relationships_between import count_relationships_between
@@ -0,0 +1,32 @@
+from typing import Iterable, Tuple
+
+import pandas as pd
+
+
+def count_relationships_between(model, type_pairs: Iterable[Tuple[str, str]]) -> int:
+    """
+    Counts the relationships in the given model for which the types of the source and target elements match any of the given type pairs.
+    Unlike `ModelIndex.get_relationships_between`, this does not require the relationships to be joined with their source and target elements.
+
+    :return: The number of relationships between elements of the given types
+    :rtype: int
+
+    :param model: The model in which to count the relationships
+    :type model: ArchimateModel
+    :param type_pairs: The source type name and target type name of the relationships to count
+    :type type_pairs: Iterable[Tuple[str, str]]
+    """
+
+    nodes = model.nodes.drop_duplicates('id')
+    node_types = pd.Series(
+        nodes['type'].apply(lambda x: x['typename']).to_numpy(),
+        index=nodes['id']
+    )
+
+    endpoint_types = pd.MultiIndex.from_arrays([
+        model.edges['source'].map(node_types),
+        model.edges['target'].map(node_types)
+    ])
+
+    return int(endpoint_types.isin(list(type_pairs)).sum())
+# END count_relationships_between
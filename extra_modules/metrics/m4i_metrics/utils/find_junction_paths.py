@@ -0,0 +1,169 @@
+from collections import deque
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from pandas import DataFrame
+
+from m4i_analytics.graphs.languages.archimate.metamodel.Concepts import \
+    ElementType
+
+from ..ModelIndex import ModelIndex
+
+JUNCTION_PATH_COLUMNS = ['id_src', 'type_src', 'id_rel', 'type_rel', 'id_tgt',
+                         'type_tgt', 'id_start', 'name_start', 'type_start', 'id_end', 'name_end', 'type_end']
+
+JUNCTION_TYPES = [ElementType.AND_JUNCTION['typename'],
+                  ElementType.OR_JUNCTION['typename']]
+
+
+def walk_junction_paths(
+    start_nodes: Sequence[int],
+    end_type: int,
+    adjacency: Dict[int, List[int]],
+    edge_targets: Sequence[int],
+    node_types: Sequence[int],
+    junction_types: Iterable[int]
+) -> Iterable[Tuple[int, int, Tuple[int, ...]]]:
+    """
+    Finds all paths which lead from any of the given start nodes, via one or more junctions, to a node of the given end type.
+    Paths are found by a single breadth first search from all start nodes at once. Every junction is expanded at most once per start node.
+
+    Nodes and edges are represented by their integer codes.
+
+    :return: For every path found, the start node, the end node and the edges along the path. Paths are ordered by start node.
+    :rtype: Iterable[Tuple[int, int, Tuple[int, ...]]]
+
+    :param start_nodes: The nodes from which to start the search
+    :type start_nodes: Sequence[int]
+    :param end_type: The type code of the nodes at which a path should end
+    :type end_type: int
+    :param adjacency: The outgoing edges of every node, keyed by node
+    :type adjacency: Dict[int, List[int]]
+    :param edge_targets: The target node of every edge, by edge
+    :type edge_targets: Sequence[int]
+    :param node_types: The type code of every node, by node
+    :type node_types: Sequence[int]
+    :param junction_types: The type codes of the nodes which continue a path
+    :type junction_types: Iterable[int]
+    """
+
+    junction_types = set(junction_types)
+
+    neighbours_by_node = {}
+
+    def get_neighbours(node: int):
+        # Of multiple edges between the same nodes, only the last one is followed
+        if node not in neighbours_by_node:
+            neighbours = {}
+            for edge in adjacency.get(node, ()):
+                neighbours[edge_targets[edge]] = edge
+            # END LOOP
+            neighbours_by_node[node] = list(neighbours.items())
+        # END IF
+        return neighbours_by_node[node]
+    # END get_neighbours
+
+    paths_per_start = [[] for _ in start_nodes]
+    visited = set()
+    queue = deque()
+
+    for start_index, start_node in enumerate(start_nodes):
+        for neighbour, edge in get_neighbours(start_node):
+            queue.append((start_index, neighbour, (edge,)))
+        # END LOOP
+    # END LOOP
+
+    while queue:
+        start_index, node, path = queue.popleft()
+        node_type = node_types[node]
+
+        if node_type in junction_types:
+            if (start_index, node) not in visited:
+                visited.add((start_index, node))
+                for neighbour, edge in get_neighbours(node):
+                    queue.append((start_index, neighbour, path + (edge,)))
+                # END LOOP
+            # END IF
+
+        # A path of length 1 does not pass through a junction, so it is not included
+        elif node_type == end_type and len(path) > 1:
+            paths_per_start[start_index].append((node, path))
+        # END IF
+    # END LOOP
+
+    for start_node, paths in zip(start_nodes, paths_per_start):
+        for end_node, path in paths:
+            yield start_node, end_node, path
+        # END LOOP
+    # END LOOP
+# END walk_junction_paths
+
+
+def find_junction_paths(model_index: ModelIndex, start_type: str, end_type: str) -> DataFrame:
+    """
+    Finds all paths in the model which lead from an element of the given start type, via one or more junctions, to an element of the given end type.
+
+    Every row of the result represents a relationship along a path, along with the start and end element of that path.
+    The index of the result is the position of the relationship in its path.
+
+    :return: The relationships along all paths found
+    :rtype: pandas.DataFrame
+
+    :param model_index: The index of the model in which to find the paths
+    :type model_index: ModelIndex
+    :param start_type: The type name of the elements at which the paths start
+    :type start_type: str
+    :param end_type: The type name of the elements at which the paths end
+    :type end_type: str
+    """
+
+    node_types = model_index.node_type_codes.tolist()
+
+    start_type_code = model_index.get_type_code(start_type)
+    start_nodes = [
+        node for node, node_type in enumerate(node_types)
+        if node_type == start_type_code
+    ]
+
+    paths = walk_junction_paths(
+        start_nodes=start_nodes,
+        end_type=model_index.get_type_code(end_type),
+        adjacency=model_index.outgoing,
+        edge_targets=model_index.type_agg_target_codes.tolist(),
+        node_types=node_types,
+        junction_types=[
+            model_index.get_type_code(junction_type)
+            for junction_type in JUNCTION_TYPES
+        ]
+    )
+
+    edges, steps, starts, ends = [], [], [], []
+    for start_node, end_node, path in paths:
+        edges.extend(path)
+        steps.extend(range(len(path)))
+        starts.extend([start_node] * len(path))
+        ends.extend([end_node] * len(path))
+    # END LOOP
+
+    path_edges = model_index.type_agg.iloc[edges]
+    path_starts = model_index.elems.iloc[starts]
+    path_ends = model_index.elems.iloc[ends]
+
+    return DataFrame(
+        {
+            'id_src': path_edges['id_src'].to_numpy(),
+            'type_src': path_edges['type_src'].to_numpy(),
+            'id_rel': path_edges['id_rel'].to_numpy(),
+            'type_rel': path_edges['type_rel'].to_numpy(),
+            'id_tgt': path_edges['id_tgt'].to_numpy(),
+            'type_tgt': path_edges['type_tgt'].to_numpy(),
+            'id_start': path_starts['id'].to_numpy(),
+            'name_start': path_starts['name'].to_numpy(),
+            'type_start': path_starts['type_'].to_numpy(),
+            'id_end': path_ends['id'].to_numpy(),
+            'name_end': path_ends['name'].to_numpy(),
+            'type_end': path_ends['type_'].to_numpy()
+        },
+        index=steps,
+        columns=JUNCTION_PATH_COLUMNS
+    )
+# END find_junction_paths
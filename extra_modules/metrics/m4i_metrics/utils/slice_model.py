@@ -0,0 +1,44 @@
+import copy
+from typing import Iterable
+
+
+def slice_model(model, concept_ids: Iterable[str]):
+    """
+    Returns a copy of the given model which only includes the elements, relationships and views with the given ids.
+    The sources and targets of the included relationships are included as well, so that their names and types can be looked up.
+    Since the source or target of a relationship can be another relationship, this repeats until every included relationship has both of its endpoints in the slice.
+
+    :return: A copy of the model with only the given concepts
+    :rtype: ArchimateModel
+
+    :param model: The model to slice
+    :type model: ArchimateModel
+    :param concept_ids: The ids of the concepts to include
+    :type concept_ids: Iterable[str]
+    """
+
+    concept_ids = set(concept_ids)
+
+    included_ids = set(concept_ids)
+    is_included_edge = model.edges['id'].isin(included_ids)
+
+    while True:
+        edges = model.edges[is_included_edge]
+        endpoint_ids = (set(edges['source']) |
+                        set(edges['target'])) - included_ids
+
+        if len(endpoint_ids) == 0:
+            break
+        # END IF
+
+        included_ids |= endpoint_ids
+        is_included_edge = model.edges['id'].isin(included_ids)
+    # END LOOP
+
+    sliced_model = copy.copy(model)
+    sliced_model.nodes = model.nodes[model.nodes['id'].isin(included_ids)]
+    sliced_model.edges = model.edges[is_included_edge]
+    sliced_model.views = model.views[model.views['id'].isin(concept_ids)]
+
+    return sliced_model
+# END slice_model
@@ -0,0 +1,111 @@
+from typing import Iterable, Tuple
+
+import pandas as pd
+from m4i_analytics.graphs.languages.archimate.metamodel.Concepts import (
+    ElementType, RelationshipType)
+from m4i_analytics.graphs.languages.archimate.model.ArchimateModel import \
+    ArchimateModel
+
+
+def build_model(elements: Iterable[Tuple[str, str, str]], relationships: Iterable[tuple] = (), views: Iterable[Tuple[str, str, list]] = ()) -> ArchimateModel:
+    """
+    Builds a small model for testing.
+
+    :return: The model with the given concepts
+    :rtype: ArchimateModel
+
+    :param elements: The id, name and type of every element. The type is the name of the type in `ElementType`, e.g. 'FACILITY'.
+    :type elements: Iterable[Tuple[str, str, str]]
+    :param relationships: The id, source id, target id and type of every relationship, optionally followed by its name. The type is the name of the type in `RelationshipType`, e.g. 'COMPOSITION'.
+    :type relationships: Iterable[tuple]
+    :param views: The id, name and nodes of every view. Nodes are given as element ids, or as a tuple of element id and nested nodes.
+    :type views: Iterable[Tuple[str, str, list]]
+    """
+
+    nodes = pd.DataFrame(
+        [
+            {'id': id_, 'name': name, 'type': getattr(ElementType, type_name)}
+            for id_, name, type_name in elements
+        ],
+        columns=['id', 'name', 'type']
+    )
+
+    edges = pd.DataFrame(
+        [
+            {
+                'id': id_,
+                'source': source,
+                'target': target,
+                'type': getattr(RelationshipType, type_name),
+                'name': name[0] if len(name) > 0 else ''
+            }
+            for id_, source, target, type_name, *name in relationships
+        ],
+        columns=['id', 'source', 'target', 'type', 'name']
+    )
+
+    def build_view_nodes(view_id: str, view_nodes: list) -> list:
+        result = []
+        for view_node in view_nodes:
+            element_id, children = view_node if isinstance(
+                view_node, tuple) else (view_node, [])
+
+            node = {
+                '@identifier': f'{view_id}-{element_id}',
+                '@xsi_type': 'ar3_Element',
+                '@elementRef': element_id
+            }
+
+            if len(children) > 0:
+                node['ar3_node'] = build_view_nodes(view_id, children)
+            # END IF
+
+            result.append(node)
+        # END LOOP
+        return result
+    # END build_view_nodes
+
+    views = pd.DataFrame(
+        [
+            {
+                'id': id_,
+                'name': name,
+                'nodes': build_view_nodes(id_, view_nodes),
+                'connections': []
+            }
+            for id_, name, view_nodes in views
+        ],
+        columns=['id', 'name', 'nodes', 'connections']
+    )
+
+    return ArchimateModel(
+        name='Test model',
+        nodes=nodes,
+        edges=edges,
+        views=views,
+        defaultAttributeMapping=True
+    )
+# END build_model
+
+
+def assert_same_rows(expected: pd.DataFrame, actual: pd.DataFrame, key_columns: Iterable[str]):
+    """
+    Asserts that both datasets contain the same rows, regardless of the order of the rows and columns
+    """
+
+    key_columns = list(key_columns)
+
+    def normalize(data: pd.DataFrame) -> pd.DataFrame:
+        if len(data.index) == 0:
+            return pd.DataFrame(columns=sorted(data.columns))
+        # END IF
+        return data.sort_values(key_columns).reset_index(drop=True)
+    # END normalize
+
+    pd.testing.assert_frame_equal(
+        normalize(expected),
+        normalize(actual),
+        check_like=True,
+        check_dtype=False
+    )
+# END assert_same_rows
@@ -0,0 +1,149 @@
+from collections import deque
+
+import pandas as pd
+import pytest
+from m4i_analytics.graphs.languages.archimate.metamodel.Concepts import \
+    ElementType
+
+from m4i_metrics.ModelIndex import ModelIndex
+from m4i_metrics.utils import find_junction_paths
+from m4i_metrics.utils.find_junction_paths import (JUNCTION_PATH_COLUMNS,
+                                                   JUNCTION_TYPES)
+
+from model_fixtures import build_model
+
+FACILITY = ElementType.FACILITY['typename']
+BUSINESS_PROCESS = ElementType.BUSINESS_PROCESS['typename']
+BUSINESS_EVENT = ElementType.BUSINESS_EVENT['typename']
+
+
+ELEMENTS = [
+    ('f1', 'Plant A', 'FACILITY'),
+    ('f2', 'Plant B', 'FACILITY'),
+    ('p1', 'Produce', 'BUSINESS_PROCESS'),
+    ('p2', 'Ship', 'BUSINESS_PROCESS'),
+    ('j1', 'Split', 'AND_JUNCTION'),
+    ('j2', 'Choose', 'OR_JUNCTION'),
+    ('j3', 'Dead end', 'OR_JUNCTION'),
+    ('e1', 'Material arrived', 'BUSINESS_EVENT')
+]
+
+RELATIONSHIPS = [
+    # Of both relationships between f1 and j1, only the last one is followed
+    ('rel1', 'f1', 'j1', 'FLOW'),
+    ('rel2', 'f1', 'j1', 'TRIGGERING'),
+    ('rel3', 'j1', 'p1', 'TRIGGERING'),
+    ('rel4', 'j1', 'j2', 'FLOW'),
+    ('rel5', 'j2', 'p1', 'FLOW'),
+    ('rel6', 'j2', 'p2', 'TRIGGERING'),
+    # A cycle between junctions
+    ('rel7', 'j2', 'j1', 'FLOW'),
+    # A path of length 1 is not a junction path
+    ('rel8', 'f2', 'p2', 'TRIGGERING'),
+    ('rel9', 'f2', 'j3', 'FLOW'),
+    # A path which is interrupted by an element which is not a junction
+    ('rel10', 'j1', 'e1', 'TRIGGERING'),
+    ('rel11', 'e1', 'p2', 'TRIGGERING'),
+    ('rel12', 'p1', 'j2', 'FLOW'),
+    ('rel13', 'j2', 'f2', 'FLOW')
+]
+
+
+def find_junction_paths_by_search(model_index: ModelIndex, start_type: str, end_type: str) -> pd.DataFrame:
+    """
+    The breadth first search per start element which the metrics used before `find_junction_paths`
+    """
+
+    elems = model_index.elems
+    type_agg = model_index.type_agg
+
+    def find_neighbours(node_id: str) -> dict:
+        neighbours = {}
+        for _, row in type_agg[type_agg['id_src'] == node_id].iterrows():
+            neighbours[row['id_tgt']] = {
+                key: row[key] for key in ['id_src', 'type_src', 'id_rel', 'type_rel', 'id_tgt', 'type_tgt']
+            }
+        # END LOOP
+        return neighbours
+    # END find_neighbours
+
+    def get_element(node_id: str) -> pd.Series:
+        return elems[elems['id'] == node_id].iloc[0]
+    # END get_element
+
+    paths = [pd.DataFrame(columns=JUNCTION_PATH_COLUMNS)]
+
+    for start_id in elems[elems['type_'] == start_type]['id']:
+        visited = []
+        queue = deque(
+            (1, neighbour_id, {1: step})
+            for neighbour_id, step in find_neighbours(start_id).items()
+        )
+
+        while queue:
+            level, node_id, path = queue.popleft()
+            node_type = get_element(node_id)['type_']
+
+            if node_type not in JUNCTION_TYPES:
+                visited.append(node_id)
+
+                if node_type == end_type and len(path) > 1:
+                    start, end = get_element(start_id), get_element(node_id)
+                    paths.append(pd.DataFrame([
+                        {
+                            **step,
+                            'id_start': start['id'],
+                            'name_start': start['name'],
+                            'type_start': start['type_'],
+                            'id_end': end['id'],
+                            'name_end': end['name'],
+                            'type_end': end['type_']
+                        }
+                        for step in path.values()
+                    ]))
+                # END IF
+            elif node_id not in visited:
+                visited.append(node_id)
+                for neighbour_id, step in find_neighbours(node_id).items():
+                    queue.append(
+                        (level + 1, neighbour_id, {**path, level + 1: step}))
+                # END LOOP
+            # END IF
+        # END LOOP
+    # END LOOP
+
+    return pd.concat(paths, sort=False)
+# END find_junction_paths_by_search
+
+
+@pytest.mark.parametrize('start_type, end_type', [
+    (FACILITY, BUSINESS_PROCESS),
+    (BUSINESS_PROCESS, FACILITY),
+    (BUSINESS_EVENT, BUSINESS_PROCESS)
+])
+def test_find_junction_paths_matches_search(start_type, end_type):
+    model_index = ModelIndex(build_model(ELEMENTS, RELATIONSHIPS))
+
+    expected = find_junction_paths_by_search(model_index, start_type, end_type)
+    actual = find_junction_paths(model_index, start_type, end_type)
+
+    pd.testing.assert_frame_equal(
+        expected[JUNCTION_PATH_COLUMNS],
+        actual,
+        check_dtype=False,
+        check_index_type=False
+    )
+# END test_find_junction_paths_matches_search
+
+
+def test_find_junction_paths_finds_paths_through_junctions():
+    model_index = ModelIndex(build_model(ELEMENTS, RELATIONSHIPS))
+
+    paths = find_junction_paths(model_index, FACILITY, BUSINESS_PROCESS)
+
+    # Both paths from f1 to p1 and the path from f1 to p2, each via one or two junctions
+    assert paths['id_rel'].tolist() == [
+        'rel2', 'rel3', 'rel2', 'rel4', 'rel5', 'rel2', 'rel4', 'rel6'
+    ]
+    assert paths.index.tolist() == [0, 1, 0, 1, 2, 0, 1, 2]
+# END test_find_junction_paths_finds_paths_through_junctions
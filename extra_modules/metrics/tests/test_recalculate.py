@@ -0,0 +1,170 @@
+import pytest
+
+from m4i_metrics.physical import FacilityRelationsMetric
+from m4i_metrics.process import ActorAndRoleAssignmentMetric
+from m4i_metrics.textual import (ConceptLabelFormattingMetric,
+                                 LabelAndConceptDuplicationMetric)
+from m4i_metrics.utils import slice_model
+
+from model_fixtures import assert_same_rows, build_model
+
+DECOMPOSABLE_METRICS = [
+    ActorAndRoleAssignmentMetric,
+    ConceptLabelFormattingMetric,
+    FacilityRelationsMetric,
+    LabelAndConceptDuplicationMetric
+]
+
+BASE_ELEMENTS = [
+    ('f1', 'Plant A', 'FACILITY'),
+    ('f2', 'Plant B', 'FACILITY'),
+    ('f3', 'plant a', 'FACILITY'),
+    ('a1', 'Operator', 'BUSINESS_ACTOR'),
+    ('r1', 'Planner', 'BUSINESS_ROLE'),
+    ('p1', 'Plan production', 'BUSINESS_PROCESS'),
+    ('p2', 'ship goods', 'BUSINESS_PROCESS'),
+    ('e1', 'Pump (copy)', 'EQUIPMENT')
+]
+
+BASE_RELATIONSHIPS = [
+    ('rel1', 'f1', 'f2', 'COMPOSITION'),
+    ('rel2', 'f1', 'f2', 'SERVING'),
+    ('rel3', 'a1', 'r1', 'ASSIGNMENT'),
+    ('rel4', 'a1', 'r1', 'SERVING'),
+    ('rel5', 'r1', 'p1', 'ASSIGNMENT'),
+    ('rel6', 'r1', 'p1', 'ASSIGNMENT'),
+    # A relationship of which the source is another relationship
+    ('rel7', 'rel3', 'p2', 'ASSOCIATION', 'Yes'),
+    ('rel8', 'a1', 'p2', 'TRIGGERING', 'wrong label')
+]
+
+BASE_VIEWS = [
+    ('v1', 'Main view', ['f1', ('f2', ['e1'])]),
+    ('v2', 'other view (copy)', ['a1', 'r1'])
+]
+
+
+def replace(concepts, replacements):
+    replacements = {concept[0]: concept for concept in replacements}
+    return [replacements.get(concept[0], concept) for concept in concepts]
+# END replace
+
+
+def remove(concepts, ids):
+    return [concept for concept in concepts if concept[0] not in ids]
+# END remove
+
+
+VARIANTS = {
+    'add': (
+        BASE_ELEMENTS + [('f4', 'Plant b', 'FACILITY')],
+        BASE_RELATIONSHIPS + [
+            ('rel9', 'f2', 'f4', 'FLOW'),
+            ('rel10', 'r1', 'p2', 'SERVING'),
+            ('rel11', 'r1', 'p1', 'ASSIGNMENT')
+        ],
+        BASE_VIEWS + [('v3', 'bad view', ['f4'])]
+    ),
+    'remove': (
+        remove(BASE_ELEMENTS, {'f3'}),
+        remove(BASE_RELATIONSHIPS, {'rel2', 'rel6'}),
+        remove(BASE_VIEWS, {'v2'})
+    ),
+    'change': (
+        replace(BASE_ELEMENTS, [
+            ('f2', 'Plant A', 'FACILITY'),
+            ('a1', 'Machine operator', 'BUSINESS_ACTOR'),
+            ('p2', 'Ship goods', 'BUSINESS_PROCESS')
+        ]),
+        replace(BASE_RELATIONSHIPS, [
+            ('rel4', 'a1', 'r1', 'ASSIGNMENT'),
+            ('rel5', 'r1', 'p2', 'ASSIGNMENT')
+        ]),
+        replace(BASE_VIEWS, [('v1', 'Main View (copy)', ['f1'])])
+    )
+}
+
+
+def get_differences(previous_model, model):
+    """
+    Classifies every concept by comparing its records in both models
+    """
+
+    def get_records(model):
+        records = {}
+        for concepts in [model.nodes, model.edges, model.views]:
+            for record in concepts.to_dict(orient='records'):
+                records[record['id']] = record
+            # END LOOP
+        # END LOOP
+        return records
+    # END get_records
+
+    previous_records = get_records(previous_model)
+    records = get_records(model)
+
+    for id_ in previous_records.keys() - records.keys():
+        yield id_, 'model 1 only'
+    # END LOOP
+
+    for id_, record in records.items():
+        if id_ not in previous_records:
+            yield id_, 'model 2 only'
+        elif record != previous_records[id_]:
+            yield id_, 'changed'
+        else:
+            yield id_, 'unchanged'
+        # END IF
+    # END LOOP
+# END get_differences
+
+
+@pytest.mark.parametrize('variant', sorted(VARIANTS.keys()))
+@pytest.mark.parametrize('metric', DECOMPOSABLE_METRICS, ids=lambda metric: metric.__name__)
+def test_recalculate_matches_calculate(metric, variant):
+    previous_model = build_model(BASE_ELEMENTS, BASE_RELATIONSHIPS, BASE_VIEWS)
+    model = build_model(*VARIANTS[variant])
+
+    previous_result = metric.calculate(previous_model)
+
+    expected = metric.calculate(model)
+    actual = metric.recalculate(
+        model, previous_result, get_differences(previous_model, model))
+
+    assert expected.keys() == actual.keys()
+
+    for dataset_name, dataset in expected.items():
+        assert actual[dataset_name]['sample_size'] == dataset['sample_size']
+
+        assert_same_rows(
+            dataset['data'],
+            actual[dataset_name]['data'],
+            [dataset['config'].id_column]
+        )
+    # END LOOP
+# END test_recalculate_matches_calculate
+
+
+def test_recalculate_without_previous_result_calculates_in_full():
+    model = build_model(BASE_ELEMENTS, BASE_RELATIONSHIPS, BASE_VIEWS)
+
+    expected = FacilityRelationsMetric.calculate(model)
+    actual = FacilityRelationsMetric.recalculate(model, None, [])
+
+    assert_same_rows(
+        expected['Relationships between facilities']['data'],
+        actual['Relationships between facilities']['data'],
+        ['id_rel']
+    )
+# END test_recalculate_without_previous_result_calculates_in_full
+
+
+def test_slice_model_includes_endpoints_of_relationships():
+    model = build_model(BASE_ELEMENTS, BASE_RELATIONSHIPS, BASE_VIEWS)
+
+    sliced_model = slice_model(model, {'rel7'})
+
+    assert set(sliced_model.edges['id']) == {'rel3', 'rel7'}
+    assert set(sliced_model.nodes['id']) == {'a1', 'r1', 'p2'}
+    assert len(sliced_model.views.index) == 0
+# END test_slice_model_includes_endpoints_of_relationships
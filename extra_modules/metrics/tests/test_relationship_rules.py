@@ -0,0 +1,141 @@
+from typing import Tuple
+
+import pandas as pd
+import pytest
+from m4i_analytics.graphs.languages.archimate.metamodel.Concepts import (
+    ElementType, RelationshipType)
+
+from m4i_metrics.ModelIndex import ModelIndex
+from m4i_metrics.RelationshipRules import (APPLICATION_LAYER, BUSINESS_LAYER,
+                                           PHYSICAL_LAYER, TECHNOLOGY_LAYER)
+
+from model_fixtures import build_model
+
+ELEMENTS = [
+    ('f1', 'Plant A', 'FACILITY'),
+    ('f2', 'Plant B', 'FACILITY'),
+    ('q1', 'Pump', 'EQUIPMENT'),
+    ('a1', 'Operator', 'BUSINESS_ACTOR'),
+    ('r1', 'Planner', 'BUSINESS_ROLE'),
+    ('p1', 'Plan production', 'BUSINESS_PROCESS'),
+    ('u1', 'Planning', 'BUSINESS_FUNCTION'),
+    ('c1', 'ERP', 'APPLICATION_COMPONENT'),
+    ('n1', 'Server', 'NODE'),
+    ('j1', 'Split', 'AND_JUNCTION'),
+    ('g1', 'Reduce cost', 'GOAL')
+]
+
+RELATIONSHIPS = [
+    ('rel1', 'f1', 'f2', 'COMPOSITION'),
+    ('rel2', 'f1', 'f2', 'SERVING'),
+    ('rel3', 'f2', 'f1', 'SPECIALIZATION'),
+    ('rel4', 'q1', 'f1', 'ASSIGNMENT'),
+    ('rel5', 'f1', 'q1', 'FLOW'),
+    ('rel6', 'q1', 'f2', 'ASSOCIATION'),
+    ('rel7', 'a1', 'r1', 'ASSIGNMENT'),
+    ('rel8', 'a1', 'r1', 'SERVING'),
+    ('rel9', 'r1', 'p1', 'ASSIGNMENT'),
+    ('rel10', 'r1', 'u1', 'TRIGGERING'),
+    ('rel11', 'a1', 'u1', 'ASSIGNMENT'),
+    # Only assignments from actors and roles are checked
+    ('rel12', 'p1', 'r1', 'SERVING'),
+    ('rel13', 'c1', 'n1', 'ASSOCIATION'),
+    ('rel14', 'j1', 'p1', 'ASSOCIATION'),
+    ('rel15', 'g1', 'p1', 'ASSOCIATION'),
+    ('rel16', 'c1', 'p1', 'SERVING')
+]
+
+
+def typenames(*types) -> list:
+    return [type_['typename'] for type_ in types]
+# END typenames
+
+
+def facility_relations(type_agg: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    The relationships which `FacilityRelationsMetric` checked before the rule table, and whether they were valid
+    """
+
+    facilities = typenames(ElementType.FACILITY)
+    checked = type_agg[type_agg['type_src'].isin(
+        facilities) & type_agg['type_tgt'].isin(facilities)]
+    return checked, checked['type_rel'].isin(typenames(
+        RelationshipType.AGGREGATION, RelationshipType.COMPOSITION,
+        RelationshipType.REALIZATION, RelationshipType.SPECIALIZATION))
+# END facility_relations
+
+
+def equipment_assigned_to_facility(type_agg: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    The relationships which `EquipmentAssignedToFacilityMetric` checked before the rule table, and whether they were valid
+    """
+
+    equipment, facility = typenames(ElementType.EQUIPMENT, ElementType.FACILITY)
+    checked = type_agg[
+        ((type_agg['type_src'] == equipment) & (type_agg['type_tgt'] == facility))
+        | ((type_agg['type_src'] == facility) & (type_agg['type_tgt'] == equipment))
+    ]
+    return checked, checked['type_rel'] == RelationshipType.ASSIGNMENT['typename']
+# END equipment_assigned_to_facility
+
+
+def actor_and_role_assignment(type_agg: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    The relationships which `ActorAndRoleAssignmentMetric` checked before the rule table, and whether they were valid
+    """
+
+    actor, role, process, function = typenames(
+        ElementType.BUSINESS_ACTOR, ElementType.BUSINESS_ROLE,
+        ElementType.BUSINESS_PROCESS, ElementType.BUSINESS_FUNCTION)
+    type_pairs = [(actor, role), (actor, process), (role, process),
+                  (actor, function), (role, function)]
+    checked = pd.concat([
+        type_agg[(type_agg['type_src'] == source) &
+                 (type_agg['type_tgt'] == target)]
+        for source, target in type_pairs
+    ])
+    return checked, checked['type_rel'] == RelationshipType.ASSIGNMENT['typename']
+# END actor_and_role_assignment
+
+
+def use_of_association(type_agg: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    The relationships which `UseOfAssociationRelationsMetric` checked before the rule table, and whether they were valid
+    """
+
+    all_layers = (BUSINESS_LAYER + APPLICATION_LAYER + TECHNOLOGY_LAYER + PHYSICAL_LAYER
+                  + typenames(ElementType.OR_JUNCTION, ElementType.AND_JUNCTION))
+    checked = type_agg[type_agg['type_rel'] ==
+                       RelationshipType.ASSOCIATION['typename']]
+    return checked, ~(checked['type_src'].isin(all_layers) & checked['type_tgt'].isin(all_layers))
+# END use_of_association
+
+
+@pytest.mark.parametrize('rule_name, check', [
+    ('facility_relations', facility_relations),
+    ('equipment_assigned_to_facility', equipment_assigned_to_facility),
+    ('actor_and_role_assignment', actor_and_role_assignment),
+    ('use_of_association', use_of_association)
+])
+def test_rule_violations_match_checks(rule_name, check):
+    model_index = ModelIndex(build_model(ELEMENTS, RELATIONSHIPS))
+
+    checked, is_valid = check(model_index.type_agg)
+    sample_size, violations = model_index.get_rule_violations(rule_name)
+
+    assert sample_size == len(checked.index)
+    assert sorted(violations['id_rel']) == sorted(checked['id_rel'][~is_valid])
+# END test_rule_violations_match_checks
+
+
+def test_rule_violations_are_in_relationship_order():
+    model_index = ModelIndex(build_model(ELEMENTS, RELATIONSHIPS))
+
+    sample_size, violations = model_index.get_rule_violations(
+        'actor_and_role_assignment')
+
+    assert sample_size == 5
+    assert violations['id_rel'].tolist() == ['rel8', 'rel10']
+    # Positions in type_agg do not leak into the result
+    assert violations.index.tolist() == [0, 1]
+# END test_rule_violations_are_in_relationship_order
@@ -0,0 +1,125 @@
+from collections import defaultdict
+
+from m4i_analytics.graphs.languages.archimate.metamodel.Concepts import \
+    RelationshipType
+
+from m4i_metrics.structural.TreeStructuresMetric import (
+    build_transition_matrix, label_nodes_by_tree)
+
+from model_fixtures import build_model
+
+ELEMENTS = [
+    (id_, id_.upper(), 'BUSINESS_FUNCTION')
+    for id_ in ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'x', 'y', 'z']
+]
+
+RELATIONSHIPS = [
+    ('rel1', 'a', 'b', 'COMPOSITION'),
+    ('rel2', 'a', 'c', 'COMPOSITION'),
+    # c is part of the trees of both a and d
+    ('rel3', 'd', 'c', 'AGGREGATION'),
+    ('rel4', 'c', 'e', 'AGGREGATION'),
+    # For other relationships, the target is the parent, so f is the parent of e
+    ('rel5', 'e', 'f', 'SPECIALIZATION'),
+    # A cycle below a root
+    ('rel6', 'x', 'g', 'COMPOSITION'),
+    ('rel7', 'g', 'h', 'COMPOSITION'),
+    ('rel8', 'h', 'g', 'COMPOSITION'),
+    # A cycle without a root
+    ('rel9', 'y', 'z', 'SPECIALIZATION'),
+    ('rel10', 'z', 'y', 'SPECIALIZATION')
+]
+
+
+def label_nodes_by_search(edges):
+    """
+    The depth first search from every root which `TreeStructuresMetric` used before `label_nodes_by_tree`.
+    Returns the roots of every node, and the parents of every node.
+    """
+
+    children_by_parent = defaultdict(set)
+    parents_by_child = defaultdict(set)
+    for _, edge in edges.iterrows():
+        if edge['type'] in [RelationshipType.COMPOSITION, RelationshipType.AGGREGATION]:
+            parent, child = edge['source'], edge['target']
+        else:
+            parent, child = edge['target'], edge['source']
+        # END IF
+        children_by_parent[parent].add(child)
+        parents_by_child[child].add(parent)
+    # END LOOP
+
+    def find_nodes_in_tree(node, seen):
+        if node in seen:
+            return
+        # END IF
+        yield node
+        seen.add(node)
+        for child in children_by_parent.get(node, ()):
+            yield from find_nodes_in_tree(child, seen)
+        # END LOOP
+    # END find_nodes_in_tree
+
+    labeled_nodes = defaultdict(set)
+    for root in list(children_by_parent.keys()):
+        if root not in parents_by_child:
+            for node in find_nodes_in_tree(root, set()):
+                labeled_nodes[node].add(root)
+            # END LOOP
+        # END IF
+    # END LOOP
+
+    return labeled_nodes, parents_by_child
+# END label_nodes_by_search
+
+
+def test_label_nodes_by_tree_matches_search():
+    edges = build_model(ELEMENTS, RELATIONSHIPS).edges
+
+    expected_labels, parents_by_child = label_nodes_by_search(edges)
+
+    parents, children, node_ids = build_transition_matrix(edges)
+    labels, roots = label_nodes_by_tree(parents, children, len(node_ids))
+
+    actual_labels = {
+        node_ids[node]: {
+            node_ids[root] for bit, root in enumerate(roots) if label & (1 << bit)
+        }
+        for node, label in enumerate(labels)
+    }
+
+    assert set(node_ids) == set(parents_by_child.keys()) | {
+        node_ids[parent] for parent in parents
+    }
+
+    for node_id in node_ids:
+        assert actual_labels[node_id] == expected_labels.get(node_id, set())
+    # END LOOP
+
+    # The parent counts, from which the violations are derived, are unchanged as well
+    parent_counts = defaultdict(int)
+    for child in children:
+        parent_counts[node_ids[child]] += 1
+    # END LOOP
+
+    assert parent_counts == {
+        child: len(parents) for child, parents in parents_by_child.items()
+    }
+# END test_label_nodes_by_tree_matches_search
+
+
+def test_label_nodes_by_tree_labels_nodes_below_multiple_roots():
+    edges = build_model(ELEMENTS, RELATIONSHIPS).edges
+
+    parents, children, node_ids = build_transition_matrix(edges)
+    labels, roots = label_nodes_by_tree(parents, children, len(node_ids))
+
+    root_ids = [node_ids[root] for root in roots]
+    labels_by_id = dict(zip(node_ids, labels))
+
+    assert sorted(root_ids) == ['a', 'd', 'f', 'x']
+    assert bin(labels_by_id['c']).count('1') == 2
+    assert bin(labels_by_id['e']).count('1') == 3
+    assert bin(labels_by_id['h']).count('1') == 1
+    assert labels_by_id['y'] == labels_by_id['z'] == 0
+# END test_label_nodes_by_tree_labels_nodes_below_multiple_roots
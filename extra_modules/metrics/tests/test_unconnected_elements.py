@@ -0,0 +1,79 @@
+import networkx as nx
+import pandas as pd
+
+from m4i_metrics.structural.UnconnectedElementsMetric import (
+    UNCONNECTED_CLUSTER_ID, get_partitions)
+
+from model_fixtures import build_model
+
+ELEMENTS = [
+    ('a', 'A', 'BUSINESS_ACTOR'),
+    ('b', 'B', 'BUSINESS_ROLE'),
+    ('c', 'C', 'BUSINESS_PROCESS'),
+    ('d', 'D', 'BUSINESS_PROCESS'),
+    ('e', 'E', 'APPLICATION_COMPONENT'),
+    ('f', 'F', 'APPLICATION_COMPONENT'),
+    ('g', 'G', 'NODE'),
+    ('h', 'H', 'NODE')
+]
+
+RELATIONSHIPS = [
+    ('rel1', 'c', 'd', 'TRIGGERING'),
+    ('rel2', 'a', 'b', 'ASSIGNMENT'),
+    ('rel3', 'b', 'c', 'ASSIGNMENT'),
+    ('rel4', 'e', 'f', 'FLOW'),
+    # A relationship of which the source is another relationship
+    ('rel5', 'rel4', 'g', 'ASSOCIATION'),
+    # A relationship which refers to an element which is not in the model
+    ('rel6', 'missing', 'd', 'ASSOCIATION')
+]
+
+
+def get_partitions_by_graph(model) -> pd.DataFrame:
+    """
+    The connected components of the graph in which relationships are nodes, which `UnconnectedElementsMetric` used before `find_components`
+    """
+
+    graph = nx.Graph()
+    graph.add_nodes_from(model.edges['id'])
+    graph.add_nodes_from(model.nodes['id'])
+
+    for _, edge in model.edges.iterrows():
+        graph.add_edge(edge['source'], edge['id'])
+        graph.add_edge(edge['id'], edge['target'])
+    # END LOOP
+
+    clustered_nodes = []
+    for index, cluster in enumerate(nx.connected_components(graph), 1):
+        cluster_id = index if len(cluster) > 1 else UNCONNECTED_CLUSTER_ID
+        clustered_nodes.extend((cluster_id, node) for node in cluster)
+    # END LOOP
+
+    return pd.DataFrame(clustered_nodes, columns=['group', 'id'])
+# END get_partitions_by_graph
+
+
+def test_get_partitions_matches_graph():
+    model = build_model(ELEMENTS, RELATIONSHIPS)
+
+    expected = get_partitions_by_graph(model)
+    actual = get_partitions(model)
+
+    # Within a cluster, the order of the concepts is not defined
+    pd.testing.assert_frame_equal(
+        expected.sort_values('id').reset_index(drop=True),
+        actual.sort_values('id').reset_index(drop=True),
+        check_dtype=False
+    )
+# END test_get_partitions_matches_graph
+
+
+def test_get_partitions_groups_unconnected_elements():
+    model = build_model(ELEMENTS, RELATIONSHIPS)
+
+    groups = get_partitions(model).set_index('id')['group']
+
+    assert groups['rel1'] == groups['a'] == groups['missing'] == 1
+    assert groups['rel4'] == groups['g'] == groups['rel5'] == 2
+    assert groups['h'] == UNCONNECTED_CLUSTER_ID
+# END test_get_partitions_groups_unconnected_elements
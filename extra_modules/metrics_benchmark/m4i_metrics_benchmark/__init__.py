@@ -0,0 +1,5 @@
+from __future__ import absolute_import
+
+from .baseline import compare_to_baseline, load_baseline, save_baseline
+from .benchmark import benchmark_metrics, measure, run_benchmark
+from .generate_model import generate_model
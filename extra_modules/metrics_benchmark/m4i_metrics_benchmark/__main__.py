@@ -0,0 +1,104 @@
+import sys
+from argparse import ArgumentParser
+
+from .baseline import (DEFAULT_TOLERANCE, compare_to_baseline, load_baseline,
+                       save_baseline)
+from .benchmark import run_benchmark
+
+
+def _format_measurement(measurement: dict) -> str:
+    if measurement['error'] is not None:
+        return f"error: {measurement['error']}"
+    # END IF
+
+    times = f"{measurement['wall_time']:10.3f} s {measurement['cpu_time']:10.3f} s CPU"
+
+    if measurement['peak_memory'] is None:
+        return times
+    # END IF
+
+    return f"{times} {measurement['peak_memory'] / (1024 * 1024):10.1f} MB"
+# END _format_measurement
+
+
+def main(arguments=None) -> int:
+    """
+    Runs the benchmark from the command line. Prints the measurements, and compares them to a baseline if one is given.
+
+    :return: The exit code, which is 1 if any regressions were found and 0 otherwise
+    :rtype: int
+    """
+
+    parser = ArgumentParser(
+        prog='m4i_metrics_benchmark',
+        description='Measures the performance of the metrics on synthetic models'
+    )
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help='Comma separated numbers of concepts of the generated models')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='The number of times every metric is timed')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Do not measure the peak memory of every metric')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--relationships-per-element', type=float, default=1.5)
+    parser.add_argument('--junction-density', type=float, default=0.02)
+    parser.add_argument('--hierarchy-depth', type=int, default=3)
+    parser.add_argument('--views', type=int, default=10)
+    parser.add_argument('--view-nesting', type=int, default=2)
+    parser.add_argument('--baseline',
+                        help='The path of a baseline to compare the measurements against')
+    parser.add_argument('--save-baseline',
+                        help='The path at which to store the measurements as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='The fraction by which a measurement may exceed the baseline')
+
+    options = parser.parse_args(arguments)
+
+    report = run_benchmark(
+        sizes=[int(size) for size in options.sizes.split(',')],
+        repeat=options.repeat,
+        trace_memory=not options.no_memory,
+        relationships_per_element=options.relationships_per_element,
+        junction_density=options.junction_density,
+        hierarchy_depth=options.hierarchy_depth,
+        view_count=options.views,
+        view_nesting=options.view_nesting,
+        seed=options.seed
+    )
+
+    for size, run in report.items():
+        print(
+            f"{size} concepts ({run['elements']} elements, {run['relationships']} relationships)")
+        for measurement in run['metrics'].values():
+            print(f"  {measurement['name']:45} {_format_measurement(measurement)}")
+        # END LOOP
+    # END LOOP
+
+    if options.save_baseline is not None:
+        save_baseline(report, options.save_baseline)
+    # END IF
+
+    if options.baseline is None:
+        return 0
+    # END IF
+
+    regressions = compare_to_baseline(
+        report,
+        load_baseline(options.baseline),
+        tolerance=options.tolerance
+    )
+
+    for regression in regressions:
+        print(
+            f"Regression in {regression['name']} at {regression['size']} concepts: "
+            f"{regression['measure']} went from {regression['baseline']} to {regression['current']}"
+        )
+    # END LOOP
+
+    return 1 if len(regressions) > 0 else 0
+# END main
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+# END IF
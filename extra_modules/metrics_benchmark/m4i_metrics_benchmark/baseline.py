@@ -0,0 +1,114 @@
+import json
+from typing import Dict, List
+
+# A measurement is a regression if it exceeds the baseline by more than this fraction
+DEFAULT_TOLERANCE = 0.25
+
+# Measurements below these thresholds are too small to compare reliably
+MIN_WALL_TIME = 0.01  # seconds
+MIN_PEAK_MEMORY = 1024 * 1024  # bytes = 1 MB
+
+_thresholds = {
+    'wall_time': MIN_WALL_TIME,
+    'peak_memory': MIN_PEAK_MEMORY
+}
+
+
+def save_baseline(report: Dict[str, dict], path: str):
+    """
+    Writes the given benchmark report to the given path as JSON, so later runs can be compared against it
+    """
+
+    with open(path, 'w') as baseline_file:
+        json.dump(report, baseline_file, indent=2, sort_keys=True)
+    # END WITH
+# END save_baseline
+
+
+def load_baseline(path: str) -> Dict[str, dict]:
+    """
+    Reads a benchmark report which was written with `save_baseline`
+
+    :return: The benchmark report stored at the given path
+    :rtype: Dict[str, dict]
+    """
+
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+    # END WITH
+# END load_baseline
+
+
+def compare_to_baseline(report: Dict[str, dict], baseline: Dict[str, dict], tolerance: float = DEFAULT_TOLERANCE) -> List[dict]:
+    """
+    Compares the given benchmark report to the given baseline, and returns every measurement which got worse by more than the tolerance.
+    Only sizes and metrics which occur in both reports are compared.
+    A metric which succeeded in the baseline but fails in the report is a regression as well.
+
+    :return: The regressions, each with the `size`, `metric` id, `name`, `measure`, `baseline` value, `current` value and `ratio` between them
+    :rtype: List[dict]
+
+    :param report: The benchmark report to check, as returned by `run_benchmark`
+    :type report: Dict[str, dict]
+    :param baseline: The benchmark report to compare against
+    :type baseline: Dict[str, dict]
+    :param tolerance: The fraction by which a measurement may exceed the baseline
+    :type tolerance: float
+    """
+
+    regressions = []
+
+    for size, run in report.items():
+        baseline_run = baseline.get(size)
+        if baseline_run is None:
+            continue
+        # END IF
+
+        for metric_id, measurement in run['metrics'].items():
+            baseline_measurement = baseline_run['metrics'].get(metric_id)
+            if baseline_measurement is None:
+                continue
+            # END IF
+
+            if measurement['error'] is not None and baseline_measurement['error'] is None:
+                regressions.append({
+                    'size': size,
+                    'metric': metric_id,
+                    'name': measurement['name'],
+                    'measure': 'error',
+                    'baseline': None,
+                    'current': measurement['error'],
+                    'ratio': None
+                })
+                continue
+            # END IF
+
+            for measure, threshold in _thresholds.items():
+                baseline_value = baseline_measurement.get(measure)
+                current_value = measurement.get(measure)
+
+                if baseline_value is None or current_value is None or max(baseline_value, current_value) < threshold:
+                    continue
+                # END IF
+
+                # Values below the threshold are compared as if they were at the threshold, to avoid noise on small measurements
+                ratio = max(current_value, threshold) / \
+                    max(baseline_value, threshold)
+
+                if ratio > 1 + tolerance:
+                    regressions.append({
+                        'size': size,
+                        'metric': metric_id,
+                        'name': measurement['name'],
+                        'measure': measure,
+                        'baseline': baseline_value,
+                        'current': current_value,
+                        'ratio': ratio
+                    })
+                # END IF
+            # END LOOP
+        # END LOOP
+    # END LOOP
+
+    return regressions
+# END compare_to_baseline
@@ -0,0 +1,186 @@
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from m4i_metrics.MetricProfiler import profile
+from m4i_metrics.MetricRunner import resolve_metrics
+from m4i_metrics.ModelIndex import ModelIndex
+from m4i_metrics.physical import PhysicalMetric
+from m4i_metrics.process import ProcessMetric
+from m4i_metrics.structural import StructuralMetric
+from m4i_metrics.textual import TextualMetric
+
+from .generate_model import generate_model
+
+# The metric categories which are measured by default, along with all of their metrics
+DEFAULT_CATEGORIES = [
+    PhysicalMetric,
+    ProcessMetric,
+    StructuralMetric,
+    TextualMetric
+]
+
+# The key under which the time it takes to index the model is reported
+MODEL_INDEX_KEY = 'ModelIndex'
+
+
+def measure(function: Callable, *args, repeat: int = 1, trace_memory: bool = True, **kwargs) -> Tuple[Any, dict]:
+    """
+    Calls the given function with the given arguments and profiles it with `MetricProfiler.profile`.
+
+    The function is timed `repeat` times, after which the fastest wall time and CPU time are reported.
+    Tracing memory slows down the function considerably, so the peak memory is measured in a separate call.
+
+    :return: The output of the function, and a dictionary with the `wall_time` and `cpu_time` in seconds and the `peak_memory` in bytes. The peak memory is `None` if memory is not traced.
+    :rtype: Tuple[Any, dict]
+    """
+
+    timings = []
+    for _ in range(max(repeat, 1)):
+        with profile(trace_memory=False) as measurements:
+            result = function(*args, **kwargs)
+        # END WITH
+        timings.append(measurements)
+    # END LOOP
+
+    peak_memory = None
+    if trace_memory:
+        with profile() as measurements:
+            function(*args, **kwargs)
+        # END WITH
+        peak_memory = measurements['peak_memory']
+    # END IF
+
+    return result, {
+        'wall_time': min(timing['wall_time'] for timing in timings),
+        'cpu_time': min(timing['cpu_time'] for timing in timings),
+        'peak_memory': peak_memory
+    }
+# END measure
+
+
+def benchmark_metrics(model, metrics: Optional[Iterable[type]] = None, repeat: int = 1, trace_memory: bool = True) -> Dict[str, dict]:
+    """
+    Measures every metric and every metric category for the given model.
+
+    The model is indexed once, like the `MetricRunner` does, and the time this takes is reported under `MODEL_INDEX_KEY`.
+    Metrics are calculated with the shared index. Categories are measured by summarizing the results of their metrics.
+
+    Every measurement is a dictionary with the `name` of the metric class, the `wall_time` and `cpu_time` in seconds, the `peak_memory` in bytes and the `error` raised, if any.
+    A category of which any metric failed is not measured, since its summary would not reflect a complete result. Its `error` names the failed metrics instead.
+
+    :return: The measurements keyed by metric id
+    :rtype: Dict[str, dict]
+
+    :param model: The model for which to measure the metrics
+    :type model: ArchimateModel
+    :param metrics: The `Metric` and `MetricCategory` classes to measure. Defaults to `DEFAULT_CATEGORIES`.
+    :type metrics: Optional[Iterable[type]]
+    :param repeat: The number of times every metric is timed. The fastest time is reported.
+    :type repeat: int
+    :param trace_memory: Whether or not to measure the peak memory of every metric
+    :type trace_memory: bool
+    """
+
+    if metrics is None:
+        metrics = DEFAULT_CATEGORIES
+    # END IF
+
+    metrics, categories = resolve_metrics(metrics)
+
+    measurements = {}
+
+    model_index, measurements[MODEL_INDEX_KEY] = measure(
+        ModelIndex, model, repeat=repeat, trace_memory=trace_memory)
+    measurements[MODEL_INDEX_KEY].update(name=MODEL_INDEX_KEY, error=None)
+
+    results = {}
+    failed_metrics = set()
+
+    for metric in metrics:
+        try:
+            results[metric.id], measurement = measure(
+                metric.calculate,
+                model,
+                model_index,
+                repeat=repeat,
+                trace_memory=trace_memory
+            )
+            measurement['error'] = None
+        except Exception as e:
+            failed_metrics.add(metric.id)
+            measurement = {
+                'wall_time': None,
+                'cpu_time': None,
+                'peak_memory': None,
+                'error': repr(e)
+            }
+        # END TRY
+        measurements[metric.id] = {'name': metric.__name__, **measurement}
+    # END LOOP
+
+    for category in categories:
+        failed_submetrics = [
+            metric.__name__ for metric in category.metrics if metric.id in failed_metrics
+        ]
+
+        if len(failed_submetrics) > 0:
+            measurements[category.id] = {
+                'name': category.__name__,
+                'wall_time': None,
+                'cpu_time': None,
+                'peak_memory': None,
+                'error': f'Not summarized, since these metrics failed: {", ".join(failed_submetrics)}'
+            }
+            continue
+        # END IF
+
+        try:
+            _, measurement = measure(
+                category.summarize,
+                [results[metric.id] for metric in category.metrics],
+                repeat=repeat,
+                trace_memory=trace_memory
+            )
+            measurement['error'] = None
+        except Exception as e:
+            measurement = {
+                'wall_time': None,
+                'cpu_time': None,
+                'peak_memory': None,
+                'error': repr(e)
+            }
+        # END TRY
+        measurements[category.id] = {'name': category.__name__, **measurement}
+    # END LOOP
+
+    return measurements
+# END benchmark_metrics
+
+
+def run_benchmark(sizes: Iterable[int], metrics: Optional[Iterable[type]] = None, repeat: int = 1, trace_memory: bool = True, **generator_options) -> Dict[str, dict]:
+    """
+    Generates a synthetic model for every given size, and measures the given metrics for each of them.
+    Any other keyword arguments are passed to `generate_model`.
+
+    :return: For every size, the number of elements and relationships in the generated model, and the measurements of every metric. Keyed by size.
+    :rtype: Dict[str, dict]
+    """
+
+    report = {}
+
+    for size in sizes:
+        model = generate_model(size=size, **generator_options)
+
+        report[str(size)] = {
+            'elements': len(model.nodes.index),
+            'relationships': len(model.edges.index),
+            'metrics': benchmark_metrics(
+                model,
+                metrics=metrics,
+                repeat=repeat,
+                trace_memory=trace_memory
+            )
+        }
+    # END LOOP
+
+    return report
+# END run_benchmark
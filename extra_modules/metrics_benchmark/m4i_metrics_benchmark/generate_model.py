@@ -0,0 +1,277 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from m4i_analytics.graphs.languages.archimate.metamodel.Concepts import (
+    ElementType, RelationshipType)
+from m4i_analytics.graphs.languages.archimate.model.ArchimateModel import \
+    ArchimateModel
+
+# The relative frequency of every element type in a generated model, keyed by the name of the type in `ElementType`.
+# Junctions are not part of the mix, since their number is set separately.
+DEFAULT_TYPE_MIX = {
+    'BUSINESS_ACTOR': 4,
+    'BUSINESS_ROLE': 4,
+    'BUSINESS_PROCESS': 8,
+    'BUSINESS_FUNCTION': 4,
+    'BUSINESS_EVENT': 3,
+    'BUSINESS_OBJECT': 4,
+    'BUSINESS_SERVICE': 3,
+    'APPLICATION_COMPONENT': 4,
+    'APPLICATION_PROCESS': 4,
+    'APPLICATION_EVENT': 2,
+    'APPLICATION_SERVICE': 3,
+    'DATA_OBJECT': 4,
+    'NODE': 3,
+    'DEVICE': 2,
+    'SYSTEM_SOFTWARE': 2,
+    'TECHNOLOGY_PROCESS': 2,
+    'TECHNOLOGY_EVENT': 1,
+    'EQUIPMENT': 2,
+    'FACILITY': 2,
+    'DISTRIBUTION_NETWORK': 1,
+    'MATERIAL': 1,
+    'GOAL': 1
+}
+
+# The relative frequency of every relationship type among the relationships which are not part of a hierarchy or connected to a junction
+DEFAULT_RELATIONSHIP_MIX = {
+    'ASSOCIATION': 3,
+    'ASSIGNMENT': 3,
+    'REALIZATION': 2,
+    'SERVING': 3,
+    'ACCESS': 2,
+    'TRIGGERING': 2,
+    'FLOW': 2,
+    'SPECIALIZATION': 1,
+    'INFLUENCE': 1
+}
+
+# The words from which element names are composed. Some are formatted inconsistently on purpose.
+NAME_WORDS = [
+    'Order', 'customer', 'Invoice', 'PAYMENT', 'Shipment', 'Warehouse',
+    'Planning', 'report', 'Pump', 'Valve', 'Line', 'Sensor'
+]
+
+# The number of children of every parent node in a nested view
+VIEW_NESTING_FAN_OUT = 4
+
+
+def _choose_types(names: Dict[str, float], count: int, random: np.random.RandomState, enum) -> List[dict]:
+    """
+    Draws `count` types from the given mix of type names, and returns the corresponding type objects
+    """
+
+    type_names = list(names.keys())
+    weights = np.array(list(names.values()), dtype=float)
+    codes = random.choice(len(type_names), size=count, p=weights / weights.sum())
+    types = [getattr(enum, type_name) for type_name in type_names]
+    return [types[code] for code in codes]
+# END _choose_types
+
+
+def _generate_names(count: int, random: np.random.RandomState) -> np.ndarray:
+    """
+    Generates element names which repeat now and then, so duplicate labels occur in the generated model
+    """
+
+    words = np.array(NAME_WORDS, dtype=object)
+    first = words[random.randint(len(words), size=count)]
+    second = words[random.randint(len(words), size=count)]
+    numbers = random.randint(max(count // 10, 1), size=count).astype(str)
+    return first + ' ' + second + ' ' + numbers
+# END _generate_names
+
+
+def _nest_view_nodes(view_id: str, element_ids: List[str], depth: int, max_depth: int) -> List[dict]:
+    """
+    Creates the nodes of a view for the given elements.
+    Until the maximum depth is reached, every group of elements is nested in the first element of the group.
+    """
+
+    nodes = []
+    step = VIEW_NESTING_FAN_OUT + 1 if depth < max_depth else 1
+
+    for start in range(0, len(element_ids), step):
+        element_id = element_ids[start]
+        node = {
+            '@identifier': f'{view_id}-{element_id}',
+            '@xsi_type': 'ar3_Element',
+            '@elementRef': element_id
+        }
+
+        children = element_ids[start + 1:start + step]
+        if len(children) > 0:
+            node['ar3_node'] = _nest_view_nodes(
+                view_id, children, depth + 1, max_depth)
+        # END IF
+
+        nodes.append(node)
+    # END LOOP
+
+    return nodes
+# END _nest_view_nodes
+
+
+def generate_model(
+    size: int = 1000,
+    type_mix: Optional[Dict[str, float]] = None,
+    relationships_per_element: float = 1.5,
+    junction_density: float = 0.02,
+    hierarchy_depth: int = 3,
+    view_count: int = 10,
+    view_nesting: int = 2,
+    seed: int = 0
+) -> ArchimateModel:
+    """
+    Generates a synthetic model to measure the performance of metrics with.
+    The same parameters always generate the same model.
+
+    The relationships of the model consist of:
+
+        * Composition relationships which arrange the elements in trees of the given depth
+        * Flow and triggering relationships which connect every junction to one predecessor and two successors
+        * Relationships of random types between random elements, which make up the remainder
+
+    :return: The generated model
+    :rtype: ArchimateModel
+
+    :param size: The total number of elements and relationships in the model
+    :type size: int
+    :param type_mix: The relative frequency of every element type, keyed by the name of the type in `ElementType`. Defaults to `DEFAULT_TYPE_MIX`.
+    :type type_mix: Optional[Dict[str, float]]
+    :param relationships_per_element: The number of relationships in the model for every element
+    :type relationships_per_element: float
+    :param junction_density: The fraction of the elements which are junctions
+    :type junction_density: float
+    :param hierarchy_depth: The depth of the composition trees. Pass 0 to generate no hierarchy.
+    :type hierarchy_depth: int
+    :param view_count: The number of views in the model. Every element occurs in one view at most.
+    :type view_count: int
+    :param view_nesting: The maximum depth at which nodes are nested in a view
+    :type view_nesting: int
+    :param seed: The seed of the random number generator
+    :type seed: int
+    """
+
+    random = np.random.RandomState(seed)
+
+    if type_mix is None:
+        type_mix = DEFAULT_TYPE_MIX
+    # END IF
+
+    element_count = max(int(round(size / (1 + relationships_per_element))), 1)
+    relationship_count = size - element_count
+
+    # Elements
+    junction_count = int(round(element_count * junction_density))
+    junction_types = _choose_types(
+        {'AND_JUNCTION': 1, 'OR_JUNCTION': 1}, junction_count, random, ElementType)
+    element_types = _choose_types(
+        type_mix, element_count - junction_count, random, ElementType)
+
+    element_ids = np.array(
+        [f'id-element-{index}' for index in range(element_count)], dtype=object)
+    names = _generate_names(element_count, random)
+    names[element_count - junction_count:] = ''
+
+    nodes = pd.DataFrame({
+        'id': element_ids,
+        'name': names,
+        'type': element_types + junction_types
+    })
+
+    # Junctions are placed at the end, so the other elements are the first ones
+    regular_ids = element_ids[:element_count - junction_count]
+    junction_ids = element_ids[element_count - junction_count:]
+
+    sources, targets, types = [], [], []
+
+    # Hierarchy: every element below the top level has a parent one level up
+    if hierarchy_depth > 0 and len(regular_ids) > 1:
+        levels = random.randint(hierarchy_depth + 1, size=len(regular_ids))
+        for level in range(1, hierarchy_depth + 1):
+            parents = regular_ids[levels == level - 1]
+            children = regular_ids[levels == level]
+            if len(parents) == 0:
+                break
+            # END IF
+            sources.append(parents[random.randint(len(parents), size=len(children))])
+            targets.append(children)
+            types.append(np.full(len(children), 'COMPOSITION', dtype=object))
+        # END LOOP
+    # END IF
+
+    # Junctions: one incoming and two outgoing relationships each
+    if junction_count > 0 and len(regular_ids) > 0:
+        junction_relationship_types = random.choice(
+            np.array(['FLOW', 'TRIGGERING'], dtype=object), size=junction_count)
+        sources.append(regular_ids[random.randint(len(regular_ids), size=junction_count)])
+        targets.append(junction_ids)
+        types.append(junction_relationship_types)
+        for _ in range(2):
+            sources.append(junction_ids)
+            targets.append(regular_ids[random.randint(len(regular_ids), size=junction_count)])
+            types.append(junction_relationship_types)
+        # END LOOP
+    # END IF
+
+    sources = np.concatenate(sources) if len(sources) > 0 else np.array([], dtype=object)
+    targets = np.concatenate(targets) if len(targets) > 0 else np.array([], dtype=object)
+    types = np.concatenate(types) if len(types) > 0 else np.array([], dtype=object)
+
+    # The structured relationships are cut off if they exceed the number of relationships, and otherwise filled up with random ones
+    sources = sources[:relationship_count]
+    targets = targets[:relationship_count]
+    types = types[:relationship_count]
+
+    random_count = relationship_count - len(sources)
+    if random_count > 0:
+        random_type_names = list(DEFAULT_RELATIONSHIP_MIX.keys())
+        weights = np.array(list(DEFAULT_RELATIONSHIP_MIX.values()), dtype=float)
+        sources = np.concatenate([sources, element_ids[random.randint(element_count, size=random_count)]])
+        targets = np.concatenate([targets, element_ids[random.randint(element_count, size=random_count)]])
+        types = np.concatenate([types, np.array(random_type_names, dtype=object)[
+            random.choice(len(random_type_names), size=random_count, p=weights / weights.sum())]])
+    # END IF
+
+    relationship_types = {
+        type_name: getattr(RelationshipType, type_name) for type_name in set(types)
+    }
+
+    edges = pd.DataFrame({
+        'id': [f'id-relationship-{index}' for index in range(relationship_count)],
+        'source': sources,
+        'target': targets,
+        'type': [relationship_types[type_name] for type_name in types],
+        'name': ''
+    })
+
+    # Views: every view shows a distinct random part of the elements
+    view_ids = [f'id-view-{index}' for index in range(view_count)]
+    view_nodes = []
+    if view_count > 0:
+        shuffled_ids = element_ids[random.permutation(element_count)]
+        # Some elements are left out of every view
+        shown_ids = shuffled_ids[:int(element_count * 0.9)]
+        for view_id, view_element_ids in zip(view_ids, np.array_split(shown_ids, view_count)):
+            view_nodes.append(_nest_view_nodes(
+                view_id, list(view_element_ids), 0, view_nesting))
+        # END LOOP
+    # END IF
+
+    views = pd.DataFrame({
+        'id': view_ids,
+        'name': [f'View {index}' for index in range(view_count)],
+        'nodes': view_nodes,
+        'connections': [[] for _ in view_ids]
+    })
+
+    return ArchimateModel(
+        name=f'Synthetic model of {size} concepts',
+        nodes=nodes,
+        edges=edges,
+        views=views,
+        defaultAttributeMapping=True
+    )
+# END generate_model
@@ -0,0 +1,12 @@
+from setuptools import setup, find_packages
+
+
+setup(
+      name="m4i-metrics-benchmark",
+      version = "1.0.0",
+      url="http://gitlab.com/m4i/analytics-library-extensions",
+      author="Aurelius Enterprise",
+      packages=find_packages(),
+      install_requires=["m4i-metrics", "numpy", "pandas"],
+      zip_safe=False
+)